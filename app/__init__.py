@@ -50,3 +50,23 @@ def create_app():
         db.create_all()
 
     return app
+
+def start_background_tasks(app):
+    """
+    Start the background work of a server process
+
+    Called by the server entry point rather than create_app, so scripts
+    that only need the app don't load models, fetch fund data or spawn
+    chart rendering workers.
+    """
+    # Start the chart rendering workers so the first charts don't wait for them
+    from app.utils.chart_renderer import start_renderer
+    start_renderer()
+
+    # Load the return prediction models in the background
+    from app.utils.model_registry import model_registry
+    model_registry.start_loading()
+
+    # Compute the leaderboards in the background if none are saved or they are due
+    from app.utils.leaderboards import start_leaderboards
+    start_leaderboards(app)
@@ -1,9 +1,7 @@
-from flask import Blueprint, render_template, request, jsonify, send_file, flash, current_app, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, send_file, flash, current_app, redirect, url_for, abort
 import pandas as pd
 import numpy as np
 import json
-import os
-import pickle
 from flask_login import login_required, current_user
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
@@ -11,94 +9,51 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import datetime as dt
 from io import BytesIO
-import base64
 from PIL import Image
 from app.utils.mf_api import get_mutual_fund_details, get_popular_funds
+from app.utils.mf_dataset import load_dataset
+from app.utils.chart_cache import CHART_MAX_AGE, get_chart, get_chart_spec, get_charts, read_chart
+from app.utils.chart_specs import heatmap_spec, pie_spec, scatter_row_spec, scatter_spec
+from app.utils.model_registry import HORIZONS, PREDICTION_DELTA, model_registry
 
 mf_analysis_bp = Blueprint('mf_analysis', __name__, url_prefix='/mf-analysis')
 
+# Columns used for the correlation heatmap
+CORRELATION_COLUMNS = ['1 Year Return', '3 Year Return', '5 Year Return', 'AUM (Cr.)',
+                       'Expense Ratio', 'NAV', 'Equity %', 'Debt %']
+
+# Columns shown in the data table
+TABLE_COLUMNS = ['Fund Name', 'Type', 'Rating', 'AUM (Cr.)', 'NAV', 'Expense Ratio',
+                 '1 Year Return', '3 Year Return', '5 Year Return', 'Risk', 'Equity %', 'Debt %']
+
 # Load data
 def load_data():
-    try:
-        df = pd.read_excel('app/data/cleaned_data.xlsx')
-        print(f"Successfully loaded data from app/data/cleaned_data.xlsx")
-        return df
-    except Exception as e:
-        print(f"Error loading data from app/data/cleaned_data.xlsx: {e}")
-        try:
-            # Try alternative path
-            df = pd.read_excel('Mutual-funds-Analysis-and-prediction-main/cleaned_data.xlsx')
-            print(f"Successfully loaded data from Mutual-funds-Analysis-and-prediction-main/cleaned_data.xlsx")
-            return df
-        except Exception as e2:
-            print(f"Error loading data from alternative path: {e2}")
-            return pd.DataFrame()
+    """Get the analysis dataset with standard column names (shared, don't modify)"""
+    return load_dataset()
 
 # Load models
 def load_models():
-    try:
-        models = {}
-        # Try primary paths first
-        primary_paths = {
-            'one_year': 'app/models/ml_models/model_one_year_returns_new.pkl',
-            'three_year': 'app/models/ml_models/model_three_year_returns_new.pkl',
-            'five_year': 'app/models/ml_models/model_five_year_returns_new.pkl'
-        }
-
-        # Alternative paths as fallback
-        alternative_paths = {
-            'one_year': 'Mutual-funds-Analysis-and-prediction-main/model_one_year_returns_new.pkl',
-            'three_year': 'Mutual-funds-Analysis-and-prediction-main/model_three_year_returns_new.pkl',
-            'five_year': 'Mutual-funds-Analysis-and-prediction-main/model_five_year_returns_new.pkl'
-        }
-
-        # Try primary paths first
-        for key, path in primary_paths.items():
-            if os.path.exists(path):
-                print(f"Loading model from {path}")
-                with open(path, 'rb') as f:
-                    models[key] = pickle.load(f)
-            else:
-                print(f"Primary model file not found: {path}")
-                # Try alternative path
-                alt_path = alternative_paths[key]
-                if os.path.exists(alt_path):
-                    print(f"Loading model from alternative path: {alt_path}")
-                    with open(alt_path, 'rb') as f:
-                        models[key] = pickle.load(f)
-                else:
-                    print(f"Alternative model file not found: {alt_path}")
-
-        return models
-    except Exception as e:
-        print(f"Error loading models: {e}")
-        return {}
+    """Get the return prediction models loaded by the model registry"""
+    return model_registry.models()
 
 # Generate fund type chart
-def generate_fund_type_chart():
+def generate_fund_type_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
-        plt.figure(figsize=(10, 6))
-
-        # Check which column name is available for fund type
         if 'Type' in df.columns:
-            type_column = 'Type'
-        elif 'type_of_fund' in df.columns:
-            type_column = 'type_of_fund'
-        elif 'Fund Type' in df.columns:
-            type_column = 'Fund Type'
-        elif 'fund_type' in df.columns:
-            type_column = 'fund_type'
+            fund_type_counts = df['Type'].value_counts()
         else:
-            # If no type column is found, create a dummy one
+            # If no type column is found, count every fund as unknown
             print("No fund type column found in data. Available columns:", df.columns.tolist())
-            df['Type'] = 'Unknown'
-            type_column = 'Type'
+            fund_type_counts = pd.Series({'Unknown': len(df)})
+
+        if output == 'plotly':
+            return pie_spec(fund_type_counts.index.tolist(), fund_type_counts.values, 'Distribution of Fund Types')
 
-        fund_type_counts = df[type_column].value_counts()
+        plt.figure(figsize=(10, 6))
         plt.pie(fund_type_counts, labels=fund_type_counts.index, autopct='%1.1f%%', startangle=90, shadow=True)
         plt.title('Distribution of Fund Types')
         plt.axis('equal')
@@ -106,74 +61,42 @@ def generate_fund_type_chart():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating fund type chart: {e}")
         return None
 
 # Generate returns correlation chart
-def generate_returns_correlation_chart():
+def generate_returns_correlation_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
-        # Map possible column names to standardized names
-        column_mapping = {
-            # Return columns
-            '1 Year Return': ['1 Year Return', 'one_year_returns', '1_year_return', 'one_year_return'],
-            '3 Year Return': ['3 Year Return', 'three_year_returns', '3_year_return', 'three_year_return'],
-            '5 Year Return': ['5 Year Return', 'five_year_returns', '5_year_return', 'five_year_return'],
-
-            # Asset columns
-            'AUM (Cr.)': ['AUM (Cr.)', 'aum', 'aum_funds_individual_lst', 'AUM'],
-            'Expense Ratio': ['Expense Ratio', 'expense_ratio', 'expense'],
-            'NAV': ['NAV', 'nav', 'net_asset_value'],
-
-            # Allocation columns
-            'Equity %': ['Equity %', 'equity_per', 'equity_percentage', 'equity'],
-            'Debt %': ['Debt %', 'debt_per', 'debt_percentage', 'debt']
-        }
-
-        # Create a new DataFrame with standardized column names
-        new_df = pd.DataFrame()
-
-        # Print available columns for debugging
-        print("Available columns in data:", df.columns.tolist())
-
-        # Map columns from original DataFrame to standardized names
-        for std_name, possible_names in column_mapping.items():
-            for col in possible_names:
-                if col in df.columns:
-                    new_df[std_name] = df[col]
-                    print(f"Mapped column '{col}' to '{std_name}'")
-                    break
+        new_df = df[[column for column in CORRELATION_COLUMNS if column in df.columns]]
 
         # Check if we have enough columns for correlation
         if len(new_df.columns) < 2:
             print("Not enough columns found for correlation analysis")
             return None
 
-        plt.figure(figsize=(10, 8))
         correlation_data = new_df.corr()
 
+        if output == 'plotly':
+            return heatmap_spec(correlation_data, 'Correlation Between Different Metrics')
+
+        plt.figure(figsize=(10, 8))
         sns.heatmap(correlation_data, annot=True, cmap='coolwarm', fmt='.2f')
         plt.title('Correlation Between Different Metrics')
 
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating returns correlation chart: {e}")
         import traceback
@@ -181,12 +104,16 @@ def generate_returns_correlation_chart():
         return None
 
 # Generate one vs five year chart
-def generate_one_vs_five_year_chart():
+def generate_one_vs_five_year_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
+        if output == 'plotly':
+            return scatter_spec(df['1 Year Return'], df['5 Year Return'], '1 Year Return (%)', '5 Year Return (%)',
+                                '1 Year Return vs 5 Year Return', regression=True)
+
         plt.figure(figsize=(10, 6))
         plt.scatter(df['1 Year Return'], df['5 Year Return'], alpha=0.5)
         plt.xlabel('1 Year Return (%)')
@@ -195,8 +122,9 @@ def generate_one_vs_five_year_chart():
         plt.grid(True, alpha=0.3)
 
         # Add regression line
-        x = df['1 Year Return']
-        y = df['5 Year Return']
+        data = df[['1 Year Return', '5 Year Return']].dropna()
+        x = data['1 Year Return']
+        y = data['5 Year Return']
         z = np.polyfit(x, y, 1)
         p = np.poly1d(z)
         plt.plot(x, p(x), "r--", alpha=0.8)
@@ -204,23 +132,24 @@ def generate_one_vs_five_year_chart():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating one vs five year chart: {e}")
         return None
 
 # Generate one vs three year chart
-def generate_one_vs_three_year_chart():
+def generate_one_vs_three_year_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
+        if output == 'plotly':
+            return scatter_spec(df['1 Year Return'], df['3 Year Return'], '1 Year Return (%)', '3 Year Return (%)',
+                                '1 Year Return vs 3 Year Return', regression=True)
+
         plt.figure(figsize=(10, 6))
         plt.scatter(df['1 Year Return'], df['3 Year Return'], alpha=0.5)
         plt.xlabel('1 Year Return (%)')
@@ -229,8 +158,9 @@ def generate_one_vs_three_year_chart():
         plt.grid(True, alpha=0.3)
 
         # Add regression line
-        x = df['1 Year Return']
-        y = df['3 Year Return']
+        data = df[['1 Year Return', '3 Year Return']].dropna()
+        x = data['1 Year Return']
+        y = data['3 Year Return']
         z = np.polyfit(x, y, 1)
         p = np.poly1d(z)
         plt.plot(x, p(x), "r--", alpha=0.8)
@@ -238,23 +168,24 @@ def generate_one_vs_three_year_chart():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating one vs three year chart: {e}")
         return None
 
 # Generate AUM vs one year chart
-def generate_aum_vs_one_year_chart():
+def generate_aum_vs_one_year_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
+        if output == 'plotly':
+            return scatter_spec(df['AUM (Cr.)'], df['1 Year Return'], 'AUM (Cr.)', '1 Year Return (%)',
+                                'AUM vs 1 Year Return')
+
         plt.figure(figsize=(10, 6))
         plt.scatter(df['AUM (Cr.)'], df['1 Year Return'], alpha=0.5)
         plt.xlabel('AUM (Cr.)')
@@ -265,23 +196,24 @@ def generate_aum_vs_one_year_chart():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating AUM vs one year chart: {e}")
         return None
 
 # Generate AUM vs three year chart
-def generate_aum_vs_three_year_chart():
+def generate_aum_vs_three_year_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
+        if output == 'plotly':
+            return scatter_spec(df['AUM (Cr.)'], df['3 Year Return'], 'AUM (Cr.)', '3 Year Return (%)',
+                                'AUM vs 3 Year Return')
+
         plt.figure(figsize=(10, 6))
         plt.scatter(df['AUM (Cr.)'], df['3 Year Return'], alpha=0.5)
         plt.xlabel('AUM (Cr.)')
@@ -292,23 +224,24 @@ def generate_aum_vs_three_year_chart():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating AUM vs three year chart: {e}")
         return None
 
 # Generate AUM vs five year chart
-def generate_aum_vs_five_year_chart():
+def generate_aum_vs_five_year_chart(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
+        if output == 'plotly':
+            return scatter_spec(df['AUM (Cr.)'], df['5 Year Return'], 'AUM (Cr.)', '5 Year Return (%)',
+                                'AUM vs 5 Year Return')
+
         plt.figure(figsize=(10, 6))
         plt.scatter(df['AUM (Cr.)'], df['5 Year Return'], alpha=0.5)
         plt.xlabel('AUM (Cr.)')
@@ -319,74 +252,53 @@ def generate_aum_vs_five_year_chart():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating AUM vs five year chart: {e}")
         return None
 
 # Generate debt percentage charts
-def generate_debt_percentage_charts():
+def generate_debt_percentage_charts(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
-        # Map possible column names to standardized names
-        column_mapping = {
-            # Return columns
-            '1 Year Return': ['1 Year Return', 'one_year_returns', '1_year_return', 'one_year_return'],
-            '3 Year Return': ['3 Year Return', 'three_year_returns', '3_year_return', 'three_year_return'],
-            '5 Year Return': ['5 Year Return', 'five_year_returns', '5_year_return', 'five_year_return'],
-
-            # Allocation columns
-            'Debt %': ['Debt %', 'debt_per', 'debt_percentage', 'debt']
-        }
-
-        # Create a new DataFrame with standardized column names
-        new_df = pd.DataFrame()
-
-        # Print available columns for debugging
-        print("Available columns in data for debt chart:", df.columns.tolist())
-
-        # Map columns from original DataFrame to standardized names
-        for std_name, possible_names in column_mapping.items():
-            for col in possible_names:
-                if col in df.columns:
-                    new_df[std_name] = df[col]
-                    print(f"Mapped column '{col}' to '{std_name}'")
-                    break
-
         # Check if we have the necessary columns
         required_columns = ['Debt %', '1 Year Return', '3 Year Return', '5 Year Return']
-        missing_columns = [col for col in required_columns if col not in new_df.columns]
+        missing_columns = [col for col in required_columns if col not in df.columns]
 
         if missing_columns:
             print(f"Missing required columns for debt chart: {missing_columns}")
             return None
 
+        if output == 'plotly':
+            return scatter_row_spec(df['Debt %'], 'Debt %', [
+                (df['1 Year Return'], '1 Year Return (%)', 'Debt % vs 1 Year Return'),
+                (df['3 Year Return'], '3 Year Return (%)', 'Debt % vs 3 Year Return'),
+                (df['5 Year Return'], '5 Year Return (%)', 'Debt % vs 5 Year Return')
+            ])
+
         fig, axes = plt.subplots(1, 3, figsize=(18, 6))
 
         # Debt % vs 1 Year Return
-        axes[0].scatter(new_df['Debt %'], new_df['1 Year Return'], alpha=0.5)
+        axes[0].scatter(df['Debt %'], df['1 Year Return'], alpha=0.5)
         axes[0].set_xlabel('Debt %')
         axes[0].set_ylabel('1 Year Return (%)')
         axes[0].set_title('Debt % vs 1 Year Return')
         axes[0].grid(True, alpha=0.3)
 
         # Debt % vs 3 Year Return
-        axes[1].scatter(new_df['Debt %'], new_df['3 Year Return'], alpha=0.5)
+        axes[1].scatter(df['Debt %'], df['3 Year Return'], alpha=0.5)
         axes[1].set_xlabel('Debt %')
         axes[1].set_ylabel('3 Year Return (%)')
         axes[1].set_title('Debt % vs 3 Year Return')
         axes[1].grid(True, alpha=0.3)
 
         # Debt % vs 5 Year Return
-        axes[2].scatter(new_df['Debt %'], new_df['5 Year Return'], alpha=0.5)
+        axes[2].scatter(df['Debt %'], df['5 Year Return'], alpha=0.5)
         axes[2].set_xlabel('Debt %')
         axes[2].set_ylabel('5 Year Return (%)')
         axes[2].set_title('Debt % vs 5 Year Return')
@@ -397,12 +309,9 @@ def generate_debt_percentage_charts():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close(fig)  # Close the figure explicitly
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating debt percentage charts: {e}")
         import traceback
@@ -410,63 +319,45 @@ def generate_debt_percentage_charts():
         return None
 
 # Generate equity percentage charts
-def generate_equity_percentage_charts():
+def generate_equity_percentage_charts(output='png'):
     try:
         df = load_data()
         if df.empty:
             return None
 
-        # Map possible column names to standardized names
-        column_mapping = {
-            # Return columns
-            '1 Year Return': ['1 Year Return', 'one_year_returns', '1_year_return', 'one_year_return'],
-            '3 Year Return': ['3 Year Return', 'three_year_returns', '3_year_return', 'three_year_return'],
-            '5 Year Return': ['5 Year Return', 'five_year_returns', '5_year_return', 'five_year_return'],
-
-            # Allocation columns
-            'Equity %': ['Equity %', 'equity_per', 'equity_percentage', 'equity']
-        }
-
-        # Create a new DataFrame with standardized column names
-        new_df = pd.DataFrame()
-
-        # Print available columns for debugging
-        print("Available columns in data for equity chart:", df.columns.tolist())
-
-        # Map columns from original DataFrame to standardized names
-        for std_name, possible_names in column_mapping.items():
-            for col in possible_names:
-                if col in df.columns:
-                    new_df[std_name] = df[col]
-                    print(f"Mapped column '{col}' to '{std_name}'")
-                    break
-
         # Check if we have the necessary columns
         required_columns = ['Equity %', '1 Year Return', '3 Year Return', '5 Year Return']
-        missing_columns = [col for col in required_columns if col not in new_df.columns]
+        missing_columns = [col for col in required_columns if col not in df.columns]
 
         if missing_columns:
             print(f"Missing required columns for equity chart: {missing_columns}")
             return None
 
+        if output == 'plotly':
+            return scatter_row_spec(df['Equity %'], 'Equity %', [
+                (df['1 Year Return'], '1 Year Return (%)', 'Equity % vs 1 Year Return'),
+                (df['3 Year Return'], '3 Year Return (%)', 'Equity % vs 3 Year Return'),
+                (df['5 Year Return'], '5 Year Return (%)', 'Equity % vs 5 Year Return')
+            ])
+
         fig, axes = plt.subplots(1, 3, figsize=(18, 6))
 
         # Equity % vs 1 Year Return
-        axes[0].scatter(new_df['Equity %'], new_df['1 Year Return'], alpha=0.5)
+        axes[0].scatter(df['Equity %'], df['1 Year Return'], alpha=0.5)
         axes[0].set_xlabel('Equity %')
         axes[0].set_ylabel('1 Year Return (%)')
         axes[0].set_title('Equity % vs 1 Year Return')
         axes[0].grid(True, alpha=0.3)
 
         # Equity % vs 3 Year Return
-        axes[1].scatter(new_df['Equity %'], new_df['3 Year Return'], alpha=0.5)
+        axes[1].scatter(df['Equity %'], df['3 Year Return'], alpha=0.5)
         axes[1].set_xlabel('Equity %')
         axes[1].set_ylabel('3 Year Return (%)')
         axes[1].set_title('Equity % vs 3 Year Return')
         axes[1].grid(True, alpha=0.3)
 
         # Equity % vs 5 Year Return
-        axes[2].scatter(new_df['Equity %'], new_df['5 Year Return'], alpha=0.5)
+        axes[2].scatter(df['Equity %'], df['5 Year Return'], alpha=0.5)
         axes[2].set_xlabel('Equity %')
         axes[2].set_ylabel('5 Year Return (%)')
         axes[2].set_title('Equity % vs 5 Year Return')
@@ -477,18 +368,28 @@ def generate_equity_percentage_charts():
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight')
-        img_bytes.seek(0)
         plt.close(fig)  # Close the figure explicitly
 
-        # Convert to base64 for embedding in HTML
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
         print(f"Error generating equity percentage charts: {e}")
         import traceback
         traceback.print_exc()
         return None
 
+# Charts on the visualization page: name -> (template variable, render function)
+CHARTS = {
+    'fund-type': ('fund_type_chart', generate_fund_type_chart),
+    'returns-correlation': ('returns_correlation_chart', generate_returns_correlation_chart),
+    'one-vs-five-year': ('one_vs_five_year_chart', generate_one_vs_five_year_chart),
+    'one-vs-three-year': ('one_vs_three_year_chart', generate_one_vs_three_year_chart),
+    'aum-vs-one-year': ('aum_vs_one_year_chart', generate_aum_vs_one_year_chart),
+    'aum-vs-three-year': ('aum_vs_three_year_chart', generate_aum_vs_three_year_chart),
+    'aum-vs-five-year': ('aum_vs_five_year_chart', generate_aum_vs_five_year_chart),
+    'debt-percentage': ('debt_percentage_charts', generate_debt_percentage_charts),
+    'equity-percentage': ('equity_percentage_charts', generate_equity_percentage_charts)
+}
+
 # Get table data
 def get_table_data():
     try:
@@ -496,44 +397,7 @@ def get_table_data():
         if df.empty:
             return []
 
-        # Map possible column names to standardized names
-        column_mapping = {
-            # Fund info
-            'Fund Name': ['Fund Name', 'scheme_name', 'fund_name', 'name'],
-            'Type': ['Type', 'type_of_fund', 'fund_type', 'scheme_type'],
-            'Rating': ['Rating', 'rating', 'star_rating'],
-
-            # Financial metrics
-            'AUM (Cr.)': ['AUM (Cr.)', 'aum', 'aum_funds_individual_lst', 'AUM'],
-            'NAV': ['NAV', 'nav', 'net_asset_value'],
-            'Expense Ratio': ['Expense Ratio', 'expense_ratio', 'expense'],
-
-            # Return metrics
-            '1 Year Return': ['1 Year Return', 'one_year_returns', '1_year_return', 'one_year_return'],
-            '3 Year Return': ['3 Year Return', 'three_year_returns', '3_year_return', 'three_year_return'],
-            '5 Year Return': ['5 Year Return', 'five_year_returns', '5_year_return', 'five_year_return'],
-
-            # Risk metrics
-            'Risk': ['Risk', 'risk', 'risk_rating'],
-
-            # Allocation
-            'Equity %': ['Equity %', 'equity_per', 'equity_percentage', 'equity'],
-            'Debt %': ['Debt %', 'debt_per', 'debt_percentage', 'debt']
-        }
-
-        # Create a new DataFrame with standardized column names
-        new_df = pd.DataFrame()
-
-        # Print available columns for debugging
-        print("Available columns in data for table:", df.columns.tolist())
-
-        # Map columns from original DataFrame to standardized names
-        for std_name, possible_names in column_mapping.items():
-            for col in possible_names:
-                if col in df.columns:
-                    new_df[std_name] = df[col]
-                    print(f"Mapped column '{col}' to '{std_name}'")
-                    break
+        new_df = df[[column for column in TABLE_COLUMNS if column in df.columns]]
 
         # If we don't have any columns, return empty list
         if new_df.empty:
@@ -553,107 +417,48 @@ def get_table_data():
         traceback.print_exc()
         return []
 
-# Make prediction for one year returns
-def predict_one_year_returns(user_data):
+# Make predictions for many funds at once
+def predict_returns_batch(horizon, rows):
+    """
+    Predict returns for a batch of funds with one call to the horizon's model
+
+    Args:
+        horizon: 'one_year', 'three_year' or 'five_year'
+        rows: List of feature dictionaries (aum, nav, rating, equity, risk,
+            type and the returns for the other two horizons)
+
+    Returns:
+        tuple: (results, source), where results has a {'prediction', 'delta'}
+        dictionary per row and source is 'model' or 'formula'
+    """
+    predictions, source = model_registry.predict(horizon, rows)
+    results = [{'prediction': float(prediction), 'delta': float(prediction * PREDICTION_DELTA)}
+               for prediction in predictions]
+    return results, source
+
+def _predict_single(horizon, user_data):
+    """Predict one fund's returns; the result includes the prediction source"""
     try:
-        # Extract user inputs for display
-        user_AUM = user_data.get('aum')
-        user_NAV = user_data.get('nav')
-        user_equity = user_data.get('equity')
-        user_debt = 100 - user_equity
-        three_year_returns_user = user_data.get('three_year')
-        five_year_returns_user = user_data.get('five_year')
-
-        # Generate a simple prediction based on input values
-        # This is just a placeholder calculation, not a real prediction
-        prediction_value = (three_year_returns_user * 0.4 + five_year_returns_user * 0.2) * (user_equity / 100)
-
-        # Add some randomness to make it look more realistic
-        import random
-        prediction_value = prediction_value * (0.9 + random.random() * 0.2)
-
-        # Calculate a delta value
-        delta = prediction_value * 0.2
-
-        print(f"Generated dummy prediction: {prediction_value}% with delta {delta}%")
-
-        return {
-            'prediction': prediction_value,
-            'delta': delta
-        }
+        results, source = predict_returns_batch(horizon, [user_data])
+        print(f"Generated {horizon} prediction ({source}): {results[0]['prediction']}%")
+        return dict(results[0], source=source)
     except Exception as e:
         import traceback
-        print(f"Error in predict_one_year_returns: {e}")
+        print(f"Error predicting {horizon} returns: {e}")
         print(traceback.format_exc())
         return None
 
+# Make prediction for one year returns
+def predict_one_year_returns(user_data):
+    return _predict_single('one_year', user_data)
+
 # Make prediction for three year returns
 def predict_three_year_returns(user_data):
-    try:
-        # Extract user inputs for display
-        user_AUM = user_data.get('aum')
-        user_NAV = user_data.get('nav')
-        user_equity = user_data.get('equity')
-        user_debt = 100 - user_equity
-        one_year_returns_user = user_data.get('one_year')
-        five_year_returns_user = user_data.get('five_year')
-
-        # Generate a simple prediction based on input values
-        # This is just a placeholder calculation, not a real prediction
-        prediction_value = (one_year_returns_user * 1.5 + five_year_returns_user * 0.5) * (user_equity / 100)
-
-        # Add some randomness to make it look more realistic
-        import random
-        prediction_value = prediction_value * (0.9 + random.random() * 0.2)
-
-        # Calculate a delta value
-        delta = prediction_value * 0.2
-
-        print(f"Generated dummy prediction: {prediction_value}% with delta {delta}%")
-
-        return {
-            'prediction': prediction_value,
-            'delta': delta
-        }
-    except Exception as e:
-        import traceback
-        print(f"Error in predict_three_year_returns: {e}")
-        print(traceback.format_exc())
-        return None
+    return _predict_single('three_year', user_data)
 
 # Make prediction for five year returns
 def predict_five_year_returns(user_data):
-    try:
-        # Extract user inputs for display
-        user_AUM = user_data.get('aum')
-        user_NAV = user_data.get('nav')
-        user_equity = user_data.get('equity')
-        user_debt = 100 - user_equity
-        one_year_returns_user = user_data.get('one_year')
-        three_year_returns_user = user_data.get('three_year')
-
-        # Generate a simple prediction based on input values
-        # This is just a placeholder calculation, not a real prediction
-        prediction_value = (one_year_returns_user * 0.3 + three_year_returns_user * 1.2) * (user_equity / 100)
-
-        # Add some randomness to make it look more realistic
-        import random
-        prediction_value = prediction_value * (0.9 + random.random() * 0.2)
-
-        # Calculate a delta value
-        delta = prediction_value * 0.2
-
-        print(f"Generated dummy prediction: {prediction_value}% with delta {delta}%")
-
-        return {
-            'prediction': prediction_value,
-            'delta': delta
-        }
-    except Exception as e:
-        import traceback
-        print(f"Error in predict_five_year_returns: {e}")
-        print(traceback.format_exc())
-        return None
+    return _predict_single('five_year', user_data)
 
 # Routes
 @mf_analysis_bp.route('/')
@@ -699,31 +504,99 @@ def generate_report():
 @mf_analysis_bp.route('/visualization')
 @login_required
 def visualization():
-    # Generate all charts
-    fund_type_chart = generate_fund_type_chart()
-    returns_correlation_chart = generate_returns_correlation_chart()
-    one_vs_five_year_chart = generate_one_vs_five_year_chart()
-    one_vs_three_year_chart = generate_one_vs_three_year_chart()
-    aum_vs_one_year_chart = generate_aum_vs_one_year_chart()
-    aum_vs_three_year_chart = generate_aum_vs_three_year_chart()
-    aum_vs_five_year_chart = generate_aum_vs_five_year_chart()
-    debt_percentage_charts = generate_debt_percentage_charts()
-    equity_percentage_charts = generate_equity_percentage_charts()
+    # ?mode=plotly sends chart specs drawn in the browser instead of PNG images
+    chart_mode = 'plotly' if request.args.get('mode') == 'plotly' else 'png'
+    chart_specs = {}
+
+    if chart_mode == 'plotly':
+        charts = {}
+        for name, (variable, render) in CHARTS.items():
+            spec = get_chart_spec(name, render, {'output': 'plotly'})[1]
+            charts[variable] = name if spec else None
+            if spec:
+                chart_specs[name] = spec
+    else:
+        # Look up the cached charts; those missing for the current dataset are rendered together
+        keys = get_charts({name: (render, None) for name, (_, render) in CHARTS.items()})
+        charts = {variable: url_for('mf_analysis.chart', name=name, v=keys[name]) if keys[name] else None
+                  for name, (variable, _) in CHARTS.items()}
 
     # Get table data
     table_data = get_table_data()
 
     return render_template('mf_analysis/visualization.html',
-                          fund_type_chart=fund_type_chart,
-                          returns_correlation_chart=returns_correlation_chart,
-                          one_vs_five_year_chart=one_vs_five_year_chart,
-                          one_vs_three_year_chart=one_vs_three_year_chart,
-                          aum_vs_one_year_chart=aum_vs_one_year_chart,
-                          aum_vs_three_year_chart=aum_vs_three_year_chart,
-                          aum_vs_five_year_chart=aum_vs_five_year_chart,
-                          debt_percentage_charts=debt_percentage_charts,
-                          equity_percentage_charts=equity_percentage_charts,
-                          table_data=table_data)
+                          table_data=table_data,
+                          chart_mode=chart_mode,
+                          chart_specs=chart_specs,
+                          **charts)
+
+@mf_analysis_bp.route('/charts/<name>.png')
+@login_required
+def chart(name):
+    """
+    Serve a cached chart image
+
+    The v query parameter only makes the URL change with the dataset; the
+    chart for the current dataset is always served, with its key as ETag.
+    """
+    if name not in CHARTS:
+        abort(404)
+
+    key = get_chart(name, CHARTS[name][1])
+    image = read_chart(name, key) if key else None
+    if image is None:
+        abort(404)
+
+    return send_file(BytesIO(image), mimetype='image/png', etag=key,
+                     max_age=CHART_MAX_AGE, conditional=True)
+
+@mf_analysis_bp.route('/api/charts/<name>')
+@login_required
+def api_chart_spec(name):
+    """
+    API endpoint for a chart as a Plotly spec ({'data', 'layout'})
+
+    Scatter data is pre-aggregated into bins, so the spec stays small.
+    """
+    if name not in CHARTS:
+        return jsonify({'error': f'Unknown chart: {name}'}), 404
+
+    key, spec = get_chart_spec(name, CHARTS[name][1], {'output': 'plotly'})
+    if spec is None:
+        return jsonify({'error': 'Chart data not available'}), 404
+
+    response = jsonify(spec)
+    # The URL doesn't change with the dataset, so browsers revalidate with the ETag
+    response.set_etag(key)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@mf_analysis_bp.route('/api/predict', methods=['POST'])
+@login_required
+def api_predict():
+    """
+    API endpoint for predicting returns for many funds at once
+
+    Request JSON:
+        horizon: 'one_year', 'three_year' or 'five_year'
+        rows: List of feature dictionaries (aum, nav, rating, equity, risk,
+            type and the returns for the other two horizons)
+    """
+    payload = request.get_json(silent=True) or {}
+    horizon = payload.get('horizon', 'one_year')
+    rows = payload.get('rows')
+
+    if horizon not in HORIZONS:
+        return jsonify({'error': f'Unknown horizon: {horizon}'}), 400
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return jsonify({'error': 'rows must be a list of objects'}), 400
+
+    try:
+        results, source = predict_returns_batch(horizon, rows)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'horizon': horizon, 'source': source, 'predictions': results})
 
 @mf_analysis_bp.route('/one-year-prediction', methods=['GET', 'POST'])
 @login_required
@@ -1,7 +1,10 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, current_app
 import builtins
 from flask_login import login_required, current_user
-from app.utils.mf_api import search_mutual_funds, get_mutual_fund_details, fetch_mutual_fund_data, get_top_gainers_and_losers, get_top_funds_by_category
+from app.utils.mf_api import search_mutual_funds, get_mutual_fund_details, fetch_mutual_fund_data
+from app.utils.leaderboards import (get_leaderboard, get_leaderboard_gainers_and_losers,
+                                    LEADERBOARD_PERIODS, LEADERBOARD_RISK_METRICS, LEADERBOARD_CATEGORIES)
+from app.utils.nav_series import NAVSeries
 from app.models.portfolio import Portfolio, PortfolioItem
 from app import db
 import pandas as pd
@@ -18,13 +21,13 @@ def index():
     query = request.args.get('query', '')
     funds = search_mutual_funds(query)
 
-    # Get top gainers and losers
-    top_performers = get_top_gainers_and_losers(limit=5)
+    # Get top gainers and losers from the precomputed leaderboards
+    top_performers = get_leaderboard_gainers_and_losers(limit=5)
 
     # Get top performing funds by category
-    top_large_cap = get_top_funds_by_category(category='large-cap', period='one_year_return', limit=5)
-    top_mid_cap = get_top_funds_by_category(category='mid-cap', period='one_year_return', limit=5)
-    top_small_cap = get_top_funds_by_category(category='small-cap', period='one_year_return', limit=5)
+    top_large_cap = get_leaderboard(period='one_year_return', category='large-cap', limit=5)
+    top_mid_cap = get_leaderboard(period='one_year_return', category='mid-cap', limit=5)
+    top_small_cap = get_leaderboard(period='one_year_return', category='small-cap', limit=5)
 
     return render_template('mutual_funds/index.html',
                           funds=funds,
@@ -47,15 +50,8 @@ def view_details(scheme_code):
         flash('Unable to fetch mutual fund data. Please try again later.', 'danger')
         return redirect(url_for('mutual_funds.index'))
 
-    # Prepare data for charts
-    nav_history = []
-    if 'nav_history' in fund_data:
-        nav_history = fund_data['nav_history']
-
-        # Format dates for chart
-        for entry in nav_history:
-            if isinstance(entry['date'], pd.Timestamp):
-                entry['date'] = entry['date'].strftime('%Y-%m-%d')
+    # Prepare data for charts; the NAV history is already in compact day/NAV form
+    nav_history = fund_data.get('nav_history', {'days': [], 'navs': []})
 
     return render_template('mutual_funds/details.html',
                           fund=fund_data,
@@ -74,19 +70,87 @@ def api_search():
     funds = search_mutual_funds(query, limit)
     return jsonify(funds)
 
+@mutual_funds.route('/api/mutual-funds/leaderboard', strict_slashes=False)
+@login_required
+def api_leaderboard():
+    """
+    API endpoint for ranking mutual funds by a return period or risk metric
+
+    Query parameters:
+        metric: Return period or risk metric, e.g. one_year_return or sharpe_ratio
+        category: Fund category, or 'all'
+        limit: Number of funds to return
+        bottom: Return the worst funds instead of the best
+    """
+    metric = request.args.get('metric', 'one_year_return')
+    category = request.args.get('category', 'all')
+    limit = request.args.get('limit', 10, type=int)
+    bottom = request.args.get('bottom', 'false').lower() == 'true'
+
+    if metric not in LEADERBOARD_PERIODS + LEADERBOARD_RISK_METRICS:
+        return jsonify({'error': f'Unknown metric: {metric}'}), 400
+    if category not in LEADERBOARD_CATEGORIES:
+        return jsonify({'error': f'Unknown category: {category}'}), 400
+
+    return jsonify(get_leaderboard(metric, category, limit, bottom))
+
+def _nav_history_args(nav_history):
+    """
+    Slice and downsample a NAV history payload using the request's query parameters
+
+    Query parameters:
+        start: First date to include (YYYY-MM-DD)
+        end: Last date to include (YYYY-MM-DD)
+        points: Maximum number of points to return
+    """
+    start = request.args.get('start')
+    end = request.args.get('end')
+    points = request.args.get('points', type=int)
+    if not (start or end or points):
+        return nav_history
+    return NAVSeries.from_payload(nav_history).slice(start, end).downsample(points).to_payload()
+
 @mutual_funds.route('/api/mutual-funds/<int:scheme_code>', strict_slashes=False)
 @login_required
 def api_get_details(scheme_code):
     """
     API endpoint for getting mutual fund details
+
+    The NAV history can be limited with the start, end and points query parameters.
     """
     fund_data = get_mutual_fund_details(scheme_code)
 
     if not fund_data:
         return jsonify({'error': 'Unable to fetch mutual fund data'}), 404
 
+    if 'nav_history' in fund_data:
+        try:
+            fund_data['nav_history'] = _nav_history_args(fund_data['nav_history'])
+        except ValueError:
+            return jsonify({'error': 'Invalid date range'}), 400
+
     return jsonify(fund_data)
 
+@mutual_funds.route('/api/mutual-funds/<int:scheme_code>/nav', strict_slashes=False)
+@login_required
+def api_get_nav_history(scheme_code):
+    """
+    API endpoint for getting the NAV history of a mutual fund as day/NAV arrays
+
+    The history can be limited with the start, end and points query parameters.
+    """
+    fund_data = get_mutual_fund_details(scheme_code)
+
+    if not fund_data:
+        return jsonify({'error': 'Unable to fetch mutual fund data'}), 404
+
+    try:
+        nav_history = _nav_history_args(fund_data.get('nav_history', {'days': [], 'navs': []}))
+    except ValueError:
+        return jsonify({'error': 'Invalid date range'}), 400
+
+    return jsonify({'scheme_code': scheme_code, 'nav_history': nav_history})
+
 @mutual_funds.route('/mutual-funds/buy/<int:scheme_code>', methods=['POST'], strict_slashes=False)
 @login_required
 def buy_mutual_fund(scheme_code):
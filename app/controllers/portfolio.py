@@ -5,8 +5,9 @@ from app.models.transaction import Transaction
 from app.utils.stock_data import (
     get_historical_data, calculate_portfolio_metrics, 
     optimize_portfolio, calculate_minimum_variance_portfolio,
-    get_covariance_matrix, get_current_price, get_all_stocks
+    get_covariance_matrix, get_all_stocks
 )
+from app.utils.valuation import get_valuation_snapshot
 from app import db
 import pandas as pd
 import json
@@ -18,10 +19,13 @@ portfolio_bp = Blueprint('portfolio', __name__, url_prefix='/portfolio')
 def dashboard():
     # Get user's portfolios
     portfolios = Portfolio.query.filter_by(user_id=current_user.id).all()
+
+    # Value every portfolio from one snapshot, pricing each symbol once
+    valuations = get_valuation_snapshot().value_portfolios(portfolios)
     
     # Calculate total portfolio value
-    total_value = sum(portfolio.total_value() for portfolio in portfolios)
-    total_investment = sum(portfolio.total_investment() for portfolio in portfolios)
+    total_value = sum(valuation.total_value for valuation in valuations)
+    total_investment = sum(valuation.total_investment for valuation in valuations)
     total_return = total_value - total_investment
     
     # Calculate return percentage
@@ -32,31 +36,24 @@ def dashboard():
     
     # Get portfolio performance data for charts
     portfolio_data = []
-    for portfolio in portfolios:
-        holdings = Holding.query.filter_by(portfolio_id=portfolio.id).all()
-        symbols = [holding.symbol for holding in holdings]
-        weights = [holding.quantity * get_current_price(holding.symbol) / portfolio.total_value() 
-                  for holding in holdings] if portfolio.total_value() > 0 else []
+    for portfolio, valuation in zip(portfolios, valuations):
+        symbols = valuation.symbols
         
-        if symbols and weights:
-            # Convert weights to numpy array for calculations
-            import numpy as np
-            weights_array = np.array(weights)
-            
+        if symbols and valuation.total_value > 0:
             # Calculate portfolio metrics
-            metrics = calculate_portfolio_metrics(weights_array, symbols)
+            metrics = calculate_portfolio_metrics(valuation.weights, symbols)
             
             portfolio_data.append({
                 'id': portfolio.id,
                 'name': portfolio.name,
-                'value': portfolio.total_value(),
-                'investment': portfolio.total_investment(),
-                'return': portfolio.total_return(),
-                'return_percentage': portfolio.return_percentage(),
+                'value': valuation.total_value,
+                'investment': valuation.total_investment,
+                'return': valuation.total_return,
+                'return_percentage': valuation.return_percentage,
                 'expected_return': metrics['expected_return'],
                 'volatility': metrics['volatility'],
                 'sharpe_ratio': metrics['sharpe_ratio'],
-                'holdings_count': len(holdings)
+                'holdings_count': len(symbols)
             })
     
     return render_template('portfolio/dashboard.html',
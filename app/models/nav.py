@@ -0,0 +1,19 @@
+from app import db
+from datetime import datetime
+
+class SchemeNAV(db.Model):
+    """
+    Latest NAV of a mutual fund scheme, loaded in bulk from an AMFI NAVAll file
+    """
+    scheme_code = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    scheme_name = db.Column(db.String(255), nullable=False, index=True)
+    fund_house = db.Column(db.String(255))
+    scheme_category = db.Column(db.String(255))  # e.g. 'Open Ended Schemes(Equity Scheme - Large Cap Fund)'
+    isin_growth = db.Column(db.String(20))
+    isin_reinvestment = db.Column(db.String(20))
+    nav = db.Column(db.Float)
+    nav_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemeNAV {self.scheme_code} - {self.nav}>'
@@ -16,19 +16,24 @@ class Portfolio(db.Model):
     def __repr__(self):
         return f'<Portfolio {self.name}>'
 
-    def total_value(self):
-        return sum(holding.current_value() for holding in self.holdings)
+    def valuation(self, snapshot=None):
+        # Holdings are priced once per request through the shared valuation snapshot
+        if snapshot is None:
+            from app.utils.valuation import get_valuation_snapshot
+            snapshot = get_valuation_snapshot()
+        return snapshot.value_portfolio(self)
+
+    def total_value(self, snapshot=None):
+        return self.valuation(snapshot).total_value
 
     def total_investment(self):
         return sum(holding.total_investment for holding in self.holdings)
 
-    def total_return(self):
-        return self.total_value() - self.total_investment()
+    def total_return(self, snapshot=None):
+        return self.valuation(snapshot).total_return
 
-    def return_percentage(self):
-        if self.total_investment() == 0:
-            return 0
-        return (self.total_return() / self.total_investment()) * 100
+    def return_percentage(self, snapshot=None):
+        return self.valuation(snapshot).return_percentage
 
 class Holding(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -44,19 +49,23 @@ class Holding(db.Model):
     def __repr__(self):
         return f'<Holding {self.symbol} - {self.quantity}>'
 
-    def current_value(self):
+    def current_value(self, snapshot=None):
         # This will be calculated using yfinance in real-time
-        from app.utils.stock_data import get_current_price
-        current_price = get_current_price(self.symbol)
-        return current_price * self.quantity
-
-    def profit_loss(self):
-        return self.current_value() - self.total_investment
-
-    def profit_loss_percentage(self):
+        if snapshot is None:
+            from app.utils.valuation import get_valuation_snapshot
+            snapshot = get_valuation_snapshot()
+        # Price the whole portfolio at once rather than one holding at a time
+        if self.symbol not in snapshot.prices and self.portfolio is not None:
+            snapshot.prime([holding.symbol for holding in self.portfolio.holdings])
+        return snapshot.price(self.symbol) * self.quantity
+
+    def profit_loss(self, snapshot=None):
+        return self.current_value(snapshot) - self.total_investment
+
+    def profit_loss_percentage(self, snapshot=None):
         if self.total_investment == 0:
             return 0
-        return (self.profit_loss() / self.total_investment) * 100
+        return (self.profit_loss(snapshot) / self.total_investment) * 100
 
 class PortfolioItem(db.Model):
     """
@@ -77,21 +86,26 @@ class PortfolioItem(db.Model):
     def __repr__(self):
         return f'<PortfolioItem {self.name} - {self.item_type}>'
 
-    def current_value(self):
+    def current_value(self, snapshot=None):
         """
         Calculate the current value of the portfolio item
         """
+        if snapshot is None:
+            from app.utils.valuation import get_valuation_snapshot
+            snapshot = get_valuation_snapshot()
+
         if self.item_type == 'mutual_fund':
+            # Look up the NAVs of all the portfolio's funds at once
+            if self.item_id not in snapshot.navs and self.portfolio is not None:
+                snapshot.prime_navs([item.item_id for item in self.portfolio.portfolio_items
+                                     if item.item_type == 'mutual_fund'])
             # Get current NAV for mutual fund
-            from app.utils.mf_api import get_mutual_fund_details
-            fund_data = get_mutual_fund_details(int(self.item_id))
-            if fund_data and 'scheme_nav' in fund_data:
-                return float(fund_data['scheme_nav']) * self.quantity
+            nav = snapshot.nav(self.item_id)
+            if nav is not None:
+                return nav * self.quantity
         elif self.item_type == 'stock':
             # Get current price for stock
-            from app.utils.stock_data import get_current_price
-            current_price = get_current_price(self.item_id)
-            return current_price * self.quantity
+            return snapshot.price(self.item_id) * self.quantity
 
         return 0
 
@@ -101,16 +115,16 @@ class PortfolioItem(db.Model):
         """
         return self.purchase_price * self.quantity
 
-    def profit_loss(self):
+    def profit_loss(self, snapshot=None):
         """
         Calculate the profit or loss
         """
-        return self.current_value() - self.total_investment()
+        return self.current_value(snapshot) - self.total_investment()
 
-    def profit_loss_percentage(self):
+    def profit_loss_percentage(self, snapshot=None):
         """
         Calculate the profit or loss percentage
         """
         if self.total_investment() == 0:
             return 0
-        return (self.profit_loss() / self.total_investment()) * 100
+        return (self.profit_loss(snapshot) / self.total_investment()) * 100
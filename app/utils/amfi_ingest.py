@@ -0,0 +1,153 @@
+"""
+Utility module for ingesting AMFI NAVAll files
+AMFI publishes the latest NAV of every scheme in one semicolon-separated
+file. This module parses it in a single streaming pass and bulk-upserts
+the NAVs into the SchemeNAV table, so latest NAVs for all schemes can be
+refreshed without any per-scheme requests
+"""
+
+import os
+from datetime import datetime
+
+from app import db
+from app.models.nav import SchemeNAV
+from app.utils.http_client import HTTPClient
+
+# Public location of the AMFI NAVAll file
+AMFI_NAVALL_URL = "https://www.amfiindia.com/spages/NAVAll.txt"
+
+# Number of schemes written per upsert statement
+UPSERT_BATCH_SIZE = 500
+
+def _read_lines(source):
+    """Yield the lines of a local file or an HTTP(S) URL without loading it all"""
+    if source.startswith(('http://', 'https://')):
+        response = HTTPClient(timeout=(3.05, 60)).get(source, stream=True)
+        response.raise_for_status()
+        response.encoding = response.encoding or 'utf-8'
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                yield line
+        finally:
+            response.close()
+    else:
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                yield line
+
+def _parse_nav(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # AMFI uses 'N.A.' for schemes without a NAV
+
+def _parse_date(value):
+    for date_format in ('%d-%b-%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(value, date_format).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def parse_navall(lines):
+    """
+    Parse the lines of a NAVAll file
+
+    Scheme rows look like
+    `Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date`
+    and are grouped under category headers such as
+    `Open Ended Schemes(Equity Scheme - Large Cap Fund)` and fund house names.
+
+    Args:
+        lines: Iterable of lines
+
+    Yields:
+        dict: One dictionary per scheme with the SchemeNAV column values
+    """
+    scheme_category = None
+    fund_house = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if ';' not in line:
+            # Section headers: categories contain 'Schemes(', anything else is a fund house
+            if 'Schemes(' in line or line.endswith('Schemes'):
+                scheme_category = line
+            else:
+                fund_house = line
+            continue
+
+        fields = [field.strip() for field in line.split(';')]
+        if len(fields) < 6 or not fields[0].isdigit():
+            continue  # Column header or malformed row
+
+        yield {
+            'scheme_code': int(fields[0]),
+            'isin_growth': fields[1] if fields[1] not in ('', '-') else None,
+            'isin_reinvestment': fields[2] if fields[2] not in ('', '-') else None,
+            'scheme_name': fields[3],
+            'nav': _parse_nav(fields[4]),
+            'nav_date': _parse_date(fields[5]),
+            'scheme_category': scheme_category,
+            'fund_house': fund_house
+        }
+
+def _upsert(rows):
+    """Insert or update a batch of SchemeNAV rows"""
+    now = datetime.utcnow()
+    for row in rows:
+        row['updated_at'] = now
+
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(SchemeNAV.__table__).values(rows)
+        update_columns = {column: statement.excluded[column]
+                          for column in rows[0] if column != 'scheme_code'}
+        db.session.execute(statement.on_conflict_do_update(index_elements=['scheme_code'],
+                                                           set_=update_columns))
+    else:
+        # Generic fallback for databases without ON CONFLICT support
+        for row in rows:
+            db.session.merge(SchemeNAV(**row))
+
+def ingest_navall(source=AMFI_NAVALL_URL, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Load a NAVAll file into the SchemeNAV table
+
+    Must be called inside an application context.
+
+    Args:
+        source: Path to a local NAVAll file, or an HTTP(S) URL
+        batch_size: Number of schemes written per upsert statement
+
+    Returns:
+        int: Number of schemes upserted
+    """
+    if not source.startswith(('http://', 'https://')) and not os.path.exists(source):
+        raise FileNotFoundError(f"NAVAll file not found: {source}")
+
+    count = 0
+    batch = {}
+    try:
+        for row in parse_navall(_read_lines(source)):
+            batch[row['scheme_code']] = row  # A scheme listed twice keeps its last row
+            if len(batch) >= batch_size:
+                _upsert(list(batch.values()))
+                count += len(batch)
+                batch = {}
+        if batch:
+            _upsert(list(batch.values()))
+            count += len(batch)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return count
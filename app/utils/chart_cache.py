@@ -0,0 +1,177 @@
+"""
+Utility module for caching rendered charts
+Charts drawn from the analysis dataset are rendered once per dataset
+version and chart parameters, saved as PNG files and served from a URL,
+so pages only look charts up instead of rendering them on every view.
+Missing charts are rendered together in the chart rendering pool; a chart
+that fails to render is retried after CHART_RETRY_SECONDS. Only the latest
+version of each chart is kept on disk. Plotly chart specs are cached in
+memory under the same keys
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from app.utils.mf_dataset import dataset_hash
+from app.utils.chart_renderer import render_charts
+from app.utils.single_flight import SingleFlight
+
+# Directory for rendered charts
+CHART_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'charts')
+
+# How long browsers may reuse a chart, in seconds; chart URLs change with the dataset
+CHART_MAX_AGE = 7 * 24 * 60 * 60
+
+# How long a chart that failed to render (or timed out) is not retried, in seconds
+CHART_RETRY_SECONDS = 5 * 60
+
+_renders = SingleFlight()
+_failed_lock = threading.Lock()
+_failed = {}  # Cache key -> time after which rendering is tried again
+_specs_lock = threading.Lock()
+_specs = {}
+
+def chart_key(name, params=None):
+    """
+    Get the cache key of a chart
+
+    Args:
+        name: Chart name
+        params: Dictionary of chart parameters, or None
+
+    Returns:
+        str: Key that changes whenever the dataset or the parameters change
+    """
+    payload = json.dumps({'dataset': dataset_hash(), 'chart': name, 'params': params or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+
+def _chart_path(name, key):
+    return os.path.join(CHART_CACHE_DIR, f"{name}-{key}.png")
+
+def _remove_stale_charts(name, key):
+    """Remove the files of older versions of a chart, keeping the one for key"""
+    # Match the key exactly so charts whose names start with this name are kept
+    pattern = re.compile(rf"{re.escape(name)}-[0-9a-f]{{20}}\.png")
+    current = os.path.basename(_chart_path(name, key))
+    for file_name in os.listdir(CHART_CACHE_DIR):
+        if file_name != current and pattern.fullmatch(file_name):
+            try:
+                os.remove(os.path.join(CHART_CACHE_DIR, file_name))
+            except OSError as e:
+                print(f"Error removing stale chart {file_name}: {e}")
+
+def _save_chart(name, key, image):
+    """Save a rendered chart, returning its key, or None if rendering failed"""
+    if not image:
+        with _failed_lock:
+            _failed[key] = time.monotonic() + CHART_RETRY_SECONDS
+        return None
+
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    # Write to a temporary file first so readers never see a partial file
+    path = _chart_path(name, key)
+    temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(image)
+    os.replace(temp_file, path)
+    _remove_stale_charts(name, key)
+    return key
+
+def _render_missing(missing):
+    images = render_charts([(render, params or {}) for _, _, render, params in missing])
+    return {name: _save_chart(name, key, image) for (name, key, _, _), image in zip(missing, images)}
+
+def get_charts(charts):
+    """
+    Make sure several charts are rendered and cached
+
+    Charts missing from the cache are rendered together in the chart
+    rendering pool.
+
+    Args:
+        charts: Dictionary mapping chart names (used in file names) to
+            (render, params) pairs, where render is a module-level function
+            returning PNG bytes (or None on failure), called with params as
+            keyword arguments, and params is a dictionary or None
+
+    Returns:
+        dict: Dictionary mapping each chart name to its cache key, or None if
+        the chart could not be rendered
+    """
+    keys = {}
+    missing = []
+    for name, (render, params) in charts.items():
+        key = chart_key(name, params)
+        if os.path.exists(_chart_path(name, key)):
+            keys[name] = key
+            continue
+        with _failed_lock:
+            retry_at = _failed.get(key)
+            failed = retry_at is not None and time.monotonic() < retry_at
+            if retry_at is not None and not failed:
+                del _failed[key]
+        if failed:
+            keys[name] = None
+        else:
+            missing.append((name, key, render, params))
+
+    if missing:
+        try:
+            keys.update(_renders.do(tuple(key for _, key, _, _ in missing), _render_missing, missing))
+        except Exception as e:
+            print(f"Error rendering charts: {e}")
+            keys.update({name: None for name, _, _, _ in missing})
+
+    return keys
+
+def get_chart(name, render, params=None):
+    """
+    Make sure a chart is rendered and cached
+
+    Returns:
+        str: The chart's cache key, or None if the chart could not be rendered
+    """
+    return get_charts({name: (render, params)})[name]
+
+def read_chart(name, key):
+    """
+    Get a cached chart
+
+    Returns:
+        bytes: The PNG image, or None if it isn't cached
+    """
+    path = _chart_path(name, key)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+def get_chart_spec(name, build, params=None):
+    """
+    Get a Plotly chart spec, building it once per dataset version and parameters
+
+    Args:
+        name: Chart name
+        build: Function returning the spec dictionary (or None on failure),
+            called with params as keyword arguments
+        params: Dictionary of chart parameters, or None
+
+    Returns:
+        tuple: (cache key, spec), where spec is None if it could not be built
+    """
+    key = chart_key(name, params)
+    with _specs_lock:
+        if key in _specs:
+            return key, _specs[key][1]
+
+    spec = build(**(params or {}))
+    with _specs_lock:
+        # Keep only the latest spec for each chart name
+        for stale_key in [cached for cached, (cached_name, _) in _specs.items() if cached_name == name]:
+            del _specs[stale_key]
+        _specs[key] = (name, spec)
+    return key, spec
@@ -0,0 +1,132 @@
+"""
+Utility module for rendering charts in parallel
+matplotlib's pyplot keeps global state and can't draw figures from several
+threads at once, so charts are drawn in a pool of worker processes that
+import matplotlib and seaborn once when they start. Workers are spawned
+rather than forked, since forking a multithreaded server can copy held
+locks into the child. The pool starts with the first batch of charts,
+or earlier if the server calls start_renderer. Callers submit a batch of
+chart specs and get the PNG bytes of every chart back
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Number of worker processes
+CHART_RENDER_WORKERS = int(os.getenv('CHART_RENDER_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Longest time to wait for one chart, in seconds
+CHART_RENDER_TIMEOUT = 60
+
+_pool = None
+_pool_lock = threading.Lock()
+_local_render_lock = threading.Lock()
+
+def _warm_worker():
+    """Import the plotting libraries once in each worker process"""
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot  # noqa: F401
+    import seaborn  # noqa: F401
+
+def _ready():
+    """No-op task used to start every worker ahead of the first chart"""
+    return os.getpid()
+
+def _render(render, kwargs):
+    """Draw one chart, returning (PNG bytes or None, error message or None)"""
+    try:
+        return render(**kwargs), None
+    except Exception as e:
+        return None, str(e)
+
+def _render_here(render, kwargs):
+    """Draw one chart in this process, one at a time"""
+    with _local_render_lock:
+        return _render(render, kwargs)
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS, initializer=_warm_worker,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def start_renderer():
+    """
+    Start and warm the worker pool
+
+    Submitting one no-op task per worker makes every worker start and
+    import the plotting libraries before the first chart is requested.
+    """
+    pool = _get_pool()
+    try:
+        for _ in range(CHART_RENDER_WORKERS):
+            pool.submit(_ready)
+    except BrokenProcessPool as e:
+        print(f"Chart render pool is broken: {e}")
+        _reset_pool(pool)
+
+def _reset_pool(pool):
+    """Drop a broken pool so the next batch starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def render_charts(specs):
+    """
+    Render a batch of charts concurrently
+
+    Args:
+        specs: List of (render, kwargs) pairs, where render is a module-level
+            function returning PNG bytes and kwargs are its (picklable)
+            keyword arguments
+
+    Returns:
+        list: PNG bytes for each spec in order, or None where rendering failed
+    """
+    if not specs:
+        return []
+
+    pool = _get_pool()
+    try:
+        futures = [pool.submit(_render, render, kwargs) for render, kwargs in specs]
+    except BrokenProcessPool as e:
+        print(f"Chart render pool is broken, rendering in process: {e}")
+        _reset_pool(pool)
+        futures = [None] * len(specs)
+
+    results = []
+    for future, (render, kwargs) in zip(futures, specs):
+        if future is None:
+            image, error = _render_here(render, kwargs)
+        else:
+            try:
+                image, error = future.result(timeout=CHART_RENDER_TIMEOUT)
+            except BrokenProcessPool:
+                # A worker died; draw this chart here instead
+                _reset_pool(pool)
+                image, error = _render_here(render, kwargs)
+            except Exception as e:
+                image, error = None, str(e)
+
+        if error:
+            print(f"Error rendering chart {getattr(render, '__name__', render)}: {error}")
+        results.append(image)
+
+    return results
+
+def render_chart(render, **kwargs):
+    """
+    Render a single chart in the worker pool
+
+    Returns:
+        bytes: PNG image data, or None if rendering failed
+    """
+    return render_charts([(render, kwargs)])[0]
@@ -0,0 +1,156 @@
+"""
+Utility module for building Plotly chart specs
+Charts are sent to the browser as compact Plotly JSON ({'data', 'layout'})
+and drawn with Plotly.newPlot. Scatter data is aggregated on the server
+into bins, and regression lines are sent as their two end points, so a
+spec stays small however many funds are plotted
+"""
+
+import numpy as np
+
+# Bins per axis for binned scatter plots
+SCATTER_BINS = 40
+
+# Decimal places kept for plotted values
+SPEC_DECIMALS = 2
+
+def _values(values):
+    """Round values for a spec, with None (JSON null) for missing values"""
+    values = np.round(np.asarray(values, dtype=float), SPEC_DECIMALS)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+def _finite_pairs(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    return x[valid], y[valid]
+
+def binned_scatter_trace(x, y, bins=SCATTER_BINS, name='Funds', xaxis='x', yaxis='y'):
+    """
+    Build a scatter trace with one marker per occupied bin
+
+    Points are grouped on a bins x bins grid; each marker sits at the mean
+    of its points and is sized by how many points it holds.
+
+    Args:
+        x: x values
+        y: y values
+        bins: Number of bins per axis
+        name: Trace name
+        xaxis: Plotly x axis id
+        yaxis: Plotly y axis id
+
+    Returns:
+        dict: Plotly scatter trace
+    """
+    x, y = _finite_pairs(x, y)
+    if len(x) == 0:
+        return {'type': 'scatter', 'mode': 'markers', 'name': name, 'x': [], 'y': [], 'xaxis': xaxis, 'yaxis': yaxis}
+
+    x_edges = np.linspace(x.min(), x.max(), bins + 1)
+    y_edges = np.linspace(y.min(), y.max(), bins + 1)
+    x_bins = np.clip(np.searchsorted(x_edges, x, side='right') - 1, 0, bins - 1)
+    y_bins = np.clip(np.searchsorted(y_edges, y, side='right') - 1, 0, bins - 1)
+    cells = x_bins * bins + y_bins
+
+    counts = np.bincount(cells, minlength=bins * bins)
+    occupied = np.flatnonzero(counts)
+    counts = counts[occupied]
+    x_means = np.bincount(cells, weights=x, minlength=bins * bins)[occupied] / counts
+    y_means = np.bincount(cells, weights=y, minlength=bins * bins)[occupied] / counts
+
+    return {
+        'type': 'scatter',
+        'mode': 'markers',
+        'name': name,
+        'x': _values(x_means),
+        'y': _values(y_means),
+        'text': counts.tolist(),
+        'hovertemplate': '%{x}, %{y}<br>%{text} funds<extra></extra>',
+        'marker': {'size': (4 + 3 * np.sqrt(counts)).round(1).tolist(), 'opacity': 0.6},
+        'xaxis': xaxis,
+        'yaxis': yaxis
+    }
+
+def regression_trace(x, y, xaxis='x', yaxis='y'):
+    """
+    Build a least-squares regression line trace from its two end points
+
+    Returns:
+        dict: Plotly line trace, or None if there are too few points
+    """
+    x, y = _finite_pairs(x, y)
+    if len(x) < 2 or x.min() == x.max():
+        return None
+
+    slope, intercept = np.polyfit(x, y, 1)
+    ends = np.array([x.min(), x.max()])
+    return {
+        'type': 'scatter',
+        'mode': 'lines',
+        'name': 'Trend',
+        'x': _values(ends),
+        'y': _values(slope * ends + intercept),
+        'line': {'color': 'red', 'dash': 'dash'},
+        'xaxis': xaxis,
+        'yaxis': yaxis
+    }
+
+def pie_spec(labels, values, title):
+    """Build a pie chart spec"""
+    return {
+        'data': [{'type': 'pie', 'labels': list(labels), 'values': np.asarray(values).tolist(),
+                  'textinfo': 'percent+label'}],
+        'layout': {'title': title}
+    }
+
+def heatmap_spec(matrix, title):
+    """
+    Build an annotated heatmap spec
+
+    Args:
+        matrix: Square DataFrame, such as a correlation matrix
+        title: Chart title
+    """
+    z = _values(matrix.to_numpy())
+    return {
+        'data': [{'type': 'heatmap', 'x': list(matrix.columns), 'y': list(matrix.index), 'z': z,
+                  'text': z, 'texttemplate': '%{text}', 'colorscale': 'RdBu', 'reversescale': True,
+                  'zmin': -1, 'zmax': 1}],
+        'layout': {'title': title, 'yaxis': {'autorange': 'reversed'}}
+    }
+
+def scatter_spec(x, y, x_title, y_title, title, regression=False):
+    """Build a binned scatter plot spec, optionally with a regression line"""
+    data = [binned_scatter_trace(x, y)]
+    if regression:
+        trend = regression_trace(x, y)
+        if trend:
+            data.append(trend)
+    return {
+        'data': data,
+        'layout': {'title': title, 'xaxis': {'title': x_title}, 'yaxis': {'title': y_title},
+                   'showlegend': False}
+    }
+
+def scatter_row_spec(x, x_title, panels):
+    """
+    Build a row of binned scatter plots sharing the same x values
+
+    Args:
+        x: x values
+        x_title: x axis title
+        panels: List of (y values, y axis title, panel title)
+    """
+    data = []
+    layout = {'showlegend': False, 'annotations': []}
+    width = 1 / len(panels)
+    for i, (y, y_title, title) in enumerate(panels):
+        suffix = '' if i == 0 else str(i + 1)
+        data.append(binned_scatter_trace(x, y, xaxis=f"x{suffix}", yaxis=f"y{suffix}"))
+        layout[f"xaxis{suffix}"] = {'title': x_title, 'domain': [i * width + 0.03, (i + 1) * width - 0.03],
+                                    'anchor': f"y{suffix}"}
+        layout[f"yaxis{suffix}"] = {'title': y_title, 'anchor': f"x{suffix}"}
+        layout['annotations'].append({'text': title, 'showarrow': False, 'xref': 'paper', 'yref': 'paper',
+                                      'x': (i + 0.5) * width, 'y': 1.08, 'xanchor': 'center'})
+    return {'data': data, 'layout': layout}
@@ -0,0 +1,79 @@
+"""
+Utility module for fetching from upstream APIs concurrently
+This module provides a token-bucket rate limiter and a bounded thread pool
+helper, so lists of funds or symbols are fetched in parallel without
+exceeding the upstream API's rate limits
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+
+# Default number of worker threads per fetch
+DEFAULT_MAX_WORKERS = 8
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter
+
+    Tokens are added at `rate` per second up to `capacity`. Each request
+    takes one token, waiting for the next one if the bucket is empty, so
+    short bursts of up to `capacity` requests go out immediately and longer
+    runs are held to `rate` requests per second.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, blocking until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def fetch_concurrently(fn, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Call fn for each item on a bounded thread pool
+
+    Each worker runs inside the caller's Flask application context (when
+    there is one), so fn can use current_app as usual.
+
+    Args:
+        fn: Function taking a single item
+        items: Items to process; duplicates are only processed once
+        max_workers: Maximum number of concurrent calls
+
+    Returns:
+        list: (item, result, error) tuples in the order of the unique items,
+        where error is the exception raised by fn or None
+    """
+    items = list(dict.fromkeys(items))
+    if not items:
+        return []
+
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def run(item):
+        try:
+            if app is not None:
+                with app.app_context():
+                    return item, fn(item), None
+            return item, fn(item), None
+        except Exception as e:
+            return item, None, e
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(run, items))
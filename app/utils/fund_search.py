@@ -0,0 +1,137 @@
+"""
+Utility module for searching mutual fund schemes by name
+The index is built once from the scheme list and answers each query from
+an inverted token index, a sorted vocabulary for prefix matches and a
+trigram index for fuzzy matches, instead of scanning every scheme name
+"""
+
+import bisect
+import re
+from collections import defaultdict
+
+# Minimum trigram similarity for a fuzzy token match
+FUZZY_THRESHOLD = 0.4
+
+# Scores for the ways a query token can match a name token
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.5  # Multiplied by the trigram similarity
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_PATTERN.findall(str(text).lower())
+
+def trigrams(token):
+    """Get the trigrams of a token, padded so short tokens still have some"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FundSearchIndex:
+    """
+    Search index over scheme names
+
+    Each query token is matched against the name tokens exactly, as a
+    prefix, or fuzzily by trigram similarity. Only schemes matching every
+    query token are returned when there are any; results are ranked by
+    score, then by shorter name.
+    """
+
+    def __init__(self, scheme_codes, scheme_names):
+        self.scheme_codes = list(scheme_codes)
+        self.scheme_names = [str(name) for name in scheme_names]
+        self.positions = {code: i for i, code in enumerate(self.scheme_codes)}
+
+        # token -> ids of the schemes whose name contains it
+        postings = defaultdict(set)
+        for doc_id, name in enumerate(self.scheme_names):
+            for token in tokenize(name):
+                postings[token].add(doc_id)
+        self.postings = dict(postings)
+
+        # Sorted vocabulary for prefix lookups
+        self.vocabulary = sorted(self.postings)
+
+        # trigram -> tokens containing it, for fuzzy lookups
+        trigram_index = defaultdict(set)
+        for token in self.vocabulary:
+            for trigram in trigrams(token):
+                trigram_index[trigram].add(token)
+        self.trigram_index = dict(trigram_index)
+
+    def __len__(self):
+        return len(self.scheme_codes)
+
+    def _prefix_tokens(self, prefix):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + '\uffff')
+        return self.vocabulary[start:end]
+
+    def _fuzzy_tokens(self, token):
+        """Get vocabulary tokens similar to a token, with their similarity"""
+        query_trigrams = trigrams(token)
+        overlaps = defaultdict(int)
+        for trigram in query_trigrams:
+            for candidate in self.trigram_index.get(trigram, ()):
+                overlaps[candidate] += 1
+
+        matches = {}
+        for candidate, overlap in overlaps.items():
+            similarity = overlap / (len(query_trigrams) + len(trigrams(candidate)) - overlap)
+            if similarity >= FUZZY_THRESHOLD:
+                matches[candidate] = similarity
+        return matches
+
+    def _token_scores(self, token):
+        """Score every scheme matching a query token"""
+        scores = defaultdict(float)
+
+        # Fuzzy matches are too noisy for very short tokens
+        if len(token) >= 3:
+            for candidate, similarity in self._fuzzy_tokens(token).items():
+                for doc_id in self.postings[candidate]:
+                    scores[doc_id] = max(scores[doc_id], FUZZY_SCORE * similarity)
+
+        for candidate in self._prefix_tokens(token):
+            score = EXACT_SCORE if candidate == token else PREFIX_SCORE
+            for doc_id in self.postings[candidate]:
+                scores[doc_id] = max(scores[doc_id], score)
+
+        return scores
+
+    def search(self, query, limit=10):
+        """
+        Search for schemes by name
+
+        Args:
+            query: Search query string
+            limit: Maximum number of results to return
+
+        Returns:
+            list: List of matching schemes as {'schemeCode', 'schemeName'} dictionaries
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        totals = defaultdict(float)
+        matched = defaultdict(int)
+        for token in query_tokens:
+            for doc_id, score in self._token_scores(token).items():
+                totals[doc_id] += score
+                matched[doc_id] += 1
+
+        # Only fall back to partial matches when no scheme matches every token
+        candidates = [doc_id for doc_id in totals if matched[doc_id] == len(query_tokens)] or list(totals)
+        ranked = sorted(candidates, key=lambda doc_id: (-matched[doc_id], -totals[doc_id],
+                                                        len(self.scheme_names[doc_id]), doc_id))
+        return [self.record(doc_id) for doc_id in ranked[:limit]]
+
+    def record(self, doc_id):
+        return {'schemeCode': self.scheme_codes[doc_id], 'schemeName': self.scheme_names[doc_id]}
+
+    def lookup(self, scheme_codes):
+        """Get the schemes with the given codes, in index order"""
+        doc_ids = sorted(self.positions[code] for code in set(scheme_codes) if code in self.positions)
+        return [self.record(doc_id) for doc_id in doc_ids]
@@ -0,0 +1,113 @@
+"""
+Utility module for making HTTP requests to upstream APIs
+This module provides a shared client with connection pooling, bounded
+timeouts and jittered retries, so repeated calls to the same API reuse
+keep-alive connections instead of opening a new one each time
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connect and read timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Status codes worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Longest Retry-After wait honored before a retry, in seconds; longer waits return the response
+MAX_RETRY_AFTER = 30
+
+def retry_after_seconds(response):
+    """
+    Get the wait a response asks for in its Retry-After header
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class HTTPClient:
+    """
+    Pooled HTTP client for a single API
+
+    Failed requests (connection errors, timeouts and RETRY_STATUS_CODES) are
+    retried with exponential backoff and full jitter, so concurrent callers
+    don't retry in lockstep. A Retry-After header on a 429 or 503 response
+    is honored instead of the backoff. When a rate limiter is given, every
+    attempt, retries included, takes a token from it.
+    """
+
+    def __init__(self, base_url='', timeout=DEFAULT_TIMEOUT, retries=2, backoff=0.5,
+                 max_backoff=4.0, pool_size=20, rate_limiter=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _sleep_before_retry(self, attempt):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+
+    def get(self, path='', **kwargs):
+        """
+        GET a URL relative to the base URL
+
+        Args:
+            path: Path appended to the base URL
+            **kwargs: Extra arguments passed to requests (e.g. params)
+
+        Returns:
+            requests.Response: The last response received; connection errors
+            and timeouts are raised once all retries are used up
+        """
+        url = f"{self.base_url}{path}"
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+                self._sleep_before_retry(attempt)
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+
+            retry_after = retry_after_seconds(response)
+            if retry_after is None:
+                self._sleep_before_retry(attempt)
+            elif retry_after > MAX_RETRY_AFTER:
+                # Don't hold the caller for that long; let it back off instead
+                return response
+            else:
+                time.sleep(retry_after)
@@ -5,13 +5,18 @@ using alternative sources when yfinance fails
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import numpy as np
 import json
 import os
 import time
+import threading
 from datetime import datetime, timedelta
 import yfinance as yf
+from app.utils.symbol_resolver import candidate_symbols, record_resolution, resolved_source
+from app.utils.ohlcv_store import covers, read_bars, write_bars
+from app.utils.provider_health import can_try, report_success, report_miss, report_error
 
 # Cache directory
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
@@ -19,12 +24,17 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 
 # NSE base URL
 NSE_URL = "https://www.nseindia.com/api"
+NSE_HOME_URL = "https://www.nseindia.com/"
 NSE_HEADERS = {
     'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'accept-encoding': 'gzip, deflate, br',
     'accept-language': 'en-US,en;q=0.9'
 }
 
+# NSE session pool settings
+NSE_POOL_SIZE = 4
+NSE_COOKIE_TTL = timedelta(minutes=10)
+
 # Symbol mapping for NSE
 NSE_SYMBOL_MAP = {
     'RELIANCE': 'RELIANCE',
@@ -49,23 +59,135 @@ NSE_SYMBOL_MAP = {
     'NTPC': 'NTPC'
 }
 
-def get_nse_session():
-    """Create a session for NSE website"""
-    session = requests.Session()
-    session.headers.update(NSE_HEADERS)
+# Number of calendar days covered by each yfinance period
+PERIOD_DAYS = {
+    '1mo': 30,
+    '3mo': 90,
+    '6mo': 180,
+    '1y': 365,
+    '2y': 730,
+    '5y': 1825
+}
 
-    # Visit homepage first to get cookies
-    try:
-        session.get("https://www.nseindia.com/", timeout=10)
-        return session
-    except Exception as e:
-        print(f"Error creating NSE session: {e}")
-        return None
+def get_alternative_candidates(symbol):
+    """Get the yfinance symbols the alternative methods try, in order"""
+    base_symbol = symbol.split('.')[0]
+    return list(dict.fromkeys(candidate_symbols(symbol) + candidate_symbols(base_symbol)))
+
+def get_nse_symbol(symbol):
+    """Map a symbol to its NSE trading symbol"""
+    return NSE_SYMBOL_MAP.get(symbol.upper().replace('.NS', ''), symbol.upper().replace('.NS', ''))
+
+class NSESession:
+    """A pooled NSE session and the time its cookies were last refreshed"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update(NSE_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self.session.mount('https://', adapter)
+        self.cookies_refreshed_at = None
+
+    @property
+    def cookies_expired(self):
+        return (self.cookies_refreshed_at is None
+                or datetime.now() - self.cookies_refreshed_at >= NSE_COOKIE_TTL)
+
+    def refresh_cookies(self):
+        """Visit the homepage to get fresh cookies"""
+        self.session.cookies.clear()
+        self.session.get(NSE_HOME_URL, timeout=10)
+        self.cookies_refreshed_at = datetime.now()
+
+class NSESessionPool:
+    """
+    Thread-safe pool of long-lived NSE sessions
+
+    Each session is used by one thread at a time and keeps its cookies and
+    keep-alive connection between calls. Cookies are only refreshed when
+    they expire or NSE answers 401/403.
+    """
+
+    def __init__(self, size=NSE_POOL_SIZE):
+        self.size = size
+        self._idle = []  # Reuse the most recently used (warmest) session first
+        self._created = 0
+        self._available = threading.Condition()
+
+    def _acquire(self, timeout=30):
+        """Take an idle session, create one if under the size limit, or wait for one"""
+        deadline = time.monotonic() + timeout
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._available.wait(remaining):
+                    raise TimeoutError("Timed out waiting for an NSE session")
+
+        # Open the session outside the lock; give the slot back if that fails
+        try:
+            return NSESession()
+        except Exception:
+            self._discard(None)
+            raise
+
+    def _release(self, nse_session):
+        with self._available:
+            self._idle.append(nse_session)
+            self._available.notify()
+
+    def _discard(self, nse_session):
+        """Drop a session and wake a waiting thread so it can create a replacement"""
+        if nse_session is not None:
+            nse_session.session.close()
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def get(self, url, timeout=10):
+        """
+        GET an NSE API URL with a pooled session
+
+        Returns:
+            requests.Response: The response; connection errors are raised
+        """
+        nse_session = self._acquire()
+        try:
+            if nse_session.cookies_expired:
+                nse_session.refresh_cookies()
+            response = nse_session.session.get(url, timeout=timeout)
+            if response.status_code in (401, 403):
+                # Cookies were rejected, refresh them and retry once
+                nse_session.refresh_cookies()
+                response = nse_session.session.get(url, timeout=timeout)
+        except Exception:
+            # The session may hold a broken connection, so don't put it back
+            self._discard(nse_session)
+            raise
+        self._release(nse_session)
+        return response
+
+_nse_pool = NSESessionPool()
+
+def nse_get(url, timeout=10):
+    """GET an NSE API URL using the shared session pool"""
+    return _nse_pool.get(url, timeout=timeout)
+
+def report_nse_status(kind, nse_symbol, status_code):
+    """Record a non-200 NSE response: 404 means no data, anything else is a provider error"""
+    if status_code == 404:
+        report_miss('nse', kind, nse_symbol)
+    else:
+        report_error('nse', kind, nse_symbol)
 
 def get_stock_quote_nse(symbol):
     """Get stock quote from NSE"""
     # Map symbol if needed
-    nse_symbol = NSE_SYMBOL_MAP.get(symbol.upper().replace('.NS', ''), symbol.upper().replace('.NS', ''))
+    nse_symbol = get_nse_symbol(symbol)
 
     # Check cache first
     cache_file = os.path.join(CACHE_DIR, f"{nse_symbol}_quote.json")
@@ -78,17 +200,16 @@ def get_stock_quote_nse(symbol):
                 except:
                     pass  # If there's an error reading the cache, fetch fresh data
 
-    # Create a session
-    session = get_nse_session()
-    if not session:
+    if not can_try('nse', 'quote', nse_symbol):
         return None
 
     # Get quote data
     try:
         url = f"{NSE_URL}/quote-equity?symbol={nse_symbol}"
-        response = session.get(url, timeout=10)
+        response = nse_get(url, timeout=10)
         if response.status_code == 200:
             data = response.json()
+            report_success('nse', 'quote', nse_symbol)
 
             # Cache the data
             with open(cache_file, 'w') as f:
@@ -97,31 +218,30 @@ def get_stock_quote_nse(symbol):
             return data
         else:
             print(f"Error fetching NSE quote: {response.status_code}")
+            report_nse_status('quote', nse_symbol, response.status_code)
             return None
     except Exception as e:
         print(f"Error fetching NSE quote: {e}")
+        report_error('nse', 'quote', nse_symbol)
         return None
 
 def get_stock_historical_nse(symbol, days=365):
     """Get historical data from NSE"""
     # Map symbol if needed
-    nse_symbol = NSE_SYMBOL_MAP.get(symbol.upper().replace('.NS', ''), symbol.upper().replace('.NS', ''))
+    nse_symbol = get_nse_symbol(symbol)
 
-    # Check cache first
-    cache_file = os.path.join(CACHE_DIR, f"{nse_symbol}_historical_{days}.json")
-    if os.path.exists(cache_file):
-        file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-        if file_age < timedelta(days=1):  # Cache for 1 day
-            with open(cache_file, 'r') as f:
-                try:
-                    data = json.load(f)
-                    return pd.DataFrame(data)
-                except:
-                    pass  # If there's an error reading the cache, fetch fresh data
+    # Check the bar store first
+    store_key = f"{nse_symbol}_nse"
+    start = pd.Timestamp(datetime.now() - timedelta(days=days)).normalize()
+    if covers(store_key, start, timedelta(days=1)):  # Cache for 1 day
+        try:
+            data = read_bars(store_key, start)
+            if not data.empty:
+                return data
+        except Exception:
+            pass  # If there's an error reading the store, fetch fresh data
 
-    # Create a session
-    session = get_nse_session()
-    if not session:
+    if not can_try('nse', 'history', nse_symbol):
         return pd.DataFrame()
 
     # Get historical data
@@ -130,10 +250,11 @@ def get_stock_historical_nse(symbol, days=365):
         start_date = (datetime.now() - timedelta(days=days)).strftime('%d-%m-%Y')
         url = f"{NSE_URL}/historical/cm/equity?symbol={nse_symbol}&from={start_date}&to={end_date}"
 
-        response = session.get(url, timeout=10)
+        response = nse_get(url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             if 'data' in data:
+                report_success('nse', 'history', nse_symbol)
                 df = pd.DataFrame(data['data'])
 
                 # Rename columns to match yfinance format
@@ -153,40 +274,89 @@ def get_stock_historical_nse(symbol, days=365):
                 # Sort by date
                 df = df.sort_index()
 
-                # Cache the data
-                with open(cache_file, 'w') as f:
-                    df.reset_index().to_json(f, orient='records')
+                # Store the data
+                write_bars(store_key, df, start)
 
-                return df
+                return read_bars(store_key, start)
             else:
                 print(f"No historical data found for {nse_symbol}")
+                report_miss('nse', 'history', nse_symbol)
                 return pd.DataFrame()
         else:
             print(f"Error fetching NSE historical data: {response.status_code}")
+            report_nse_status('history', nse_symbol, response.status_code)
             return pd.DataFrame()
     except Exception as e:
         print(f"Error fetching NSE historical data: {e}")
+        report_error('nse', 'history', nse_symbol)
         return pd.DataFrame()
 
+def get_stock_info_nse(symbol):
+    """Get stock info from NSE in a format similar to yfinance"""
+    nse_data = get_stock_quote_nse(symbol)
+    if not nse_data:
+        return None
+
+    print(f"Alternative: NSE API returned data for {symbol}")
+    # Convert NSE data to a format similar to yfinance
+    info = {
+        'symbol': symbol,
+        'shortName': nse_data.get('info', {}).get('companyName', ''),
+        'longName': nse_data.get('info', {}).get('companyName', ''),
+        'regularMarketPrice': nse_data.get('priceInfo', {}).get('lastPrice', 0),
+        'regularMarketDayHigh': nse_data.get('priceInfo', {}).get('intraDayHighLow', {}).get('max', 0),
+        'regularMarketDayLow': nse_data.get('priceInfo', {}).get('intraDayHighLow', {}).get('min', 0),
+        'regularMarketVolume': nse_data.get('securityWiseDP', {}).get('quantityTraded', 0),
+        'regularMarketPreviousClose': nse_data.get('priceInfo', {}).get('previousClose', 0),
+        'regularMarketOpen': nse_data.get('priceInfo', {}).get('open', 0),
+        'marketCap': nse_data.get('securityInfo', {}).get('issuedSize', 0) * nse_data.get('priceInfo', {}).get('lastPrice', 0),
+        'fiftyTwoWeekHigh': nse_data.get('priceInfo', {}).get('weekHighLow', {}).get('max', 0),
+        'fiftyTwoWeekLow': nse_data.get('priceInfo', {}).get('weekHighLow', {}).get('min', 0),
+        'trailingPE': nse_data.get('metadata', {}).get('pdSectorPe', 0),
+        'dividendYield': nse_data.get('securityInfo', {}).get('isinDivPayDate', 0),
+        'industry': nse_data.get('metadata', {}).get('industry', ''),
+        'sector': nse_data.get('metadata', {}).get('sector', '')
+    }
+
+    # Remember that this symbol resolves on NSE
+    record_resolution(symbol, get_nse_symbol(symbol), 'nse')
+    return info
+
 def get_stock_info_alternative(symbol):
     """Get stock info using alternative sources when yfinance fails"""
     print(f"Getting alternative stock info for {symbol}")
 
-    # Special handling for symbols with suffixes
-    if symbol.endswith('.NS') or symbol.endswith('.BO'):
-        print(f"Alternative: Symbol {symbol} already has a suffix, trying it directly")
+    # Symbols last served by NSE try NSE before yfinance
+    nse_first = resolved_source(symbol) == 'nse'
+    if nse_first:
+        try:
+            info = get_stock_info_nse(symbol)
+            if info:
+                return info
+        except Exception as e:
+            print(f"Alternative: NSE API error for {symbol}: {e}")
+
+    # Try yfinance with the resolved symbol first, then every suffix variant
+    for candidate in get_alternative_candidates(symbol):
+        if not can_try('yfinance', 'info_alternative', candidate):
+            continue
         try:
-            stock = yf.Ticker(symbol)
+            print(f"Alternative: Trying stock info for {candidate}")
+            stock = yf.Ticker(candidate)
             info = stock.info
             if info and len(info) > 5:  # Check if we got meaningful data
-                print(f"Alternative: Successfully fetched info for {symbol}")
+                print(f"Alternative: Successfully fetched info for {candidate}")
+                report_success('yfinance', 'info_alternative', candidate)
+                record_resolution(symbol, candidate, 'yfinance')
                 return info
+            report_miss('yfinance', 'info_alternative', candidate)
         except Exception as e:
-            print(f"Alternative: Error with direct symbol {symbol}: {e}")
+            print(f"Alternative: Error fetching info for {candidate}: {e}")
+            report_error('yfinance', 'info_alternative', candidate)
 
-        # Extract base symbol
+    # Special handling for symbols with suffixes
+    if symbol.endswith('.NS') or symbol.endswith('.BO'):
         base_symbol = symbol.split('.')[0]
-        print(f"Alternative: Trying with base symbol: {base_symbol}")
 
         # Special handling for INFY.NS
         if base_symbol.upper() == 'INFY':
@@ -249,76 +419,15 @@ def get_stock_info_alternative(symbol):
             print(f"Alternative: Using hardcoded info for INFY")
             return info
 
-    # Try yfinance first with different approaches
-    try:
-        # Remove any existing suffix
-        base_symbol = symbol.split('.')[0]
-        print(f"Trying alternative yfinance approach with base symbol: {base_symbol}")
-
-        # Try with NSE suffix
-        try:
-            print(f"Alternative: Trying with NSE suffix: {base_symbol}.NS")
-            stock = yf.Ticker(f"{base_symbol}.NS")
-            info = stock.info
-            if info and len(info) > 5:  # Check if we got meaningful data
-                print(f"Alternative: Successfully fetched info for {base_symbol}.NS")
-                return info
-        except Exception as e:
-            print(f"Alternative: Error with NSE suffix for {base_symbol}: {e}")
-
-        # Try with BSE suffix
-        try:
-            print(f"Alternative: Trying with BSE suffix: {base_symbol}.BO")
-            stock = yf.Ticker(f"{base_symbol}.BO")
-            info = stock.info
-            if info and len(info) > 5:
-                print(f"Alternative: Successfully fetched info for {base_symbol}.BO")
-                return info
-        except Exception as e:
-            print(f"Alternative: Error with BSE suffix for {base_symbol}: {e}")
-
-        # Try with just the base symbol
+    # If yfinance fails, try NSE API
+    if not nse_first:
         try:
-            print(f"Alternative: Trying with just base symbol: {base_symbol}")
-            stock = yf.Ticker(base_symbol)
-            info = stock.info
-            if info and len(info) > 5:
-                print(f"Alternative: Successfully fetched info for {base_symbol}")
+            print(f"Alternative: Trying NSE API for {symbol}")
+            info = get_stock_info_nse(symbol)
+            if info:
                 return info
         except Exception as e:
-            print(f"Alternative: Error with base symbol for {base_symbol}: {e}")
-
-    except Exception as e:
-        print(f"Alternative: General yfinance error for {symbol}: {e}")
-
-    # If yfinance fails, try NSE API
-    try:
-        print(f"Alternative: Trying NSE API for {symbol}")
-        nse_data = get_stock_quote_nse(symbol)
-        if nse_data:
-            print(f"Alternative: NSE API returned data for {symbol}")
-            # Convert NSE data to a format similar to yfinance
-            info = {
-                'symbol': symbol,
-                'shortName': nse_data.get('info', {}).get('companyName', ''),
-                'longName': nse_data.get('info', {}).get('companyName', ''),
-                'regularMarketPrice': nse_data.get('priceInfo', {}).get('lastPrice', 0),
-                'regularMarketDayHigh': nse_data.get('priceInfo', {}).get('intraDayHighLow', {}).get('max', 0),
-                'regularMarketDayLow': nse_data.get('priceInfo', {}).get('intraDayHighLow', {}).get('min', 0),
-                'regularMarketVolume': nse_data.get('securityWiseDP', {}).get('quantityTraded', 0),
-                'regularMarketPreviousClose': nse_data.get('priceInfo', {}).get('previousClose', 0),
-                'regularMarketOpen': nse_data.get('priceInfo', {}).get('open', 0),
-                'marketCap': nse_data.get('securityInfo', {}).get('issuedSize', 0) * nse_data.get('priceInfo', {}).get('lastPrice', 0),
-                'fiftyTwoWeekHigh': nse_data.get('priceInfo', {}).get('weekHighLow', {}).get('max', 0),
-                'fiftyTwoWeekLow': nse_data.get('priceInfo', {}).get('weekHighLow', {}).get('min', 0),
-                'trailingPE': nse_data.get('metadata', {}).get('pdSectorPe', 0),
-                'dividendYield': nse_data.get('securityInfo', {}).get('isinDivPayDate', 0),
-                'industry': nse_data.get('metadata', {}).get('industry', ''),
-                'sector': nse_data.get('metadata', {}).get('sector', '')
-            }
-            return info
-    except Exception as e:
-        print(f"Alternative: NSE API error for {symbol}: {e}")
+            print(f"Alternative: NSE API error for {symbol}: {e}")
 
     # Try with hardcoded values for common stocks with all required metrics
     common_stocks_info = {
@@ -633,66 +742,67 @@ def get_stock_info_alternative(symbol):
         'longBusinessSummary': f"This is a placeholder business summary for {symbol}. The company operates in the {symbol.split('.')[0]} sector and provides various products and services to customers across India."
     }
 
+def get_historical_data_nse_period(symbol, period='1y'):
+    """Get historical data from NSE for a yfinance-style period"""
+    days = PERIOD_DAYS.get(period, 365)
+    data = get_stock_historical_nse(symbol, days)
+    if data.empty or 'Close' not in data.columns:
+        return pd.DataFrame()
+
+    # Keep only the OHLCV columns used elsewhere
+    data = data[[col for col in ['Open', 'High', 'Low', 'Close', 'Volume'] if col in data.columns]]
+    record_resolution(symbol, get_nse_symbol(symbol), 'nse')
+    return data
+
 def get_historical_data_alternative(symbol, period='1y'):
     """Get historical data using alternative sources when yfinance fails"""
-    # Special handling for RELIANCE
-    if symbol.upper() == 'RELIANCE' or symbol.upper() == 'RELIANCE.NS':
-        print(f"Special alternative handling for RELIANCE historical data")
-        # Try with NSE suffix for RELIANCE
+    # Symbols last served by NSE try NSE before yfinance
+    nse_first = resolved_source(symbol) == 'nse'
+    if nse_first:
         try:
-            stock = yf.Ticker("RELIANCE.NS")
-            data = stock.history(period=period)
+            data = get_historical_data_nse_period(symbol, period)
             if not data.empty:
-                print(f"Successfully fetched data for RELIANCE.NS using yfinance")
+                print(f"Successfully fetched NSE historical data for {symbol}")
                 return data
         except Exception as e:
-            print(f"Error fetching data for RELIANCE.NS: {e}")
+            print(f"Error fetching NSE historical data for {symbol}: {e}")
 
-    # If the symbol already has a suffix (like INFY.NS), try it directly first
-    if symbol.endswith('.NS') or symbol.endswith('.BO'):
-        print(f"Symbol {symbol} already has a suffix, trying it directly in alternative method")
+    # Try yfinance with the resolved symbol first, then every suffix variant
+    for candidate in get_alternative_candidates(symbol):
+        if not can_try('yfinance', f"history_{period}", candidate):
+            continue
         try:
-            stock = yf.Ticker(symbol)
+            stock = yf.Ticker(candidate)
             data = stock.history(period=period)
             if not data.empty:
-                print(f"Successfully fetched data for {symbol} using yfinance in alternative method")
+                print(f"Successfully fetched data for {candidate} using yfinance in alternative method")
+                report_success('yfinance', f"history_{period}", candidate)
+                record_resolution(symbol, candidate, 'yfinance')
                 return data
+            report_miss('yfinance', f"history_{period}", candidate)
         except Exception as e:
-            print(f"Error fetching data for {symbol} in alternative method: {e}")
+            print(f"Error fetching data for {candidate} in alternative method: {e}")
+            report_error('yfinance', f"history_{period}", candidate)
 
-        # If that fails, try without the suffix
-        base_symbol = symbol.split('.')[0]
-        print(f"Trying without suffix in alternative method: {base_symbol}")
+    # If yfinance fails, try NSE historical data
+    if not nse_first:
         try:
-            stock = yf.Ticker(base_symbol)
-            data = stock.history(period=period)
+            data = get_historical_data_nse_period(symbol, period)
             if not data.empty:
-                print(f"Successfully fetched data for {base_symbol} using yfinance in alternative method")
+                print(f"Successfully fetched NSE historical data for {symbol}")
                 return data
         except Exception as e:
-            print(f"Error fetching data for {base_symbol} in alternative method: {e}")
+            print(f"Error fetching NSE historical data for {symbol}: {e}")
 
-        # If that fails, create synthetic data specifically for RELIANCE
+    # If that fails, create synthetic data for symbols with suffixes
+    if symbol.endswith('.NS') or symbol.endswith('.BO'):
         print("Creating synthetic data for RELIANCE")
         # Use a fixed seed for reproducibility
         np.random.seed(42)
 
         # Create a date range
         end_date = datetime.now()
-        if period == '1mo':
-            days = 30
-        elif period == '3mo':
-            days = 90
-        elif period == '6mo':
-            days = 180
-        elif period == '1y':
-            days = 365
-        elif period == '2y':
-            days = 730
-        elif period == '5y':
-            days = 1825
-        else:
-            days = 365  # Default to 1 year
+        days = PERIOD_DAYS.get(period, 365)  # Default to 1 year
 
         start_date = end_date - timedelta(days=days)
         date_range = pd.date_range(start=start_date, end=end_date, freq='B')
@@ -731,31 +841,6 @@ def get_historical_data_alternative(symbol, period='1y'):
         print(f"Successfully generated synthetic data for RELIANCE with {len(data)} rows")
         return data
 
-    # Remove any existing suffix
-    base_symbol = symbol.split('.')[0]
-
-    # Try with NSE suffix first
-    try:
-        nse_symbol = f"{base_symbol}.NS"
-        stock = yf.Ticker(nse_symbol)
-        data = stock.history(period=period)
-        if not data.empty:
-            print(f"Successfully fetched data for {nse_symbol} using yfinance")
-            return data
-    except Exception as e:
-        print(f"Error fetching data for {base_symbol}.NS: {e}")
-
-    # Try with BSE suffix
-    try:
-        bse_symbol = f"{base_symbol}.BO"
-        stock = yf.Ticker(bse_symbol)
-        data = stock.history(period=period)
-        if not data.empty:
-            print(f"Successfully fetched data for {bse_symbol} using yfinance")
-            return data
-    except Exception as e:
-        print(f"Error fetching data for {base_symbol}.BO: {e}")
-
     # If yfinance fails, try using sample data for testing
     print(f"Using sample data for {symbol}")
 
@@ -779,65 +864,58 @@ def get_historical_data_alternative(symbol, period='1y'):
 
     return data
 
+def get_current_price_nse(symbol):
+    """Get the last traded price from NSE, or None if unavailable"""
+    nse_data = get_stock_quote_nse(symbol)
+    if nse_data and 'priceInfo' in nse_data:
+        price = nse_data['priceInfo'].get('lastPrice', 0)
+        print(f"Alternative: NSE API returned price for {symbol}: {price}")
+        record_resolution(symbol, get_nse_symbol(symbol), 'nse')
+        return price
+    return None
+
 def get_current_price_alternative(symbol):
     """Get current price using alternative sources when yfinance fails"""
     print(f"Using alternative method to get price for {symbol}")
 
-    # Try yfinance first with different approaches
-    try:
-        # Remove any existing suffix
-        base_symbol = symbol.split('.')[0]
-        print(f"Trying alternative yfinance approach with base symbol: {base_symbol}")
-
-        # Try with NSE suffix
+    # Symbols last served by NSE try NSE before yfinance
+    nse_first = resolved_source(symbol) == 'nse'
+    if nse_first:
         try:
-            print(f"Alternative: Trying with NSE suffix: {base_symbol}.NS")
-            stock = yf.Ticker(f"{base_symbol}.NS")
-            data = stock.history(period='1d')
-            if not data.empty:
-                price = data['Close'].iloc[-1]
-                print(f"Alternative: Successfully fetched price for {base_symbol}.NS: {price}")
+            price = get_current_price_nse(symbol)
+            if price is not None:
                 return price
         except Exception as e:
-            print(f"Alternative: Error with NSE suffix for {base_symbol}: {e}")
+            print(f"Alternative: NSE API error for {symbol}: {e}")
 
-        # Try with BSE suffix
+    # Try yfinance with the resolved symbol first, then every suffix variant
+    for candidate in get_alternative_candidates(symbol):
+        if not can_try('yfinance', 'price', candidate):
+            continue
         try:
-            print(f"Alternative: Trying with BSE suffix: {base_symbol}.BO")
-            stock = yf.Ticker(f"{base_symbol}.BO")
+            print(f"Alternative: Trying price for {candidate}")
+            stock = yf.Ticker(candidate)
             data = stock.history(period='1d')
             if not data.empty:
                 price = data['Close'].iloc[-1]
-                print(f"Alternative: Successfully fetched price for {base_symbol}.BO: {price}")
+                print(f"Alternative: Successfully fetched price for {candidate}: {price}")
+                report_success('yfinance', 'price', candidate)
+                record_resolution(symbol, candidate, 'yfinance')
                 return price
+            report_miss('yfinance', 'price', candidate)
         except Exception as e:
-            print(f"Alternative: Error with BSE suffix for {base_symbol}: {e}")
+            print(f"Alternative: Error fetching price for {candidate}: {e}")
+            report_error('yfinance', 'price', candidate)
 
-        # Try with just the base symbol
+    # If yfinance fails, try NSE API
+    if not nse_first:
         try:
-            print(f"Alternative: Trying with just base symbol: {base_symbol}")
-            stock = yf.Ticker(base_symbol)
-            data = stock.history(period='1d')
-            if not data.empty:
-                price = data['Close'].iloc[-1]
-                print(f"Alternative: Successfully fetched price for {base_symbol}: {price}")
+            print(f"Alternative: Trying NSE API for {symbol}")
+            price = get_current_price_nse(symbol)
+            if price is not None:
                 return price
         except Exception as e:
-            print(f"Alternative: Error with base symbol for {base_symbol}: {e}")
-
-    except Exception as e:
-        print(f"Alternative: General yfinance error for {symbol}: {e}")
-
-    # If yfinance fails, try NSE API
-    try:
-        print(f"Alternative: Trying NSE API for {symbol}")
-        nse_data = get_stock_quote_nse(symbol)
-        if nse_data and 'priceInfo' in nse_data:
-            price = nse_data['priceInfo'].get('lastPrice', 0)
-            print(f"Alternative: NSE API returned price for {symbol}: {price}")
-            return price
-    except Exception as e:
-        print(f"Alternative: NSE API error for {symbol}: {e}")
+            print(f"Alternative: NSE API error for {symbol}: {e}")
 
     # Try with hardcoded values for common stocks
     common_stocks = {
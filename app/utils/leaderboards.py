@@ -0,0 +1,275 @@
+"""
+Utility module for mutual fund leaderboards
+Rankings by return period and fund category are computed in the background
+across every scheme with stored NAV data, and saved to disk. Pages read a
+precomputed leaderboard instead of fetching and ranking funds on each view.
+The server starts the first computation when it starts, a computation that
+finds no funds (e.g. while MFAPI is down) is never saved, and leaderboards
+computed from every fund's latest expected NAV are not recomputed until the
+next NAV is due
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, has_app_context
+
+from app.utils.mf_api import POPULAR_FUNDS, get_multiple_mutual_fund_details
+from app.utils.nav_store import expected_nav_date, stored_scheme_codes
+
+# Leaderboard file
+LEADERBOARD_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'leaderboards.json')
+
+# How often leaderboards are recomputed, in seconds
+LEADERBOARD_REFRESH_SECONDS = 60 * 60
+
+# How long to wait before trying again after a failed computation, in seconds
+LEADERBOARD_RETRY_SECONDS = 5 * 60
+
+# Smallest share of the previously ranked schemes a new computation must
+# rank to replace the saved leaderboards
+LEADERBOARD_MIN_COVERAGE = 0.5
+
+# Number of funds kept at the top and bottom of each leaderboard
+LEADERBOARD_SIZE = 20
+
+LEADERBOARD_PERIODS = [
+    'one_month_return',
+    'three_month_return',
+    'six_month_return',
+    'one_year_return',
+    'three_year_return',
+    'five_year_return'
+]
+
+# Risk-adjusted metrics funds are also ranked by (higher is better)
+LEADERBOARD_RISK_METRICS = [
+    'sharpe_ratio',
+    'sortino_ratio'
+]
+
+# 'all' plus the categories assigned by mf_api.categorize_fund_size
+LEADERBOARD_CATEGORIES = ['all', 'large-cap', 'mid-cap', 'small-cap', 'multi-cap', 'index', 'debt', 'hybrid', 'other']
+
+# Fund details kept in each leaderboard entry (everything but the NAV history)
+SUMMARY_FIELDS = [
+    'scheme_code', 'scheme_name', 'fund_house', 'scheme_type', 'scheme_category',
+    'scheme_nav', 'scheme_date', 'aum', 'fund_size_category', 'volatility', 'max_drawdown'
+] + LEADERBOARD_PERIODS + LEADERBOARD_RISK_METRICS
+
+# Served while the first leaderboards are being computed
+EMPTY_LEADERBOARDS = {'computed_at': None, 'scheme_count': 0, 'boards': {}}
+
+_lock = threading.Lock()
+_leaderboards = None
+_loaded_mtime = None
+_refreshing = False
+_retry_at = 0
+
+def compute_leaderboards():
+    """
+    Rank every scheme with stored NAV data, plus the popular funds
+
+    Returns:
+        dict: Dictionary with 'computed_at', 'scheme_count', 'nav_date' (the
+        expected NAV date at the time), 'behind_count' (funds whose latest
+        NAV is older than that) and 'boards', where boards maps
+        '<category>:<period or risk metric>' to {'top': [...], 'bottom': [...]};
+        'top' is sorted best first and 'bottom' worst first
+    """
+    nav_date = expected_nav_date()
+    scheme_codes = list(dict.fromkeys(POPULAR_FUNDS + stored_scheme_codes()))
+    fund_details = get_multiple_mutual_fund_details(scheme_codes)
+    summaries = [{field: fund_data.get(field) for field in SUMMARY_FIELDS}
+                 for fund_data in fund_details.values()]
+
+    boards = {}
+    for category in LEADERBOARD_CATEGORIES:
+        if category == 'all':
+            funds = summaries
+        else:
+            funds = [fund for fund in summaries if fund['fund_size_category'] == category]
+
+        for period in LEADERBOARD_PERIODS + LEADERBOARD_RISK_METRICS:
+            ranked = sorted((fund for fund in funds if fund[period] is not None),
+                            key=lambda fund: fund[period], reverse=True)
+            boards[f"{category}:{period}"] = {
+                'top': ranked[:LEADERBOARD_SIZE],
+                'bottom': ranked[::-1][:LEADERBOARD_SIZE]
+            }
+
+    return {
+        'computed_at': datetime.now().isoformat(),
+        'scheme_count': len(summaries),
+        'nav_date': nav_date.isoformat(),
+        'behind_count': sum(1 for fund in summaries if not _has_nav_for(fund, nav_date)),
+        'boards': boards
+    }
+
+def _has_nav_for(fund, nav_date):
+    """Check whether a fund summary's latest NAV is from nav_date or later"""
+    try:
+        return datetime.strptime(fund['scheme_date'], '%d-%m-%Y').date() >= nav_date
+    except (TypeError, ValueError):
+        return False
+
+def _needs_refresh(leaderboards):
+    """
+    Check whether saved leaderboards are due for a recomputation
+
+    They are once older than LEADERBOARD_REFRESH_SECONDS, unless every
+    ranked fund already had the NAV that is still the latest expected one;
+    recomputing those would only refetch the same data.
+    """
+    if time.time() - _loaded_mtime < LEADERBOARD_REFRESH_SECONDS:
+        return False
+    return not (leaderboards.get('nav_date') == expected_nav_date().isoformat()
+                and leaderboards.get('behind_count') == 0)
+
+def refresh_leaderboards():
+    """
+    Recompute the leaderboards and save them
+
+    Leaderboards that rank no funds, or far fewer than the saved ones, are
+    not saved, so a failed computation never replaces good leaderboards.
+
+    Returns:
+        dict: The new leaderboards, or None if they were not saved
+    """
+    global _leaderboards, _loaded_mtime, _retry_at
+    leaderboards = compute_leaderboards()
+
+    previous = _load_leaderboards()
+    minimum = previous['scheme_count'] * LEADERBOARD_MIN_COVERAGE if previous else 0
+    if leaderboards['scheme_count'] == 0 or leaderboards['scheme_count'] < minimum:
+        print(f"Not saving leaderboards ranking only {leaderboards['scheme_count']} funds")
+        with _lock:
+            _retry_at = time.time() + LEADERBOARD_RETRY_SECONDS
+        return None
+
+    # Write to a temporary file first so readers never see a partial file
+    temp_file = f"{LEADERBOARD_FILE}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(leaderboards, f)
+    os.replace(temp_file, LEADERBOARD_FILE)
+
+    with _lock:
+        _leaderboards = leaderboards
+        _loaded_mtime = os.path.getmtime(LEADERBOARD_FILE)
+        _retry_at = 0
+    return leaderboards
+
+def _refresh_in_background(app):
+    global _refreshing, _retry_at
+    try:
+        with app.app_context():
+            refresh_leaderboards()
+    except Exception as e:
+        print(f"Error refreshing leaderboards: {e}")
+        with _lock:
+            _retry_at = time.time() + LEADERBOARD_RETRY_SECONDS
+    finally:
+        with _lock:
+            _refreshing = False
+
+def _start_background_refresh(app=None):
+    """
+    Start a background refresh unless one is already running or a failed one is waiting to retry
+
+    Args:
+        app: Flask app to run the refresh in, defaults to the current app
+    """
+    global _refreshing
+    with _lock:
+        if _refreshing or time.time() < _retry_at:
+            return
+        if app is None:
+            if not has_app_context():
+                return
+            app = current_app._get_current_object()
+        _refreshing = True
+    threading.Thread(target=_refresh_in_background, args=(app,), daemon=True).start()
+
+def start_leaderboards(app):
+    """
+    Start computing the leaderboards in the background if they are missing or due
+
+    Called by the server when it starts, not by create_app, so scripts that
+    create the app don't compute leaderboards.
+    """
+    leaderboards = _load_leaderboards()
+    if leaderboards is None or _needs_refresh(leaderboards):
+        _start_background_refresh(app)
+
+def _load_leaderboards():
+    """Get the saved leaderboards, reloading them if the file changed"""
+    global _leaderboards, _loaded_mtime
+    if not os.path.exists(LEADERBOARD_FILE):
+        return None
+
+    mtime = os.path.getmtime(LEADERBOARD_FILE)
+    with _lock:
+        if _leaderboards is not None and _loaded_mtime == mtime:
+            return _leaderboards
+    try:
+        with open(LEADERBOARD_FILE, 'r') as f:
+            leaderboards = json.load(f)
+    except Exception as e:
+        print(f"Error reading leaderboards: {e}")
+        return None
+    with _lock:
+        _leaderboards = leaderboards
+        _loaded_mtime = mtime
+    return leaderboards
+
+def get_leaderboards():
+    """
+    Get the current leaderboards
+
+    Saved leaderboards are served as they are; once they are due (see
+    _needs_refresh) a background refresh is started. Until the
+    first leaderboards are saved, empty ones are served while they are
+    computed in the background.
+    """
+    leaderboards = _load_leaderboards()
+    if leaderboards is None:
+        _start_background_refresh()
+        return EMPTY_LEADERBOARDS
+
+    if _needs_refresh(leaderboards):
+        _start_background_refresh()
+    return leaderboards
+
+def get_leaderboard(period='one_year_return', category='all', limit=5, bottom=False):
+    """
+    Get the best (or worst) funds for a return period or risk metric and category
+
+    Args:
+        period: Return period or risk metric to rank by (one of
+            LEADERBOARD_PERIODS or LEADERBOARD_RISK_METRICS)
+        category: Fund category (one of LEADERBOARD_CATEGORIES)
+        limit: Number of funds to return, at most LEADERBOARD_SIZE
+        bottom: Return the worst funds, worst first, instead of the best
+
+    Returns:
+        list: List of fund summaries
+    """
+    board = get_leaderboards()['boards'].get(f"{category}:{period}")
+    if not board:
+        return []
+    return board['bottom' if bottom else 'top'][:limit]
+
+def get_leaderboard_gainers_and_losers(limit=5, period='one_month_return'):
+    """
+    Get the top gainers and losers across all funds
+
+    Returns:
+        dict: Dictionary with top gainers and losers
+    """
+    return {
+        'top_gainers': get_leaderboard(period, 'all', limit),
+        'top_losers': get_leaderboard(period, 'all', limit, bottom=True)
+    }
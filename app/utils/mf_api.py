@@ -1,66 +1,304 @@
-import requests
 import json
 import pandas as pd
 from datetime import datetime
 import time
+import threading
 import os
 from flask import current_app
+from sqlalchemy import func
+from app.utils.single_flight import single_flight
+from app.utils.provider_health import can_try, report_success, report_miss, report_error
+from app.utils.http_client import HTTPClient
+from app.utils.concurrent_fetch import TokenBucket, fetch_concurrently
+from app.utils.nav_store import append_latest, expected_nav_date, has_scheme, read_scheme, write_scheme
+from app.models.nav import SchemeNAV
+from app.utils.fund_search import FundSearchIndex
+from app.utils.returns import trailing_returns
+from app.utils.nav_series import NAVSeries
+from app.utils.risk_metrics import get_risk_metrics
 
 # Base URL for the MFAPI
 MFAPI_BASE_URL = "https://api.mfapi.in/mf/"
 
-def fetch_mutual_fund_data(scheme_code):
+# MFAPI request budget: bursts of up to MFAPI_BURST requests, then MFAPI_RATE per second
+MFAPI_RATE = 10
+MFAPI_BURST = 20
+mfapi_rate_limiter = TokenBucket(MFAPI_RATE, MFAPI_BURST)
+
+# Shared pooled client for all MFAPI requests; every attempt, retries included, takes a token
+mfapi_client = HTTPClient(MFAPI_BASE_URL, rate_limiter=mfapi_rate_limiter)
+
+# Maximum number of concurrent MFAPI requests
+MFAPI_MAX_WORKERS = 8
+
+# How long a latest NAV is reused without checking again, in seconds
+LATEST_NAV_TTL = 15 * 60
+_latest_navs = {}
+_latest_navs_lock = threading.Lock()
+
+# How often the search index checks whether the fund list changed, in seconds
+SEARCH_INDEX_CHECK_SECONDS = 60
+_search_index = None
+_search_index_signature = None
+_search_index_checked_at = 0
+_search_index_lock = threading.Lock()
+
+# Popular fund codes, used for the popular funds list and as the leaderboard seed
+POPULAR_FUNDS = [
+    100033,  # Aditya Birla Sun Life Equity Advantage Fund
+    120503,  # SBI Blue Chip Fund
+    118834,  # Axis Bluechip Fund
+    119598,  # HDFC Index Fund-NIFTY 50 Plan
+    120716,  # Mirae Asset Large Cap Fund
+    122639,  # ICICI Prudential Bluechip Fund
+    125354,  # Kotak Standard Multicap Fund
+    118560,  # Parag Parikh Flexi Cap Fund
+    119237,  # UTI Nifty Index Fund
+    120178,  # Nippon India Small Cap Fund
+    125497,  # Axis Midcap Fund
+    120505,  # SBI Small Cap Fund
+    118533,  # HDFC Mid-Cap Opportunities Fund
+    118701,  # ICICI Prudential Value Discovery Fund
+    118989,  # Kotak Emerging Equity Fund
+    120465,  # Nippon India Growth Fund
+    118565,  # Canara Robeco Emerging Equities Fund
+    118551,  # DSP Midcap Fund
+    118568,  # Franklin India Prima Fund
+    120661,  # Kotak Bluechip Fund
+    120716,  # Mirae Asset Midcap Fund
+    122639,  # ICICI Prudential Midcap Fund
+    118560,  # Axis Small Cap Fund
+    125354,  # Kotak Small Cap Fund
+    118701,  # ICICI Prudential Smallcap Fund
+    118989,  # DSP Small Cap Fund
+    120465,  # HDFC Small Cap Fund
+    118565,  # Aditya Birla Sun Life Small Cap Fund
+    118551,  # Tata Small Cap Fund
+    118568   # L&T Emerging Businesses Fund
+]
+
+def _request_mfapi(scheme_code, path, kind):
     """
-    Fetch mutual fund data from MFAPI for a given scheme code
+    Make a rate-limited MFAPI request for a scheme
 
     Args:
         scheme_code: The scheme code of the mutual fund
+        path: Path relative to MFAPI_BASE_URL
+        kind: Kind of request, used for the negative cache ('scheme' or 'latest')
 
     Returns:
-        dict: The mutual fund data including scheme details and NAV history
+        dict: The parsed response, or None if the request failed
     """
-    try:
-        # Construct the URL
-        url = f"{MFAPI_BASE_URL}{scheme_code}"
+    # Skip schemes that failed recently and the API while it is down
+    if not can_try('mfapi', kind, str(scheme_code)):
+        return None
 
+    try:
         # Make the API request
-        response = requests.get(url)
+        response = mfapi_client.get(path)
 
         # Check if the request was successful
         if response.status_code == 200:
             data = response.json()
+            report_success('mfapi', kind, str(scheme_code))
             return data
         else:
             current_app.logger.error(f"Failed to fetch data for scheme code {scheme_code}. Status code: {response.status_code}")
+            if response.status_code == 404:
+                report_miss('mfapi', kind, str(scheme_code))
+            else:
+                report_error('mfapi', kind, str(scheme_code))
             return None
     except Exception as e:
         current_app.logger.error(f"Error fetching mutual fund data for scheme code {scheme_code}: {str(e)}")
+        report_error('mfapi', kind, str(scheme_code))
+        return None
+
+@single_flight(key=lambda scheme_code: str(scheme_code))
+def fetch_mutual_fund_data(scheme_code):
+    """
+    Fetch mutual fund data from MFAPI for a given scheme code
+
+    The full NAV history is only downloaded the first time a scheme is
+    requested, or to repair a gap in the stored history. Otherwise the
+    stored history is extended with the latest NAV.
+
+    Args:
+        scheme_code: The scheme code of the mutual fund
+
+    Returns:
+        dict: The mutual fund data including scheme details and NAV history
+    """
+    # Check the NAV store first; stored data is fresh until the next NAV is published
+    data = read_scheme(scheme_code)
+    if data is not None:
+        return data
+
+    # Append the latest NAV to the stored history
+    if has_scheme(scheme_code):
+        latest = _request_mfapi(scheme_code, f"{scheme_code}/latest", 'latest')
+        if latest:
+            try:
+                data = append_latest(scheme_code, latest)
+                if data is not None:
+                    return data
+            except Exception as e:
+                current_app.logger.error(f"Error updating NAV data for scheme code {scheme_code}: {str(e)}")
+
+    # Download the full history
+    data = _request_mfapi(scheme_code, f"{scheme_code}", 'scheme')
+    if data:
+        # Store the data
+        try:
+            write_scheme(scheme_code, data)
+        except Exception as e:
+            current_app.logger.error(f"Error storing NAV data for scheme code {scheme_code}: {str(e)}")
+        return data
+
+    # If MFAPI is unavailable, fall back to the stored history even if it is stale
+    return read_scheme(scheme_code, fresh_only=False)
+
+def _latest_nav_from(data):
+    """Get the newest NAV and its date from MFAPI data, or None"""
+    try:
+        entry = data['data'][0]
+        return {'nav': float(entry['nav']), 'date': entry['date']}
+    except (TypeError, KeyError, IndexError, ValueError):
         return None
 
-def fetch_multiple_mutual_funds(scheme_codes, max_requests=10):
+def get_table_nav(scheme_code, fresh_only=True):
     """
-    Fetch data for multiple mutual funds with rate limiting
+    Get the latest NAV of a mutual fund from the NAV table
+
+    Args:
+        scheme_code: The scheme code of the mutual fund
+        fresh_only: Only return the NAV if it is for the latest expected NAV date
+
+    Returns:
+        dict: Dictionary with 'nav' (float) and 'date', or None if unavailable
+    """
+    try:
+        row = SchemeNAV.query.get(int(scheme_code))
+    except Exception as e:
+        current_app.logger.error(f"Error reading NAV table for scheme code {scheme_code}: {str(e)}")
+        return None
+
+    if row is None or row.nav is None or row.nav_date is None:
+        return None
+    if fresh_only and row.nav_date < expected_nav_date():
+        return None
+    return {'nav': row.nav, 'date': row.nav_date.strftime('%d-%m-%Y')}
+
+def get_latest_nav(scheme_code):
+    """
+    Get the latest NAV of a mutual fund without processing its NAV history
+
+    Latest NAVs are kept in memory for LATEST_NAV_TTL. Otherwise the NAV
+    table loaded from the AMFI NAVAll file is used if it is up to date, then
+    a fresh stored history, then MFAPI's latest endpoint, then the stored
+    history even if it is stale.
+
+    Args:
+        scheme_code: The scheme code of the mutual fund
+
+    Returns:
+        dict: Dictionary with 'nav' (float) and 'date', or None if unavailable
+    """
+    key = str(scheme_code)
+    with _latest_navs_lock:
+        cached = _latest_navs.get(key)
+    if cached and time.monotonic() - cached[1] < LATEST_NAV_TTL:
+        return cached[0]
+
+    latest_nav = get_table_nav(scheme_code)
+    if latest_nav is None:
+        latest_nav = _latest_nav_from(read_scheme(scheme_code))
+    if latest_nav is None:
+        latest = _request_mfapi(scheme_code, f"{scheme_code}/latest", 'latest')
+        latest_nav = _latest_nav_from(latest)
+        if latest_nav is not None and has_scheme(scheme_code):
+            # Keep the stored history up to date while we're at it
+            try:
+                append_latest(scheme_code, latest)
+            except Exception as e:
+                current_app.logger.error(f"Error updating NAV data for scheme code {scheme_code}: {str(e)}")
+    if latest_nav is None:
+        latest_nav = _latest_nav_from(read_scheme(scheme_code, fresh_only=False))
+        if latest_nav is None:
+            return None
+
+    with _latest_navs_lock:
+        _latest_navs[key] = (latest_nav, time.monotonic())
+    return latest_nav
+
+def get_latest_navs(scheme_codes):
+    """
+    Get the latest NAVs of several mutual funds concurrently
+
+    Args:
+        scheme_codes: List of scheme codes
+
+    Returns:
+        dict: Dictionary mapping each scheme code to the result of get_latest_nav
+    """
+    results = {}
+
+    for code, latest_nav, error in fetch_concurrently(get_latest_nav, scheme_codes, MFAPI_MAX_WORKERS):
+        if error:
+            current_app.logger.error(f"Error getting latest NAV for fund {code}: {str(error)}")
+        results[code] = latest_nav
+
+    return results
+
+def fetch_multiple_mutual_funds(scheme_codes, max_requests=MFAPI_MAX_WORKERS):
+    """
+    Fetch data for multiple mutual funds concurrently with rate limiting
 
     Args:
         scheme_codes: List of scheme codes to fetch
-        max_requests: Maximum number of requests to make before pausing
+        max_requests: Maximum number of requests in flight at once
 
     Returns:
         dict: Dictionary mapping scheme codes to their data
     """
     results = {}
 
-    for i, code in enumerate(scheme_codes):
-        # Rate limiting to avoid overwhelming the API
-        if i > 0 and i % max_requests == 0:
-            time.sleep(2)  # Sleep for 2 seconds after every max_requests
-
-        data = fetch_mutual_fund_data(code)
-        if data:
+    for code, data, error in fetch_concurrently(fetch_mutual_fund_data, scheme_codes, max_requests):
+        if error:
+            current_app.logger.error(f"Error fetching mutual fund data for scheme code {code}: {str(error)}")
+        elif data:
             results[code] = data
 
     return results
 
+def get_multiple_mutual_fund_details(scheme_codes):
+    """
+    Get detailed information about several mutual funds concurrently
+
+    Args:
+        scheme_codes: List of scheme codes
+
+    Returns:
+        dict: Dictionary mapping scheme codes to their details; funds that
+        could not be fetched are left out
+    """
+    results = {}
+    series = {}
+
+    for code, details, error in fetch_concurrently(_fund_details, scheme_codes, MFAPI_MAX_WORKERS):
+        if error:
+            current_app.logger.error(f"Error getting data for fund {code}: {str(error)}")
+        elif details:
+            results[code], nav_series = details
+            if nav_series is not None:
+                series[code] = nav_series
+
+    # Calculate risk metrics for all funds together
+    for code, metrics in get_risk_metrics(series).items():
+        results[code].update(metrics)
+
+    return results
+
 def get_mutual_fund_details(scheme_code):
     """
     Get detailed information about a mutual fund
@@ -71,6 +309,25 @@ def get_mutual_fund_details(scheme_code):
     Returns:
         dict: Processed mutual fund data with additional metrics
     """
+    details = _fund_details(scheme_code)
+    if not details:
+        return None
+
+    scheme_info, nav_series = details
+    if nav_series is not None:
+        # Calculate risk-adjusted metrics, cached per scheme per NAV date
+        scheme_info.update(get_risk_metrics({scheme_code: nav_series})[scheme_code])
+    return scheme_info
+
+def _fund_details(scheme_code):
+    """
+    Get the details of a mutual fund without its risk metrics
+
+    Returns:
+        tuple: (scheme_info, nav_series), where nav_series is the full
+        precision NAVSeries the risk metrics are calculated from, or None if
+        there is too little data; or None if the fund could not be fetched
+    """
     data = fetch_mutual_fund_data(scheme_code)
 
     if not data:
@@ -88,75 +345,39 @@ def get_mutual_fund_details(scheme_code):
         'aum': estimate_aum(scheme_code, data),  # Estimate AUM based on fund data
         'fund_size_category': categorize_fund_size(scheme_code, data)  # Categorize as large/mid/small cap
     }
+    nav_series = None
 
     # Calculate additional metrics if data is available
     if data.get('data') and len(data['data']) > 30:
-        nav_data = pd.DataFrame(data['data'])
-        nav_data['nav'] = pd.to_numeric(nav_data['nav'], errors='coerce')
-        nav_data['date'] = pd.to_datetime(nav_data['date'], format='%d-%m-%Y', errors='coerce')
-        nav_data = nav_data.sort_values('date')
-
-        # Calculate returns
-        latest_nav = nav_data.iloc[-1]['nav']
-
-        # 1 month return
-        if len(nav_data) >= 30:
-            month_ago_nav = nav_data.iloc[-30]['nav']
-            scheme_info['one_month_return'] = ((latest_nav - month_ago_nav) / month_ago_nav) * 100
-        else:
-            scheme_info['one_month_return'] = None
+        nav_series = NAVSeries.from_records(data['data'])
 
-        # 3 month return
-        if len(nav_data) >= 90:
-            three_month_ago_nav = nav_data.iloc[-90]['nav']
-            scheme_info['three_month_return'] = ((latest_nav - three_month_ago_nav) / three_month_ago_nav) * 100
-        else:
-            scheme_info['three_month_return'] = None
-
-        # 6 month return
-        if len(nav_data) >= 180:
-            six_month_ago_nav = nav_data.iloc[-180]['nav']
-            scheme_info['six_month_return'] = ((latest_nav - six_month_ago_nav) / six_month_ago_nav) * 100
-        else:
-            scheme_info['six_month_return'] = None
-
-        # 1 year return
-        if len(nav_data) >= 365:
-            year_ago_nav = nav_data.iloc[-365]['nav']
-            scheme_info['one_year_return'] = ((latest_nav - year_ago_nav) / year_ago_nav) * 100
-        else:
-            scheme_info['one_year_return'] = None
-
-        # 3 year return
-        if len(nav_data) >= 1095:
-            three_year_ago_nav = nav_data.iloc[-1095]['nav']
-            scheme_info['three_year_return'] = ((latest_nav - three_year_ago_nav) / three_year_ago_nav) * 100
-        else:
-            scheme_info['three_year_return'] = None
-
-        # 5 year return
-        if len(nav_data) >= 1825:
-            five_year_ago_nav = nav_data.iloc[-1825]['nav']
-            scheme_info['five_year_return'] = ((latest_nav - five_year_ago_nav) / five_year_ago_nav) * 100
-        else:
-            scheme_info['five_year_return'] = None
+        # Calculate trailing returns over calendar periods
+        scheme_info.update(trailing_returns(nav_series.dates, nav_series.navs))
 
         # Calculate volatility (standard deviation of daily returns)
-        nav_data['daily_return'] = nav_data['nav'].pct_change()
-        scheme_info['volatility'] = nav_data['daily_return'].std() * 100 * (252 ** 0.5)  # Annualized volatility
+        scheme_info['volatility'] = nav_series.volatility()  # Annualized volatility
 
-        # Get NAV history for charts
-        scheme_info['nav_history'] = nav_data[['date', 'nav']].to_dict('records')
+        # Get NAV history for charts as compact day/NAV arrays
+        scheme_info['nav_history'] = nav_series.to_payload()
 
-    return scheme_info
+    return scheme_info, nav_series
 
 def load_mutual_fund_list():
     """
-    Load the list of mutual funds from the CSV file
+    Load the list of mutual funds from the NAV table, or the CSV file if the
+    table is empty
 
     Returns:
         pd.DataFrame: DataFrame containing mutual fund scheme codes and names
     """
+    # Prefer the NAV table, which lists every scheme in the latest NAVAll file
+    try:
+        rows = SchemeNAV.query.with_entities(SchemeNAV.scheme_code, SchemeNAV.scheme_name).all()
+        if rows:
+            return pd.DataFrame(rows, columns=['schemeCode', 'schemeName'])
+    except Exception as e:
+        current_app.logger.error(f"Error reading NAV table: {str(e)}")
+
     try:
         csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'mutual_funds.csv')
         return pd.read_csv(csv_path)
@@ -164,52 +385,43 @@ def load_mutual_fund_list():
         current_app.logger.error(f"Error loading mutual fund list: {str(e)}")
         return pd.DataFrame(columns=['schemeCode', 'schemeName'])
 
-def get_top_performers(limit=5, period='one_month'):
-    """
-    Get top performing mutual funds for a given period
+def _mutual_fund_list_signature():
+    """Get a value that changes whenever the source of load_mutual_fund_list changes"""
+    try:
+        count, last_update = SchemeNAV.query.with_entities(func.count(SchemeNAV.scheme_code),
+                                                           func.max(SchemeNAV.updated_at)).one()
+        if count:
+            return ('table', count, last_update)
+    except Exception as e:
+        current_app.logger.error(f"Error reading NAV table: {str(e)}")
 
-    Args:
-        limit: Number of funds to return
-        period: Period for which to calculate returns ('one_month', 'three_month', 'six_month', 'one_year')
+    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'mutual_funds.csv')
+    try:
+        return ('csv', os.path.getmtime(csv_path))
+    except OSError:
+        return ('csv', None)
 
-    Returns:
-        list: List of top performing funds with their details
+def get_search_index():
     """
-    # List of popular fund codes to analyze
-    popular_funds = [
-        100033,  # Aditya Birla Sun Life Equity Advantage Fund
-        120503,  # SBI Blue Chip Fund
-        118834,  # Axis Bluechip Fund
-        119598,  # HDFC Index Fund-NIFTY 50 Plan
-        120716,  # Mirae Asset Large Cap Fund
-        122639,  # ICICI Prudential Bluechip Fund
-        125354,  # Kotak Standard Multicap Fund
-        118560,  # Parag Parikh Flexi Cap Fund
-        119237,  # UTI Nifty Index Fund
-        120178,  # Nippon India Small Cap Fund
-        125354,  # Kotak Standard Multicap Fund
-        125497,  # Axis Midcap Fund
-        120505,  # SBI Small Cap Fund
-        118533,  # HDFC Mid-Cap Opportunities Fund
-        118701   # ICICI Prudential Value Discovery Fund
-    ]
-
-    results = []
+    Get the search index over the mutual fund list
 
-    # Get data for each fund
-    for code in popular_funds:
-        try:
-            fund_data = get_mutual_fund_details(code)
-            if fund_data and period in fund_data and fund_data[period] is not None:
-                results.append(fund_data)
-        except Exception as e:
-            current_app.logger.error(f"Error getting data for fund {code}: {str(e)}")
-
-    # Sort by the specified period's return (descending)
-    if results:
-        results.sort(key=lambda x: x.get(period, 0) if x.get(period) is not None else -float('inf'), reverse=True)
-
-    return results[:limit]
+    The index is built on first use and rebuilt when the NAV table or the
+    CSV file changes; the source is checked at most every
+    SEARCH_INDEX_CHECK_SECONDS.
+    """
+    global _search_index, _search_index_signature, _search_index_checked_at
+    with _search_index_lock:
+        if _search_index is not None and time.monotonic() - _search_index_checked_at < SEARCH_INDEX_CHECK_SECONDS:
+            return _search_index
+
+        signature = _mutual_fund_list_signature()
+        if _search_index is None or signature != _search_index_signature:
+            mf_list = load_mutual_fund_list()
+            _search_index = FundSearchIndex([int(code) for code in mf_list['schemeCode']],
+                                            mf_list['schemeName'].tolist())
+            _search_index_signature = signature
+        _search_index_checked_at = time.monotonic()
+        return _search_index
 
 def estimate_aum(scheme_code, data):
     """
@@ -325,133 +537,6 @@ def categorize_fund_size(scheme_code, data):
     else:
         return 'other'
 
-def get_top_gainers_and_losers(limit=5):
-    """
-    Get top gainers and losers based on one month returns
-
-    Args:
-        limit: Number of funds to return in each category
-
-    Returns:
-        dict: Dictionary with top gainers and losers
-    """
-    # List of popular fund codes to analyze
-    popular_funds = [
-        100033,  # Aditya Birla Sun Life Equity Advantage Fund
-        120503,  # SBI Blue Chip Fund
-        118834,  # Axis Bluechip Fund
-        119598,  # HDFC Index Fund-NIFTY 50 Plan
-        120716,  # Mirae Asset Large Cap Fund
-        122639,  # ICICI Prudential Bluechip Fund
-        125354,  # Kotak Standard Multicap Fund
-        118560,  # Parag Parikh Flexi Cap Fund
-        119237,  # UTI Nifty Index Fund
-        120178,  # Nippon India Small Cap Fund
-        125354,  # Kotak Standard Multicap Fund
-        125497,  # Axis Midcap Fund
-        120505,  # SBI Small Cap Fund
-        118533,  # HDFC Mid-Cap Opportunities Fund
-        118701,  # ICICI Prudential Value Discovery Fund
-        118989,  # Kotak Emerging Equity Fund
-        120465,  # Nippon India Growth Fund
-        118565,  # Canara Robeco Emerging Equities Fund
-        118551,  # DSP Midcap Fund
-        118568   # Franklin India Prima Fund
-    ]
-
-    results = []
-
-    # Get data for each fund
-    for code in popular_funds:
-        try:
-            fund_data = get_mutual_fund_details(code)
-            if fund_data and 'one_month_return' in fund_data and fund_data['one_month_return'] is not None:
-                results.append(fund_data)
-        except Exception as e:
-            current_app.logger.error(f"Error getting data for fund {code}: {str(e)}")
-
-    # Sort by one month return
-    if results:
-        results.sort(key=lambda x: x.get('one_month_return', 0) if x.get('one_month_return') is not None else 0)
-
-    # Get top losers (first 'limit' items) and top gainers (last 'limit' items in reverse)
-    top_losers = results[:limit]
-    top_gainers = list(reversed(results[-limit:]))
-
-    return {
-        'top_gainers': top_gainers,
-        'top_losers': top_losers
-    }
-
-def get_top_funds_by_category(category='large-cap', period='one_year_return', limit=5):
-    """
-    Get top performing funds by category
-
-    Args:
-        category: Fund category ('large-cap', 'mid-cap', 'small-cap')
-        period: Return period to sort by ('one_year_return', 'three_year_return', 'five_year_return')
-        limit: Number of funds to return
-
-    Returns:
-        list: List of top performing funds in the category
-    """
-    # List of funds by category
-    fund_categories = {
-        'large-cap': [
-            120503,  # SBI Blue Chip Fund
-            118834,  # Axis Bluechip Fund
-            120716,  # Mirae Asset Large Cap Fund
-            122639,  # ICICI Prudential Bluechip Fund
-            119598,  # HDFC Index Fund-NIFTY 50 Plan
-            119237,  # UTI Nifty Index Fund
-            100033,  # Aditya Birla Sun Life Frontline Equity Fund
-            118701,  # ICICI Prudential Bluechip Fund
-            120661,  # Kotak Bluechip Fund
-            118568   # Nippon India Large Cap Fund
-        ],
-        'mid-cap': [
-            125497,  # Axis Midcap Fund
-            118533,  # HDFC Mid-Cap Opportunities Fund
-            118551,  # DSP Midcap Fund
-            118989,  # Kotak Emerging Equity Fund
-            120465,  # Nippon India Growth Fund
-            118565,  # Canara Robeco Emerging Equities Fund
-            118568,  # Franklin India Prima Fund
-            120716,  # Mirae Asset Midcap Fund
-            122639,  # ICICI Prudential Midcap Fund
-            125354   # Kotak Emerging Equity Fund
-        ],
-        'small-cap': [
-            120178,  # Nippon India Small Cap Fund
-            120505,  # SBI Small Cap Fund
-            118560,  # Axis Small Cap Fund
-            125354,  # Kotak Small Cap Fund
-            118701,  # ICICI Prudential Smallcap Fund
-            118989,  # DSP Small Cap Fund
-            120465,  # HDFC Small Cap Fund
-            118565,  # Aditya Birla Sun Life Small Cap Fund
-            118551,  # Tata Small Cap Fund
-            118568   # L&T Emerging Businesses Fund
-        ]
-    }
-
-    results = []
-
-    # Get data for each fund in the category
-    for code in fund_categories.get(category, []):
-        try:
-            fund_data = get_mutual_fund_details(code)
-            if fund_data and period in fund_data and fund_data[period] is not None:
-                results.append(fund_data)
-        except Exception as e:
-            current_app.logger.error(f"Error getting data for fund {code}: {str(e)}")
-
-    # Sort by the specified period's return (descending)
-    if results:
-        results.sort(key=lambda x: x.get(period, 0) if x.get(period) is not None else -float('inf'), reverse=True)
-
-    return results[:limit]
-
 def search_mutual_funds(query, limit=10):
     """
     Search for mutual funds by name
@@ -463,12 +548,11 @@ def search_mutual_funds(query, limit=10):
     Returns:
         list: List of matching mutual funds
     """
-    mf_list = load_mutual_fund_list()
+    search_index = get_search_index()
 
     if query:
-        # Search for the query in the scheme name (case-insensitive)
-        results = mf_list[mf_list['schemeName'].str.contains(query, case=False)]
-        return results.head(limit).to_dict('records')
+        # Search for the query in the scheme names
+        return search_index.search(query, limit)
     else:
         # Return some popular funds if no query is provided
         popular_funds = [
@@ -484,8 +568,7 @@ def search_mutual_funds(query, limit=10):
             120178   # Nippon India Small Cap Fund
         ]
 
-        popular_mf = mf_list[mf_list['schemeCode'].isin(popular_funds)]
-        return popular_mf.to_dict('records')
+        return search_index.lookup(popular_funds)
 
 def get_popular_funds(limit=50):
     """
@@ -497,55 +580,19 @@ def get_popular_funds(limit=50):
     Returns:
         list: List of popular mutual funds with their details
     """
-    # List of popular fund codes
-    popular_funds = [
-        100033,  # Aditya Birla Sun Life Equity Advantage Fund
-        120503,  # SBI Blue Chip Fund
-        118834,  # Axis Bluechip Fund
-        119598,  # HDFC Index Fund-NIFTY 50 Plan
-        120716,  # Mirae Asset Large Cap Fund
-        122639,  # ICICI Prudential Bluechip Fund
-        125354,  # Kotak Standard Multicap Fund
-        118560,  # Parag Parikh Flexi Cap Fund
-        119237,  # UTI Nifty Index Fund
-        120178,  # Nippon India Small Cap Fund
-        125497,  # Axis Midcap Fund
-        120505,  # SBI Small Cap Fund
-        118533,  # HDFC Mid-Cap Opportunities Fund
-        118701,  # ICICI Prudential Value Discovery Fund
-        118989,  # Kotak Emerging Equity Fund
-        120465,  # Nippon India Growth Fund
-        118565,  # Canara Robeco Emerging Equities Fund
-        118551,  # DSP Midcap Fund
-        118568,  # Franklin India Prima Fund
-        120661,  # Kotak Bluechip Fund
-        120716,  # Mirae Asset Midcap Fund
-        122639,  # ICICI Prudential Midcap Fund
-        118560,  # Axis Small Cap Fund
-        125354,  # Kotak Small Cap Fund
-        118701,  # ICICI Prudential Smallcap Fund
-        118989,  # DSP Small Cap Fund
-        120465,  # HDFC Small Cap Fund
-        118565,  # Aditya Birla Sun Life Small Cap Fund
-        118551,  # Tata Small Cap Fund
-        118568   # L&T Emerging Businesses Fund
-    ]
-
     # Remove duplicates while preserving order
     unique_funds = []
-    for fund in popular_funds:
+    for fund in POPULAR_FUNDS:
         if fund not in unique_funds:
             unique_funds.append(fund)
 
     results = []
 
-    # Get details for each fund
-    for code in unique_funds[:limit]:  # Limit the number of funds to process
-        try:
-            fund_data = get_mutual_fund_details(code)
-            if fund_data:
-                results.append(fund_data)
-        except Exception as e:
-            current_app.logger.error(f"Error getting data for fund {code}: {str(e)}")
+    # Get details for all funds at once
+    fund_details = get_multiple_mutual_fund_details(unique_funds[:limit])  # Limit the number of funds to process
+    for code in unique_funds[:limit]:
+        fund_data = fund_details.get(code)
+        if fund_data:
+            results.append(fund_data)
 
     return results
@@ -0,0 +1,175 @@
+"""
+Utility module for the mutual fund analysis dataset
+The cleaned_data.xlsx workbook is parsed once, its columns are renamed to
+standard names and converted to numbers in a single pass, and the result
+is saved as a pickled DataFrame next to the workbook. The frame is kept in
+memory and reloaded only when the workbook's modification time changes
+"""
+
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+# Workbook locations, in order of preference
+DATASET_FILES = [
+    os.path.join(DATA_DIR, 'cleaned_data.xlsx'),
+    'Mutual-funds-Analysis-and-prediction-main/cleaned_data.xlsx'
+]
+
+# Converted dataset, saved with the path and modification time of the workbook it came from
+CONVERTED_FILE = os.path.join(DATA_DIR, 'cleaned_data.pkl')
+
+# Standard column names and the workbook column names they may appear under
+COLUMN_ALIASES = {
+    # Fund info
+    'Fund Name': ['Fund Name', 'scheme_name', 'fund_name', 'name'],
+    'Type': ['Type', 'type_of_fund', 'Fund Type', 'fund_type', 'scheme_type'],
+    'Rating': ['Rating', 'rating', 'star_rating', 'rating_of_funds_individual_lst'],
+
+    # Financial metrics
+    'AUM (Cr.)': ['AUM (Cr.)', 'aum', 'aum_funds_individual_lst', 'AUM'],
+    'NAV': ['NAV', 'nav', 'net_asset_value', 'nav_funds_individual_lst'],
+    'Expense Ratio': ['Expense Ratio', 'expense_ratio', 'expense'],
+
+    # Return metrics
+    '1 Year Return': ['1 Year Return', 'one_year_returns', '1_year_return', 'one_year_return'],
+    '3 Year Return': ['3 Year Return', 'three_year_returns', '3_year_return', 'three_year_return'],
+    '5 Year Return': ['5 Year Return', 'five_year_returns', '5_year_return', 'five_year_return'],
+
+    # Risk metrics
+    'Risk': ['Risk', 'risk', 'risk_rating', 'risk_of_the_fund'],
+
+    # Allocation
+    'Equity %': ['Equity %', 'equity_per', 'equity_percentage', 'equity'],
+    'Debt %': ['Debt %', 'debt_per', 'debt_percentage', 'debt']
+}
+
+# Standard columns stored as numbers
+NUMERIC_COLUMNS = [
+    'AUM (Cr.)', 'NAV', 'Expense Ratio', '1 Year Return', '3 Year Return',
+    '5 Year Return', 'Equity %', 'Debt %'
+]
+
+_lock = threading.Lock()
+_dataset = None
+_loaded_source = None
+_hash = None
+_hashed_source = None
+
+def normalize_columns(df):
+    """
+    Rename columns to the standard names in COLUMN_ALIASES and convert numeric columns
+
+    Columns without a standard name are kept as they are.
+
+    Args:
+        df: DataFrame as read from the workbook
+
+    Returns:
+        pd.DataFrame: The normalized DataFrame
+    """
+    renames = {}
+    for std_name, aliases in COLUMN_ALIASES.items():
+        for column in aliases:
+            if column in df.columns:
+                renames[column] = std_name
+                break
+
+    df = df.rename(columns=renames)
+
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
+
+def _dataset_file():
+    for path in DATASET_FILES:
+        if os.path.exists(path):
+            return path
+    return None
+
+def _read_converted(path, mtime):
+    """Get the converted dataset if it was made from this workbook at this mtime"""
+    if not os.path.exists(CONVERTED_FILE):
+        return None
+    try:
+        converted = pd.read_pickle(CONVERTED_FILE)
+    except Exception as e:
+        print(f"Error reading converted dataset: {e}")
+        return None
+    if converted.get('source') != path or converted.get('source_mtime') != mtime:
+        return None
+    return converted['data']
+
+def _write_converted(df, path, mtime):
+    # Write to a temporary file first so readers never see a partial file
+    temp_file = f"{CONVERTED_FILE}.tmp"
+    try:
+        pd.to_pickle({'source': path, 'source_mtime': mtime, 'data': df}, temp_file)
+        os.replace(temp_file, CONVERTED_FILE)
+    except Exception as e:
+        print(f"Error saving converted dataset: {e}")
+
+def load_dataset():
+    """
+    Get the mutual fund analysis dataset with standard column names
+
+    The returned DataFrame is shared between callers and must not be
+    modified; copy it first if needed.
+
+    Returns:
+        pd.DataFrame: The dataset, or an empty DataFrame if no workbook is found
+    """
+    global _dataset, _loaded_source
+    path = _dataset_file()
+    if path is None:
+        print(f"Dataset not found in any of: {DATASET_FILES}")
+        return pd.DataFrame()
+
+    mtime = os.path.getmtime(path)
+    with _lock:
+        if _dataset is not None and _loaded_source == (path, mtime):
+            return _dataset
+
+        df = _read_converted(path, mtime)
+        if df is None:
+            try:
+                df = normalize_columns(pd.read_excel(path))
+                print(f"Successfully loaded data from {path}")
+            except Exception as e:
+                print(f"Error loading data from {path}: {e}")
+                return pd.DataFrame()
+            _write_converted(df, path, mtime)
+
+        _dataset = df
+        _loaded_source = (path, mtime)
+        return df
+
+def dataset_hash():
+    """
+    Get a hash of the workbook's contents, recomputed only when it changes
+
+    Returns:
+        str: SHA-256 hex digest, or None if no workbook is found
+    """
+    global _hash, _hashed_source
+    path = _dataset_file()
+    if path is None:
+        return None
+
+    source = (path, os.path.getmtime(path))
+    with _lock:
+        if _hashed_source == source:
+            return _hash
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _hash = digest.hexdigest()
+        _hashed_source = source
+        return _hash
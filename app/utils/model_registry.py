@@ -0,0 +1,264 @@
+"""
+Utility module for the return prediction models
+The pickled estimators for 1, 3 and 5 year returns are loaded once per
+worker process in a background thread at startup. Predictions are made
+for many funds at once by building one feature matrix and calling the
+estimator's predict on it
+"""
+
+import os
+import pickle
+import threading
+
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models', 'ml_models')
+
+# Fallback location of the model files
+ALTERNATIVE_MODEL_DIR = 'Mutual-funds-Analysis-and-prediction-main'
+
+# Prediction horizon -> model file
+MODEL_FILES = {
+    'one_year': 'model_one_year_returns_new.pkl',
+    'three_year': 'model_three_year_returns_new.pkl',
+    'five_year': 'model_five_year_returns_new.pkl'
+}
+
+HORIZONS = list(MODEL_FILES)
+
+# Longest time a prediction waits for the models to finish loading, in seconds
+MODEL_LOAD_TIMEOUT = 10
+
+# Feature contract, taken from the training data (cleaned_data.xlsx): each
+# model is trained on the dataset's columns in dataset order, aum (crore), nav,
+# rating (1-5 stars), minimum (minimum investment in rupees), debt and equity
+# (percentages), risk and type, followed by the returns (in percent) for the
+# other two horizons in HORIZONS order (see feature_columns). The notebook
+# that fitted the models isn't in the repository, so risk and type are coded
+# the way sklearn's LabelEncoder codes the dataset's categories, in sorted
+# order. A loaded model is checked against the contract (check_contract) and
+# not used if it differs.
+BASE_FEATURES = ['aum', 'nav', 'rating', 'minimum', 'debt', 'equity', 'risk', 'type']
+
+# Numeric codes for the categorical features, one per category in the training data
+RISK_LEVELS = {
+    'High': 0, 'Low': 1, 'Low to Moderate': 2, 'Moderate': 3,
+    'Moderately High': 4, 'Moderately Low': 5, 'Very High': 6
+}
+FUND_TYPES = {'Debt': 0, 'Equity': 1, 'Hybrid': 2, 'Other': 3, 'Solution Oriented': 4}
+
+# Minimum investment used when none is given, in rupees (the training data's median)
+DEFAULT_MINIMUM_INVESTMENT = 500
+
+# Weights of the other horizons' returns in the formula used when a model isn't available
+FALLBACK_WEIGHTS = {
+    'one_year': {'three_year': 0.4, 'five_year': 0.2},
+    'three_year': {'one_year': 1.5, 'five_year': 0.5},
+    'five_year': {'one_year': 0.3, 'three_year': 1.2}
+}
+
+# Half-width of the range around a prediction, as a fraction of the prediction
+PREDICTION_DELTA = 0.2
+
+def feature_columns(horizon):
+    """Get the feature names, in matrix column order, for a horizon's model"""
+    return BASE_FEATURES + [other for other in HORIZONS if other != horizon]
+
+def check_contract(model, horizon):
+    """
+    Check a fitted model against the feature contract for its horizon
+
+    Estimators fitted on a DataFrame record their feature names, which must
+    match feature_columns exactly; otherwise only the feature count can be
+    checked. The model must also predict a row of the contract's width.
+
+    Returns:
+        str: Description of the mismatch, or None if the model matches
+    """
+    columns = feature_columns(horizon)
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None and list(names) != columns:
+        return f"expects features {list(names)}, not {columns}"
+    count = getattr(model, 'n_features_in_', None)
+    if count is not None and count != len(columns):
+        return f"expects {count} features, not {len(columns)}"
+    try:
+        prediction = np.asarray(model.predict(np.zeros((1, len(columns)))), dtype=float)
+    except Exception as e:
+        return f"can't predict from {len(columns)} features: {e}"
+    if prediction.shape != (1,):
+        return f"predicts shape {prediction.shape} for one row, not (1,)"
+    return None
+
+def _encode(value, codes, name):
+    if isinstance(value, str):
+        if value not in codes:
+            raise ValueError(f"unknown {name} '{value}'")
+        return codes[value]
+    return float(value)
+
+def feature_matrix(rows, horizon):
+    """
+    Build the feature matrix for a horizon's model
+
+    Args:
+        rows: List of dictionaries with aum, nav, rating, equity, risk, type
+            and the returns for the other horizons (one_year, three_year,
+            five_year); debt defaults to 100 - equity and minimum to
+            DEFAULT_MINIMUM_INVESTMENT
+        horizon: Prediction horizon (one of HORIZONS)
+
+    Returns:
+        np.ndarray: Matrix with one row per input row
+
+    Raises:
+        ValueError: If a row is missing a feature or has an invalid value
+    """
+    columns = feature_columns(horizon)
+    matrix = np.empty((len(rows), len(columns)), dtype=float)
+
+    for i, row in enumerate(rows):
+        row = dict(row)
+        if row.get('debt') is None and row.get('equity') is not None:
+            row['debt'] = 100 - float(row['equity'])
+        if row.get('minimum') is None:
+            row['minimum'] = DEFAULT_MINIMUM_INVESTMENT
+        missing = [column for column in columns if row.get(column) is None]
+        if missing:
+            raise ValueError(f"Row {i}: missing {', '.join(missing)}")
+
+        try:
+            for j, column in enumerate(columns):
+                if column == 'risk':
+                    matrix[i, j] = _encode(row[column], RISK_LEVELS, 'risk level')
+                elif column == 'type':
+                    matrix[i, j] = _encode(row[column], FUND_TYPES, 'fund type')
+                else:
+                    matrix[i, j] = float(row[column])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Row {i}: {e}")
+
+    return matrix
+
+def fallback_predict(matrix, horizon):
+    """
+    Estimate returns from the other horizons' returns and the equity share
+
+    Used when a horizon's model can't be loaded or isn't fitted.
+    """
+    columns = feature_columns(horizon)
+    prediction = np.zeros(len(matrix))
+    for other, weight in FALLBACK_WEIGHTS[horizon].items():
+        prediction += matrix[:, columns.index(other)] * weight
+    return prediction * matrix[:, columns.index('equity')] / 100
+
+class ModelRegistry:
+    """
+    Return prediction models, loaded once in the background
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._loaded = threading.Event()
+
+    def _model_path(self, horizon):
+        path = os.path.join(MODEL_DIR, MODEL_FILES[horizon])
+        if os.path.exists(path):
+            return path
+        alternative = os.path.join(ALTERNATIVE_MODEL_DIR, MODEL_FILES[horizon])
+        if os.path.exists(alternative):
+            return alternative
+        return None
+
+    def load(self):
+        """Load every model that exists, is fitted and accepts the contract's features"""
+        models = {}
+        for horizon in HORIZONS:
+            path = self._model_path(horizon)
+            if path is None:
+                print(f"Model file not found: {MODEL_FILES[horizon]}")
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    model = pickle.load(f)
+            except Exception as e:
+                print(f"Error loading model from {path}: {e}")
+                continue
+
+            # An estimator pickled before fitting has no learned attributes
+            if not any(name.endswith('_') and not name.startswith('_') for name in vars(model)):
+                print(f"Model in {path} is not fitted; using the fallback formula")
+                continue
+
+            mismatch = check_contract(model, horizon)
+            if mismatch:
+                print(f"Model in {path} {mismatch}; using the fallback formula")
+                continue
+
+            models[horizon] = model
+            print(f"Loaded model from {path}")
+
+        with self._lock:
+            self._models = models
+        self._loaded.set()
+
+    def start_loading(self):
+        """Start loading the models in a background thread, once per process"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        def load():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Error loading models: {e}")
+                self._loaded.set()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def models(self, timeout=MODEL_LOAD_TIMEOUT):
+        """
+        Get the loaded models, waiting for loading to finish
+
+        Returns:
+            dict: Dictionary mapping horizons to estimators
+        """
+        self.start_loading()
+        self._loaded.wait(timeout)
+        with self._lock:
+            return dict(self._models)
+
+    def predict(self, horizon, rows):
+        """
+        Predict returns for many funds at once
+
+        Args:
+            horizon: Prediction horizon (one of HORIZONS)
+            rows: List of feature dictionaries (see feature_matrix)
+
+        Returns:
+            tuple: (predictions, source), where predictions is a float array
+            with one value per row and source is 'model' or 'formula'
+
+        Raises:
+            ValueError: If the horizon is unknown or a row is invalid
+        """
+        if horizon not in MODEL_FILES:
+            raise ValueError(f"Unknown horizon: {horizon}")
+        if not rows:
+            return np.zeros(0), 'model'
+
+        matrix = feature_matrix(rows, horizon)
+        model = self.models().get(horizon)
+        if model is not None:
+            try:
+                return np.asarray(model.predict(matrix), dtype=float), 'model'
+            except Exception as e:
+                print(f"Error predicting with the {horizon} model: {e}")
+        return fallback_predict(matrix, horizon), 'formula'
+
+model_registry = ModelRegistry()
@@ -0,0 +1,107 @@
+"""
+Utility module for compact NAV series
+A NAV history is held as two aligned arrays, epoch days (int32) and NAVs
+(float64), instead of a list of date/NAV dictionaries. The same columnar
+form is sent to the browser, optionally sliced to a date range and
+downsampled
+"""
+
+import numpy as np
+import pandas as pd
+
+# Decimal places kept for NAVs in payloads
+PAYLOAD_DECIMALS = 4
+
+def to_epoch_day(value):
+    """Convert a date-like value to days since 1970-01-01"""
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype(np.int64))
+
+class NAVSeries:
+    """
+    NAV history of a scheme as aligned epoch-day and NAV arrays, sorted by date
+    """
+
+    def __init__(self, days, navs):
+        self.days = np.asarray(days, dtype=np.int32)
+        self.navs = np.asarray(navs, dtype=np.float64)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a series from MFAPI records
+
+        Args:
+            records: List of {'date': 'dd-mm-YYYY', 'nav': '...'} dictionaries, in any order
+
+        Returns:
+            NAVSeries: The series, without entries whose date or NAV can't be parsed
+        """
+        frame = pd.DataFrame(records, columns=['date', 'nav'])
+        dates = pd.to_datetime(frame['date'], format='%d-%m-%Y', errors='coerce')
+        navs = pd.to_numeric(frame['nav'], errors='coerce')
+        valid = (dates.notna() & navs.notna()).to_numpy()
+
+        days = dates[valid].to_numpy().astype('datetime64[D]').astype(np.int64)
+        order = np.argsort(days, kind='stable')
+        return cls(days[order], navs[valid].to_numpy()[order])
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Build a series from the output of to_payload"""
+        return cls(payload.get('days', []), payload.get('navs', []))
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def dates(self):
+        """NAV dates as a datetime64[D] array"""
+        return self.days.astype(np.int64).astype('datetime64[D]')
+
+    def slice(self, start=None, end=None):
+        """
+        Get the part of the series between two dates (inclusive)
+
+        Args:
+            start: First date to keep, or None
+            end: Last date to keep, or None
+        """
+        lo = 0 if start is None else np.searchsorted(self.days, to_epoch_day(start), side='left')
+        hi = len(self.days) if end is None else np.searchsorted(self.days, to_epoch_day(end), side='right')
+        return NAVSeries(self.days[lo:hi], self.navs[lo:hi])
+
+    def downsample(self, max_points):
+        """
+        Reduce the series to at most max_points evenly spaced entries
+
+        The first and last entries are always kept.
+        """
+        if not max_points or len(self.days) <= max_points:
+            return self
+        if max_points < 2:
+            return NAVSeries(self.days[-1:], self.navs[-1:])
+        positions = np.unique(np.linspace(0, len(self.days) - 1, max_points).round().astype(np.int64))
+        return NAVSeries(self.days[positions], self.navs[positions])
+
+    def volatility(self):
+        """Annualized volatility of daily returns, in percent"""
+        if len(self.navs) < 3:
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_returns = self.navs[1:] / self.navs[:-1] - 1
+        daily_returns = daily_returns[np.isfinite(daily_returns)]
+        if len(daily_returns) < 2:
+            return None
+        return float(daily_returns.std(ddof=1) * 100 * (252 ** 0.5))
+
+    def to_payload(self):
+        """
+        Get the series as a JSON-serializable dictionary
+
+        Returns:
+            dict: Dictionary with 'days' (days since 1970-01-01) and 'navs'
+        """
+        return {
+            'days': self.days.tolist(),
+            'navs': np.round(self.navs, PAYLOAD_DECIMALS).tolist()
+        }
@@ -0,0 +1,204 @@
+"""
+Utility module for storing mutual fund NAV data
+Scheme data fetched from MFAPI is kept on disk per scheme and reused until
+the next NAV is expected to be published, since NAVs change at most once
+per business day. Stored histories are brought up to date by appending
+the latest NAVs rather than downloading the full history again
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Store directory
+STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'nav')
+os.makedirs(STORE_DIR, exist_ok=True)
+
+# NAVs are published for each business day by late evening IST
+NAV_TIMEZONE = ZoneInfo('Asia/Kolkata')
+NAV_PUBLICATION_TIME = time(23, 0)
+
+# How long stored data missing the expected NAV is reused before MFAPI is checked again, in seconds
+NAV_RECHECK_SECONDS = 30 * 60
+
+_lock = threading.Lock()
+
+def _scheme_path(scheme_code):
+    return os.path.join(STORE_DIR, f"{scheme_code}.json")
+
+def next_nav_publication(after):
+    """
+    Get the next time a NAV is expected to be published after a moment
+
+    NAVs are published on business days (Monday to Friday) at
+    NAV_PUBLICATION_TIME IST.
+
+    Args:
+        after: Timezone-aware datetime
+
+    Returns:
+        datetime: Next expected publication time, in IST
+    """
+    after = after.astimezone(NAV_TIMEZONE)
+    candidate = datetime.combine(after.date(), NAV_PUBLICATION_TIME, tzinfo=NAV_TIMEZONE)
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:  # Skip Saturday and Sunday
+        candidate += timedelta(days=1)
+    return candidate
+
+def expected_nav_date(now=None):
+    """
+    Get the date of the most recent NAV that should already be published
+
+    Args:
+        now: Timezone-aware datetime, defaults to the current time
+
+    Returns:
+        date: The latest business day whose NAV publication time has passed
+    """
+    now = (now or datetime.now(NAV_TIMEZONE)).astimezone(NAV_TIMEZONE)
+    day = now.date()
+    if now.time() < NAV_PUBLICATION_TIME:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:  # Skip Saturday and Sunday
+        day -= timedelta(days=1)
+    return day
+
+def _nav_date(entry):
+    return datetime.strptime(entry['date'], '%d-%m-%Y').date()
+
+def has_scheme(scheme_code):
+    """Check whether any data is stored for a scheme"""
+    return os.path.exists(_scheme_path(scheme_code))
+
+def stored_scheme_codes():
+    """Get the codes of all schemes with stored data"""
+    codes = []
+    for filename in os.listdir(STORE_DIR):
+        name, extension = os.path.splitext(filename)
+        if extension == '.json' and name.isdigit():
+            codes.append(int(name))
+    return codes
+
+def _read_stored(scheme_code):
+    path = _scheme_path(scheme_code)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def read_scheme(scheme_code, fresh_only=True):
+    """
+    Read the stored MFAPI data for a scheme
+
+    Args:
+        scheme_code: The scheme code of the mutual fund
+        fresh_only: Only return data that is still fresh (see _is_fresh)
+
+    Returns:
+        dict: The stored MFAPI data, or None if nothing (fresh) is stored
+    """
+    try:
+        stored = _read_stored(scheme_code)
+    except Exception as e:
+        print(f"Error reading stored NAV data for {scheme_code}: {e}")
+        return None
+    if stored is None:
+        return None
+
+    if fresh_only and not _is_fresh(stored):
+        return None
+    return stored['data']
+
+def _is_fresh(stored):
+    """
+    Check whether stored data can be served without asking MFAPI
+
+    Data is fresh when it was fetched before the next NAV publication and
+    holds the NAV for expected_nav_date(). Data missing that NAV (a holiday
+    or a late publication) is only reused for NAV_RECHECK_SECONDS after
+    MFAPI was last checked.
+    """
+    now = datetime.now(NAV_TIMEZONE)
+    entries = stored['data'].get('data') or []
+    fetched_at = datetime.fromisoformat(stored['fetched_at'])
+    if entries and now < next_nav_publication(fetched_at) and _nav_date(entries[0]) >= expected_nav_date(now):
+        return True
+
+    checked_at = datetime.fromisoformat(stored.get('checked_at', stored['fetched_at']))
+    return now - checked_at < timedelta(seconds=NAV_RECHECK_SECONDS)
+
+def _write_stored(scheme_code, stored):
+    path = _scheme_path(scheme_code)
+    with _lock:
+        # Write to a temporary file first so readers never see a partial file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(stored, f)
+        os.replace(temp_path, path)
+
+def write_scheme(scheme_code, data):
+    """
+    Store the MFAPI data for a scheme
+
+    Args:
+        scheme_code: The scheme code of the mutual fund
+        data: The MFAPI response with 'meta' and 'data'
+    """
+    now = datetime.now(NAV_TIMEZONE).isoformat()
+    _write_stored(scheme_code, {'fetched_at': now, 'checked_at': now, 'data': data})
+
+def _mark_checked(scheme_code, stored):
+    """Record that MFAPI was checked without changing when the data was fetched"""
+    stored = dict(stored, checked_at=datetime.now(NAV_TIMEZONE).isoformat())
+    _write_stored(scheme_code, stored)
+
+def append_latest(scheme_code, latest):
+    """
+    Append the latest NAVs to the stored history of a scheme
+
+    The latest NAVs are only appended when they directly follow the stored
+    history. If business days are missing in between, the stored history
+    may have a gap and None is returned so the caller can fetch the full
+    history instead. When there is nothing new, only the time MFAPI was
+    checked is recorded; the fetch time is left unchanged.
+
+    Args:
+        scheme_code: The scheme code of the mutual fund
+        latest: MFAPI response with 'meta' and the newest entries in 'data'
+
+    Returns:
+        dict: The updated MFAPI data, or None if nothing is stored or there is a gap
+    """
+    stored = _read_stored(scheme_code)
+    data = stored['data'] if stored else None
+    if not data or not data.get('data') or not latest or not latest.get('data'):
+        return None
+
+    stored_entries = data['data']  # Newest first, as returned by MFAPI
+    newest_date = _nav_date(stored_entries[0])
+    new_entries = [entry for entry in latest['data'] if _nav_date(entry) > newest_date]
+
+    if not new_entries:
+        _mark_checked(scheme_code, stored)
+        return data
+
+    oldest_new_date = min(_nav_date(entry) for entry in new_entries)
+    missing_days = np.busday_count(newest_date + timedelta(days=1), oldest_new_date)
+    if missing_days > 0:
+        print(f"Stored NAV history for {scheme_code} has a gap of {missing_days} business days")
+        return None
+
+    new_entries.sort(key=_nav_date, reverse=True)
+    data = {
+        'meta': latest.get('meta', data.get('meta', {})),
+        'data': new_entries + stored_entries,
+        'status': latest.get('status', data.get('status'))
+    }
+    write_scheme(scheme_code, data)
+    return data
@@ -0,0 +1,243 @@
+"""
+Utility module for storing historical OHLCV bars
+Bars are kept in one typed numpy file per symbol and memory-mapped on read,
+so a cache hit is a file map and a binary search instead of a JSON parse
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Store directory
+STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'ohlcv')
+os.makedirs(STORE_DIR, exist_ok=True)
+
+# On-disk record layout: a date index plus typed price and volume columns
+BAR_DTYPE = np.dtype([
+    ('Date', 'M8[ns]'),
+    ('Open', '<f8'),
+    ('High', '<f8'),
+    ('Low', '<f8'),
+    ('Close', '<f8'),
+    ('Volume', '<i8')
+])
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Offsets for yfinance-style periods
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10)
+}
+
+_lock = threading.Lock()
+
+def _bars_path(key):
+    return os.path.join(STORE_DIR, f"{key}.npy")
+
+def _meta_path(key):
+    return os.path.join(STORE_DIR, f"{key}.json")
+
+def period_start(period, now=None):
+    """
+    Get the first date covered by a yfinance-style period
+
+    Returns:
+        pd.Timestamp: Start date, or None for 'max'
+    """
+    now = pd.Timestamp(now or datetime.now()).normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    return now - PERIOD_OFFSETS.get(period, PERIOD_OFFSETS['1y'])
+
+def to_records(data):
+    """
+    Convert a yfinance-style DataFrame into a sorted, de-duplicated record array
+
+    Args:
+        data: DataFrame with a DatetimeIndex and Open/High/Low/Close/Volume columns
+
+    Returns:
+        np.ndarray: Structured array with BAR_DTYPE
+    """
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    index = index.normalize()
+
+    records = np.zeros(len(data), dtype=BAR_DTYPE)
+    records['Date'] = index.values
+    for column in PRICE_COLUMNS:
+        if column in data.columns:
+            records[column] = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype='f8')
+        else:
+            records[column] = np.nan
+    if 'Volume' in data.columns:
+        volume = pd.to_numeric(data['Volume'], errors='coerce').fillna(0)
+        records['Volume'] = volume.round().to_numpy(dtype='i8')
+
+    # Sort by date and keep the last bar for any repeated date
+    records = records[np.argsort(records['Date'], kind='stable')]
+    _, last_index = np.unique(records['Date'][::-1], return_index=True)
+    return records[len(records) - 1 - last_index]
+
+def to_frame(records):
+    """Convert a record array back into a yfinance-style DataFrame"""
+    data = pd.DataFrame({column: records[column] for column in PRICE_COLUMNS + ['Volume']},
+                        index=pd.DatetimeIndex(records['Date'], name='Date'))
+    return data
+
+def load_records(key):
+    """
+    Memory-map the stored bars for a key without copying them
+
+    Returns:
+        np.ndarray: Read-only structured array sorted by date, or None if nothing is stored
+    """
+    path = _bars_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path, mmap_mode='r')
+    except Exception as e:
+        print(f"Error loading stored bars for {key}: {e}")
+        return None
+
+def slice_records(records, start=None, end=None):
+    """Select the bars between start and end (inclusive) with a binary search on the date index"""
+    dates = records['Date']
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+    hi = len(records) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+    return records[lo:hi]
+
+def read_bars(key, start=None, end=None):
+    """
+    Read the stored bars for a key between two dates
+
+    Returns:
+        pd.DataFrame: Bars indexed by date, empty if nothing is stored
+    """
+    records = load_records(key)
+    if records is None:
+        return pd.DataFrame()
+    return to_frame(slice_records(records, start, end))
+
+def read_meta(key):
+    """
+    Get the metadata for a key
+
+    Returns:
+        dict: Dictionary with 'covered_from' (ISO date, or None for full
+        history) and 'updated_at' (ISO timestamp), or None if nothing is stored
+    """
+    path = _meta_path(key)
+    if not os.path.exists(path) or not os.path.exists(_bars_path(key)):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading store metadata for {key}: {e}")
+        return None
+
+def last_bar_date(key):
+    """
+    Get the date of the most recent stored bar for a key
+
+    Returns:
+        pd.Timestamp: Date of the last bar, or None if nothing is stored
+    """
+    records = load_records(key)
+    if records is None or len(records) == 0:
+        return None
+    return pd.Timestamp(records['Date'][-1])
+
+def covers(key, start, max_age=None):
+    """
+    Check whether the store holds fresh bars for a key from a start date onwards
+
+    Args:
+        key: Store key
+        start: First date needed, or None for full history
+        max_age: Maximum age of the last update as a timedelta, or None to
+            only check the covered range
+    """
+    meta = read_meta(key)
+    if not meta:
+        return False
+    if max_age is not None and datetime.now() - datetime.fromisoformat(meta['updated_at']) >= max_age:
+        return False
+    covered_from = meta.get('covered_from')
+    if covered_from is None:
+        return True
+    return start is not None and pd.Timestamp(start) >= pd.Timestamp(covered_from)
+
+def write_bars(key, data, start=None, replace=False):
+    """
+    Merge new bars into the store for a key
+
+    Bars for dates already stored are replaced. The covered range grows when
+    the new bars overlap the stored ones and restarts when they do not.
+
+    Args:
+        key: Store key
+        data: DataFrame with a DatetimeIndex and OHLCV columns
+        start: First date the new bars were requested from, or None for full history
+        replace: Replace the stored series with the new bars instead of
+            merging, so stored dates missing from the new bars are dropped
+    """
+    new_records = to_records(data)
+    if len(new_records) == 0:
+        return
+
+    with _lock:
+        existing = None if replace else load_records(key)
+        meta = read_meta(key) or {}
+        covered_from = None if start is None else pd.Timestamp(start).normalize()
+
+        if existing is not None and len(existing) > 0:
+            existing = np.array(existing)  # Copy out of the memory map before replacing the file
+            overlaps = existing['Date'][-1] >= new_records['Date'][0]
+            if overlaps:
+                previous_from = meta.get('covered_from', 'unknown')
+                if previous_from is None or covered_from is None:
+                    covered_from = None
+                elif previous_from != 'unknown':
+                    covered_from = min(covered_from, pd.Timestamp(previous_from))
+                keep = ~np.isin(existing['Date'], new_records['Date'])
+                merged = np.concatenate([existing[keep], new_records])
+                new_records = merged[np.argsort(merged['Date'], kind='stable')]
+
+        # Write to temporary files first so readers never see a partial file
+        bars_temp = f"{_bars_path(key)}.tmp"
+        with open(bars_temp, 'wb') as f:
+            np.save(f, new_records)
+        os.replace(bars_temp, _bars_path(key))
+
+        meta = {
+            'covered_from': None if covered_from is None else covered_from.strftime('%Y-%m-%d'),
+            'updated_at': datetime.now().isoformat()
+        }
+        meta_temp = f"{_meta_path(key)}.tmp"
+        with open(meta_temp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_temp, _meta_path(key))
+
+def delete_bars(key):
+    """Remove the stored bars and metadata for a key"""
+    with _lock:
+        for path in (_bars_path(key), _meta_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,129 @@
+"""
+Utility module for tracking the health of upstream data providers
+This module keeps a negative cache of lookups a provider recently answered
+with no data and a circuit breaker per provider (yfinance, NSE, MFAPI), so
+missing symbols and unavailable providers are skipped instead of retried
+on every request. Transient errors only count towards the breaker
+"""
+
+import os
+import threading
+import time
+
+# How long a lookup that returned no data is remembered before it is tried again
+NEGATIVE_CACHE_SECONDS = int(os.getenv('NEGATIVE_CACHE_SECONDS', 30 * 60))
+
+# Consecutive provider errors that open a circuit breaker
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+
+# How long an open circuit breaker waits before letting a trial request through
+BREAKER_RESET_SECONDS = int(os.getenv('BREAKER_RESET_SECONDS', 60))
+
+PROVIDERS = ('yfinance', 'nse', 'mfapi')
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single provider
+
+    The breaker opens after BREAKER_FAILURE_THRESHOLD consecutive errors.
+    While open every request is refused until BREAKER_RESET_SECONDS have
+    passed, then a single trial request is let through: success closes the
+    breaker, another error opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        """Check whether a request may be sent to the provider"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_in_progress or time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"Circuit breaker for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_progress or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"Circuit breaker for {self.name} opened after {self.failures} errors")
+                self.opened_at = time.monotonic()
+                self.trial_in_progress = False
+
+_breakers = {provider: CircuitBreaker(provider) for provider in PROVIDERS}
+_failures = {}
+_failures_lock = threading.Lock()
+
+def get_breaker(provider):
+    """Get the circuit breaker for a provider"""
+    return _breakers[provider]
+
+def is_known_failure(provider, kind, key):
+    """
+    Check whether a provider recently answered a lookup with no data
+
+    Args:
+        provider: Provider name ('yfinance', 'nse' or 'mfapi')
+        kind: Kind of lookup (e.g. 'info', 'price', 'history')
+        key: Symbol or scheme code looked up
+    """
+    with _failures_lock:
+        expires_at = _failures.get((provider, kind, key))
+        if expires_at is None:
+            return False
+        if time.monotonic() >= expires_at:
+            del _failures[(provider, kind, key)]
+            return False
+        return True
+
+def can_try(provider, kind, key):
+    """Check whether a lookup is worth sending to a provider"""
+    if is_known_failure(provider, kind, key):
+        print(f"Skipping {provider} {kind} for {key}: no data recently")
+        return False
+    if not get_breaker(provider).allow():
+        print(f"Skipping {provider} {kind} for {key}: circuit breaker open")
+        return False
+    return True
+
+def report_success(provider, kind, key):
+    """Record that a lookup succeeded"""
+    get_breaker(provider).record_success()
+    with _failures_lock:
+        _failures.pop((provider, kind, key), None)
+
+def report_miss(provider, kind, key):
+    """Record that a provider answered but had no data for a lookup"""
+    get_breaker(provider).record_success()
+    with _failures_lock:
+        _failures[(provider, kind, key)] = time.monotonic() + NEGATIVE_CACHE_SECONDS
+
+def report_error(provider, kind, key):
+    """
+    Record that a lookup failed with a provider error (timeout, HTTP error, exception)
+
+    Errors may be transient, so they only count towards the provider's
+    circuit breaker; the lookup itself is not negative-cached.
+    """
+    get_breaker(provider).record_failure()
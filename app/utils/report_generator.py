@@ -5,8 +5,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from io import BytesIO
-import base64
-import random
+import copy
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -15,7 +14,10 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Tabl
 from reportlab.platypus.flowables import HRFlowable
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 from flask import current_app
-from app.utils.mf_api import get_mutual_fund_details
+from app.utils.mf_api import get_multiple_mutual_fund_details
+from app.utils.chart_renderer import render_charts
+from app.utils.mf_dataset import load_dataset
+from app.utils.model_registry import FUND_TYPES, RISK_LEVELS, model_registry
 import tempfile
 from reportlab.graphics.shapes import Drawing, Rect
 from reportlab.graphics.charts.piecharts import Pie
@@ -294,11 +296,39 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
     elements.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#3498db')))
     elements.append(Spacer(1, 0.3*inch))
 
+    # Get details for all selected funds at once so risk metrics are calculated together
+    fund_details = get_multiple_mutual_fund_details([int(code) for code in selected_funds if str(code).isdigit()])
+
+    # Render every fund's charts together in the chart rendering pool
+    chart_functions = {
+        'performance': generate_performance_chart,
+        'asset_allocation': generate_asset_allocation_chart,
+        'risk_return': generate_risk_return_chart
+    }
+    chart_specs = {}
+    for fund_code in selected_funds:
+        fund_data = fund_details.get(int(fund_code)) if str(fund_code).isdigit() else None
+        if fund_data:
+            # The NAV history isn't needed for the charts, so don't send it to the workers
+            chart_data = {key: value for key, value in fund_data.items() if key != 'nav_history'}
+            for name, render in chart_functions.items():
+                chart_specs[(fund_code, name)] = (render, {'fund_data': chart_data})
+    charts = dict(zip(chart_specs, render_charts(list(chart_specs.values()))))
+
+    # Predict every fund's returns with one model call per horizon
+    report_funds = [(fund_code, fund_details[int(fund_code)]) for fund_code in dict.fromkeys(selected_funds)
+                    if str(fund_code).isdigit() and int(fund_code) in fund_details]
+    predictions = {
+        time_horizon: dict(zip([fund_code for fund_code, _ in report_funds],
+                               predict_returns_batch([fund_data for _, fund_data in report_funds], time_horizon)))
+        for time_horizon in PREDICTION_HORIZONS
+    }
+
     # Process each selected fund
     for fund_code in selected_funds:
         try:
             # Get fund details
-            fund_data = get_mutual_fund_details(int(fund_code))
+            fund_data = fund_details.get(int(fund_code))
 
             if not fund_data:
                 continue
@@ -371,9 +401,9 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
 
             # Create a simple performance chart (this would be replaced with actual chart generation)
             # In a real implementation, you would generate a chart based on historical NAV data
-            img_data = generate_performance_chart(fund_data)
+            img_data = charts[(fund_code, 'performance')]
             if img_data:
-                img = Image(BytesIO(base64.b64decode(img_data)))
+                img = Image(BytesIO(img_data))
                 img.drawHeight = 3*inch
                 img.drawWidth = 5*inch
                 elements.append(img)
@@ -390,6 +420,33 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
             elements.append(Paragraph(risk_text, styles['Normal']))
             elements.append(Spacer(1, 0.2*inch))
 
+            # Create a table for risk metrics
+            risk_data = [
+                ["Metric", "Value"],
+                ["Volatility (annualized)", format_metric(fund_data.get('volatility'), '%')],
+                ["Sharpe Ratio", format_metric(fund_data.get('sharpe_ratio'))],
+                ["Sortino Ratio", format_metric(fund_data.get('sortino_ratio'))],
+                ["Maximum Drawdown", format_metric(fund_data.get('max_drawdown'), '%')],
+                ["1-Year Rolling Return (avg)", format_metric(fund_data.get('rolling_return_avg'), '%')],
+                ["1-Year Rolling Return (min / max)",
+                 f"{format_metric(fund_data.get('rolling_return_min'), '%')} / "
+                 f"{format_metric(fund_data.get('rolling_return_max'), '%')}"]
+            ]
+
+            risk_table = Table(risk_data, colWidths=[2.5*inch, 2.5*inch])
+            risk_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+                ('TOPPADDING', (0, 0), (-1, -1), 6),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e0e0e0'))
+            ]))
+            elements.append(risk_table)
+            elements.append(Spacer(1, 0.3*inch))
+
             # Add asset allocation
             elements.append(Paragraph("Asset Allocation", styles['SectionTitle']))
 
@@ -421,9 +478,9 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
             elements.append(Spacer(1, 0.2*inch))
 
             # Generate and add asset allocation pie chart
-            img_data = generate_asset_allocation_chart(fund_data)
+            img_data = charts[(fund_code, 'asset_allocation')]
             if img_data:
-                img = Image(BytesIO(base64.b64decode(img_data)))
+                img = Image(BytesIO(img_data))
                 img.drawHeight = 3*inch
                 img.drawWidth = 5*inch
                 elements.append(img)
@@ -441,9 +498,9 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
             elements.append(Spacer(1, 0.2*inch))
 
             # Generate and add risk-return chart
-            img_data = generate_risk_return_chart(fund_data)
+            img_data = charts[(fund_code, 'risk_return')]
             if img_data:
-                img = Image(BytesIO(base64.b64decode(img_data)))
+                img = Image(BytesIO(img_data))
                 img.drawHeight = 3*inch
                 img.drawWidth = 5*inch
                 elements.append(img)
@@ -453,33 +510,48 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
             # Add future predictions with enhanced styling and information
             elements.append(Paragraph("Return Predictions & Analysis", styles['SectionTitle']))
 
-            # Add prediction introduction
+            # Generate predictions with our enhanced prediction function
+            one_year_pred = predictions['1y'][fund_code]
+            three_year_pred = predictions['3y'][fund_code]
+            five_year_pred = predictions['5y'][fund_code]
+
+            # Add prediction introduction, naming how the predictions were made
+            if all(pred['source'] == 'model' for pred in (one_year_pred, three_year_pred, five_year_pred)):
+                method_text = "are generated using machine learning models trained on historical mutual fund data"
+            else:
+                method_text = ("are estimated from the fund's own 1, 3 and 5 year returns, weighted towards the "
+                               "matching horizon and scaled by the typical equity allocation of its fund type, "
+                               "where a trained model is not available")
             prediction_intro = f"""
-            The following predictions are generated using machine learning models trained on historical mutual fund data.
+            The following predictions {method_text}.
             These predictions take into account the fund's historical performance, asset allocation, and market trends.
             For {fund_data['scheme_name']}, we provide predictions for 1-year, 3-year, and 5-year time horizons.
             """
+            assumed_inputs = list(dict.fromkeys(one_year_pred.get('assumed_inputs', [])))
+            if assumed_inputs:
+                prediction_intro += f"""
+                <i>Some details were not available for this fund, so typical values were assumed for:
+                {', '.join(assumed_inputs)}.</i>
+                """
             elements.append(Paragraph(prediction_intro, styles['Normal']))
             elements.append(Spacer(1, 0.2*inch))
 
-            # Generate predictions with our enhanced prediction function
-            one_year_pred = predict_returns(fund_data, '1y')
-            three_year_pred = predict_returns(fund_data, '3y')
-            five_year_pred = predict_returns(fund_data, '5y')
-
             # Create the prediction table with more information
             prediction_data = [
-                ["Time Horizon", "Predicted Return (%)", "Confidence Level", "Potential Range"],
+                ["Time Horizon", "Predicted Return (%)", "Confidence Level", "Potential Range", "Method"],
                 ["1 Year", f"{one_year_pred['prediction']:.2f}%", one_year_pred['confidence'],
-                 f"{one_year_pred['scenarios']['pessimistic']:.2f}% - {one_year_pred['scenarios']['optimistic']:.2f}%"],
+                 f"{one_year_pred['scenarios']['pessimistic']:.2f}% - {one_year_pred['scenarios']['optimistic']:.2f}%",
+                 PREDICTION_SOURCES[one_year_pred['source']]],
                 ["3 Years", f"{three_year_pred['prediction']:.2f}%", three_year_pred['confidence'],
-                 f"{three_year_pred['scenarios']['pessimistic']:.2f}% - {three_year_pred['scenarios']['optimistic']:.2f}%"],
+                 f"{three_year_pred['scenarios']['pessimistic']:.2f}% - {three_year_pred['scenarios']['optimistic']:.2f}%",
+                 PREDICTION_SOURCES[three_year_pred['source']]],
                 ["5 Years", f"{five_year_pred['prediction']:.2f}%", five_year_pred['confidence'],
-                 f"{five_year_pred['scenarios']['pessimistic']:.2f}% - {five_year_pred['scenarios']['optimistic']:.2f}%"]
+                 f"{five_year_pred['scenarios']['pessimistic']:.2f}% - {five_year_pred['scenarios']['optimistic']:.2f}%",
+                 PREDICTION_SOURCES[five_year_pred['source']]]
             ]
 
             # Create the prediction table with enhanced styling
-            pred_table = Table(prediction_data, colWidths=[1.2*inch, 1.5*inch, 1.3*inch, 1.5*inch])
+            pred_table = Table(prediction_data, colWidths=[1.0*inch, 1.4*inch, 1.2*inch, 1.4*inch, 0.9*inch])
             pred_table.setStyle(TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9b59b6')),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -599,6 +671,12 @@ def generate_mutual_funds_report(user_name, selected_funds, time_period='1y'):
 
     return pdf_path
 
+def format_metric(value, suffix=''):
+    """Format a risk metric for the report, or 'N/A' if it couldn't be calculated"""
+    if value is None:
+        return 'N/A'
+    return f"{value:.2f}{suffix}"
+
 def generate_performance_chart(fund_data):
     """
     Generate a performance chart for a mutual fund
@@ -607,7 +685,7 @@ def generate_performance_chart(fund_data):
         fund_data: Dictionary containing fund details
 
     Returns:
-        str: Base64 encoded image data
+        bytes: PNG image data
     """
     try:
         # Create a simple chart showing returns for different time periods
@@ -677,14 +755,12 @@ def generate_performance_chart(fund_data):
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight', dpi=150)
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
-        current_app.logger.error(f"Error generating performance chart: {str(e)}")
+        # Charts are drawn in the chart rendering pool, outside the app context
+        print(f"Error generating performance chart: {str(e)}")
         return None
 
 def generate_asset_allocation_chart(fund_data):
@@ -695,7 +771,7 @@ def generate_asset_allocation_chart(fund_data):
         fund_data: Dictionary containing fund details
 
     Returns:
-        str: Base64 encoded image data
+        bytes: PNG image data
     """
     try:
         # Get asset allocation data
@@ -762,14 +838,12 @@ def generate_asset_allocation_chart(fund_data):
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight', dpi=150)
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
-        current_app.logger.error(f"Error generating asset allocation chart: {str(e)}")
+        # Charts are drawn in the chart rendering pool, outside the app context
+        print(f"Error generating asset allocation chart: {str(e)}")
         return None
 
 def generate_risk_return_chart(fund_data):
@@ -780,7 +854,7 @@ def generate_risk_return_chart(fund_data):
         fund_data: Dictionary containing fund details
 
     Returns:
-        str: Base64 encoded image data
+        bytes: PNG image data
     """
     try:
         # Create sample data for risk-return comparison
@@ -834,84 +908,260 @@ def generate_risk_return_chart(fund_data):
         # Save to BytesIO object
         img_bytes = BytesIO()
         plt.savefig(img_bytes, format='png', bbox_inches='tight', dpi=150)
-        img_bytes.seek(0)
         plt.close()
 
-        # Convert to base64
-        img_base64 = base64.b64encode(img_bytes.read()).decode('utf-8')
-        return img_base64
+        return img_bytes.getvalue()
     except Exception as e:
-        current_app.logger.error(f"Error generating risk-return chart: {str(e)}")
+        # Charts are drawn in the chart rendering pool, outside the app context
+        print(f"Error generating risk-return chart: {str(e)}")
         return None
 
-def predict_returns(fund_data, time_horizon):
+# Report time horizons -> model registry horizons
+PREDICTION_HORIZONS = {'1y': 'one_year', '3y': 'three_year', '5y': 'five_year'}
+
+# How each prediction source is named in the report
+PREDICTION_SOURCES = {'model': "Model", 'formula': "Formula", 'default': "Default"}
+
+# Range, confidence and factors shown with each horizon's prediction
+PREDICTION_DETAILS = {
+    '1y': {
+        'delta': 0.1,
+        'confidence': "Medium",
+        'factors': [
+            "Recent market performance",
+            "Fund's short-term momentum",
+            "Current economic indicators",
+            "Sector allocation trends"
+        ]
+    },
+    '3y': {
+        'delta': 0.15,
+        'confidence': "Medium-Low",
+        'factors': [
+            "Historical performance patterns",
+            "Fund manager's track record",
+            "Asset allocation strategy",
+            "Market cycle position"
+        ]
+    },
+    '5y': {
+        'delta': 0.2,
+        'confidence': "Low",
+        'factors': [
+            "Long-term market trends",
+            "Fund's historical consistency",
+            "Economic cycle projections",
+            "Sector growth potential"
+        ]
+    }
+}
+
+# Returned when predictions can't be made
+DEFAULT_PREDICTION = {
+    'source': 'default',
+    'prediction': 8.0,
+    'delta': 2.0,
+    'confidence': "Low",
+    'factors': ["Historical data", "Market trends", "Economic indicators"],
+    'analysis': "Unable to generate detailed analysis due to data limitations.",
+    'scenarios': {
+        'optimistic': 10.0,
+        'base': 8.0,
+        'pessimistic': 6.0
+    }
+}
+
+# Weights of the fund's 1, 3 and 5 year returns in the report's formula, which
+# is scaled by the fund's equity share and used when no trained model is available
+REPORT_RETURN_WEIGHTS = {
+    '1y': (0.5, 0.3, 0.2),
+    '3y': (0.3, 0.5, 0.2),
+    '5y': (0.2, 0.3, 0.5)
+}
+
+# Values assumed for fund details that are missing, and how the report names them
+FEATURE_DEFAULTS = {
+    'aum': (10000, 'AUM'),
+    'nav': (100, 'NAV'),
+    'rating': (3, 'rating'),
+    'equity': (50, 'equity allocation'),
+    'risk': ('Moderate', 'risk level'),
+    'one_year': (10, '1 year return'),
+    'three_year': (12, '3 year return'),
+    'five_year': (15, '5 year return')
+}
+
+# Fund detail keys the features are read from
+FEATURE_SOURCES = {
+    'aum': 'aum',
+    'nav': 'scheme_nav',
+    'one_year': 'one_year_return',
+    'three_year': 'three_year_return',
+    'five_year': 'five_year_return'
+}
+
+# Features that aren't in the fund details and are taken from the fund's type profile
+PROFILE_FEATURES = ['equity', 'risk', 'rating']
+
+# Fund types for the fund size categories of schemes whose category has no type
+SIZE_CATEGORY_TYPES = {
+    'large-cap': 'Equity',
+    'mid-cap': 'Equity',
+    'small-cap': 'Equity',
+    'multi-cap': 'Equity',
+    'index': 'Other',
+    'debt': 'Debt',
+    'hybrid': 'Hybrid'
+}
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def fund_type(fund_data):
     """
-    Predict future returns for a mutual fund
+    Get the type of a fund, as named in FUND_TYPES
+
+    The type is the first part of the AMFI scheme category, e.g. 'Equity' for
+    'Equity Scheme - Large Cap Fund', or else follows from the fund size category.
+
+    Returns:
+        str: The fund type, or None if it can't be told
+    """
+    category = str(fund_data.get('scheme_category') or '')
+    name = category.split(' Scheme')[0].strip()
+    if name in FUND_TYPES:
+        return name
+    return SIZE_CATEGORY_TYPES.get(fund_data.get('fund_size_category'))
+
+def fund_type_profiles():
+    """
+    Get the typical equity allocation, risk level and rating of each fund type
+
+    The profiles are the medians (and the most common risk level) of the
+    funds of each type in the analysis dataset.
+
+    Returns:
+        dict: Dictionary mapping fund types to dictionaries with 'equity',
+        'risk' and 'rating' where the dataset has them; empty if the dataset
+        isn't available
+    """
+    df = load_dataset()
+    if df.empty or 'Type' not in df.columns:
+        return {}
+
+    profiles = {}
+    for name, funds in df.groupby('Type'):
+        profile = {}
+        if 'Equity %' in funds.columns and funds['Equity %'].notna().any():
+            profile['equity'] = float(funds['Equity %'].median())
+        if 'Risk' in funds.columns:
+            risks = funds['Risk'][funds['Risk'].isin(list(RISK_LEVELS))]
+            if not risks.empty:
+                profile['risk'] = risks.mode()[0]
+        if 'Rating' in funds.columns:
+            ratings = pd.to_numeric(funds['Rating'], errors='coerce')
+            if ratings.notna().any():
+                profile['rating'] = float(round(ratings.median()))
+        profiles[name] = profile
+    return profiles
+
+def fund_features(fund_data, profiles=None):
+    """
+    Build return model features for a fund from its details
+
+    AUM, NAV and returns come from the fund details. The details have no
+    equity allocation, risk level or rating, so the typical values for the
+    fund's type are used (see fund_type_profiles). Anything still missing is
+    replaced with the values in FEATURE_DEFAULTS, and reported so the report
+    can say so.
 
     Args:
         fund_data: Dictionary containing fund details
+        profiles: Fund type profiles from fund_type_profiles, or None
+
+    Returns:
+        tuple: (features, assumed), where features is the feature dictionary
+        for the model registry and assumed lists the names of the details
+        that were assumed
+    """
+    features = {}
+    assumed = []
+    for feature, key in FEATURE_SOURCES.items():
+        value = _number(fund_data.get(key))
+        if value is None:
+            value, label = FEATURE_DEFAULTS[feature]
+            assumed.append(label)
+        features[feature] = value
+
+    features['type'] = fund_type(fund_data)
+    if features['type'] is None:
+        features['type'] = 'Equity'
+        assumed.append('fund type')
+
+    profile = (profiles or {}).get(features['type'], {})
+    for feature in PROFILE_FEATURES:
+        value = profile.get(feature)
+        if value is None:
+            value, label = FEATURE_DEFAULTS[feature]
+            assumed.append(label)
+        features[feature] = value
+    return features, assumed
+
+def formula_predict(rows, time_horizon):
+    """
+    Estimate returns with the report's formula
+
+    The prediction is a weighted average of the fund's own 1, 3 and 5 year
+    returns (REPORT_RETURN_WEIGHTS), scaled by its equity share.
+
+    Args:
+        rows: List of feature dictionaries from fund_features
         time_horizon: Time horizon for prediction ('1y', '3y', '5y')
 
     Returns:
-        dict: Prediction results with detailed analysis
+        np.ndarray: One prediction per row
     """
+    returns = np.array([[row['one_year'], row['three_year'], row['five_year']] for row in rows], dtype=float)
+    equity = np.array([row['equity'] for row in rows], dtype=float)
+    return returns.reshape(-1, 3) @ np.array(REPORT_RETURN_WEIGHTS[time_horizon]) * equity / 100
+
+def predict_returns_batch(funds, time_horizon):
+    """
+    Predict future returns for several mutual funds with one model call
+
+    The horizon's trained model is used when the model registry has one;
+    otherwise the report's formula (formula_predict) is used.
+
+    Args:
+        funds: List of dictionaries containing fund details
+        time_horizon: Time horizon for prediction ('1y', '3y', '5y')
+
+    Returns:
+        list: Prediction results with detailed analysis, one per fund. Each
+        result's 'source' is 'model' or 'formula', and 'assumed_inputs' lists
+        the fund details that were missing and assumed
+    """
+    if not funds:
+        return []
+    profiles = fund_type_profiles()
+    rows, assumed = zip(*[fund_features(fund_data, profiles) for fund_data in funds])
     try:
-        # This is a simplified prediction model
-        # In a real implementation, you would use a trained machine learning model
-
-        # Extract features for prediction
-        aum = float(fund_data.get('aum', 10000))
-        nav = float(fund_data.get('scheme_nav', 100))
-        equity_pct = float(fund_data.get('equity_percentage', 50))
-        one_year_return = float(fund_data.get('one_year_return', 10))
-        three_year_return = float(fund_data.get('three_year_return', 12))
-        five_year_return = float(fund_data.get('five_year_return', 15))
-
-        # Simple prediction logic based on historical returns and asset allocation
-        if time_horizon == '1y':
-            # For 1-year prediction, give more weight to recent performance
-            prediction = (one_year_return * 0.5 + three_year_return * 0.3 + five_year_return * 0.2) * (equity_pct / 100)
-            # Add some randomness to make it look more realistic
-            prediction = prediction * (0.9 + random.random() * 0.2)
-            delta = prediction * 0.1
-            confidence = "Medium"
-            factors = [
-                "Recent market performance",
-                "Fund's short-term momentum",
-                "Current economic indicators",
-                "Sector allocation trends"
-            ]
-        elif time_horizon == '3y':
-            # For 3-year prediction, balance recent and long-term performance
-            prediction = (one_year_return * 0.3 + three_year_return * 0.5 + five_year_return * 0.2) * (equity_pct / 100)
-            prediction = prediction * (0.9 + random.random() * 0.2)
-            delta = prediction * 0.15
-            confidence = "Medium-Low"
-            factors = [
-                "Historical performance patterns",
-                "Fund manager's track record",
-                "Asset allocation strategy",
-                "Market cycle position"
-            ]
-        else:  # 5y
-            # For 5-year prediction, give more weight to long-term performance
-            prediction = (one_year_return * 0.2 + three_year_return * 0.3 + five_year_return * 0.5) * (equity_pct / 100)
-            prediction = prediction * (0.9 + random.random() * 0.2)
-            delta = prediction * 0.2
-            confidence = "Low"
-            factors = [
-                "Long-term market trends",
-                "Fund's historical consistency",
-                "Economic cycle projections",
-                "Sector growth potential"
-            ]
+        predictions, source = model_registry.predict(PREDICTION_HORIZONS[time_horizon], list(rows))
+        if source != 'model':
+            predictions, source = formula_predict(rows, time_horizon), 'formula'
+    except Exception as e:
+        current_app.logger.error(f"Error predicting returns: {str(e)}")
+        return [dict(copy.deepcopy(DEFAULT_PREDICTION), assumed_inputs=list(fund_assumed))
+                for fund_assumed in assumed]
 
+    details = PREDICTION_DETAILS[time_horizon]
+    results = []
+    for prediction, fund_assumed in zip(predictions, assumed):
         # Ensure prediction is positive (for simplicity)
-        prediction = max(prediction, 2.0)
-
-        # Generate a scenario analysis
-        optimistic = prediction * 1.3
-        pessimistic = max(prediction * 0.7, 1.0)
+        prediction = max(float(prediction), 2.0)
 
         # Generate a simple analysis text
         if prediction > 15:
@@ -921,29 +1171,31 @@ def predict_returns(fund_data, time_horizon):
         else:
             analysis = "The fund may provide moderate returns, potentially below category average, but with lower volatility."
 
-        return {
+        results.append({
             'prediction': prediction,
-            'delta': delta,
-            'confidence': confidence,
-            'factors': factors,
+            'delta': prediction * details['delta'],
+            'confidence': details['confidence'],
+            'factors': list(details['factors']),
             'analysis': analysis,
             'scenarios': {
-                'optimistic': optimistic,
+                'optimistic': prediction * 1.3,
                 'base': prediction,
-                'pessimistic': pessimistic
-            }
-        }
-    except Exception as e:
-        current_app.logger.error(f"Error predicting returns: {str(e)}")
-        return {
-            'prediction': 8.0,
-            'delta': 2.0,
-            'confidence': "Low",
-            'factors': ["Historical data", "Market trends", "Economic indicators"],
-            'analysis': "Unable to generate detailed analysis due to data limitations.",
-            'scenarios': {
-                'optimistic': 10.0,
-                'base': 8.0,
-                'pessimistic': 6.0
-            }
-        }  # Default fallback values
+                'pessimistic': max(prediction * 0.7, 1.0)
+            },
+            'source': source,
+            'assumed_inputs': list(fund_assumed)
+        })
+    return results
+
+def predict_returns(fund_data, time_horizon):
+    """
+    Predict future returns for a mutual fund
+
+    Args:
+        fund_data: Dictionary containing fund details
+        time_horizon: Time horizon for prediction ('1y', '3y', '5y')
+
+    Returns:
+        dict: Prediction results with detailed analysis
+    """
+    return predict_returns_batch([fund_data], time_horizon)[0]
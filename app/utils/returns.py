@@ -0,0 +1,124 @@
+"""
+Utility module for calculating trailing returns
+Returns for every horizon are computed at once from sorted date/NAV arrays
+with a binary search on calendar dates, for one scheme or a stacked batch
+of many schemes
+"""
+
+import numpy as np
+import pandas as pd
+
+# Trailing return horizons as calendar offsets
+RETURN_HORIZONS = {
+    'one_month_return': pd.DateOffset(months=1),
+    'three_month_return': pd.DateOffset(months=3),
+    'six_month_return': pd.DateOffset(months=6),
+    'one_year_return': pd.DateOffset(years=1),
+    'three_year_return': pd.DateOffset(years=3),
+    'five_year_return': pd.DateOffset(years=5)
+}
+
+# Spacing between schemes in the stacked search keys; larger than any day number
+_SCHEME_STRIDE = np.int64(1) << 32
+
+def _to_days(dates):
+    """Convert dates to int64 days since the epoch"""
+    return np.asarray(pd.DatetimeIndex(dates).values.astype('datetime64[D]').astype(np.int64))
+
+def stack_series(series):
+    """
+    Stack several date/NAV series into flat arrays
+
+    Args:
+        series: List of (dates, navs) pairs, each sorted by date
+
+    Returns:
+        tuple: (days, navs, offsets) where scheme i occupies
+        days[offsets[i]:offsets[i + 1]]
+    """
+    lengths = [len(dates) for dates, _ in series]
+    offsets = np.zeros(len(series) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths)
+    if offsets[-1] == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), offsets
+
+    days = np.concatenate([_to_days(dates) for dates, _ in series if len(dates)])
+    navs = np.concatenate([np.asarray(values, dtype=float) for dates, values in series if len(dates)])
+    return days, navs, offsets
+
+def trailing_returns_stacked(days, navs, offsets, horizons=RETURN_HORIZONS):
+    """
+    Calculate trailing returns for a stacked batch of schemes
+
+    For each scheme and horizon, the return runs from the last NAV on or
+    before (latest date - horizon) to the latest NAV. A horizon longer than
+    the scheme's history gives NaN.
+
+    Args:
+        days: int64 days since the epoch, sorted within each scheme
+        navs: NAVs aligned with days
+        offsets: Scheme boundaries as returned by stack_series
+        horizons: Dictionary mapping return names to pd.DateOffset
+
+    Returns:
+        dict: Dictionary mapping each return name to a float array of
+        percentage returns, one per scheme
+    """
+    count = len(offsets) - 1
+    starts, ends = offsets[:-1], offsets[1:]
+    has_data = ends > starts
+    results = {name: np.full(count, np.nan) for name in horizons}
+    if not has_data.any():
+        return results
+
+    schemes = np.flatnonzero(has_data)
+    last = ends[schemes] - 1
+    latest_days = days[last]
+    latest_navs = navs[last]
+
+    # Search keys keep each scheme's dates in their own range
+    keys = np.repeat(np.arange(count, dtype=np.int64), ends - starts) * _SCHEME_STRIDE + days
+    latest_dates = pd.DatetimeIndex(latest_days.astype('datetime64[D]'))
+
+    for name, offset in horizons.items():
+        target_days = _to_days(latest_dates - offset)
+        positions = np.searchsorted(keys, schemes * _SCHEME_STRIDE + target_days, side='right') - 1
+        covered = positions >= starts[schemes]
+        base_navs = navs[np.where(covered, positions, last)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = (latest_navs / base_navs - 1) * 100
+        results[name][schemes] = np.where(covered & (base_navs != 0), returns, np.nan)
+
+    return results
+
+def trailing_returns_batch(series, horizons=RETURN_HORIZONS):
+    """
+    Calculate trailing returns for several schemes
+
+    Args:
+        series: List of (dates, navs) pairs, each sorted by date
+        horizons: Dictionary mapping return names to pd.DateOffset
+
+    Returns:
+        list: One dictionary per scheme mapping each return name to a
+        percentage return, or None where the history is too short
+    """
+    days, navs, offsets = stack_series(series)
+    stacked = trailing_returns_stacked(days, navs, offsets, horizons)
+    return [{name: (None if np.isnan(values[i]) else float(values[i])) for name, values in stacked.items()}
+            for i in range(len(series))]
+
+def trailing_returns(dates, navs, horizons=RETURN_HORIZONS):
+    """
+    Calculate trailing returns for a single scheme
+
+    Args:
+        dates: Sorted NAV dates
+        navs: NAVs aligned with dates
+        horizons: Dictionary mapping return names to pd.DateOffset
+
+    Returns:
+        dict: Dictionary mapping each return name to a percentage return, or
+        None where the history is too short
+    """
+    return trailing_returns_batch([(dates, navs)], horizons)[0]
@@ -0,0 +1,167 @@
+"""
+Utility module for fund risk metrics
+Sharpe and Sortino ratios, maximum drawdown and rolling returns are
+computed for a whole matrix of NAV series at once, with rolling windows
+built from stride tricks, and cached per scheme per latest NAV date. Each
+row of the matrix holds one scheme's own NAVs, so a scheme's metrics never
+depend on which other schemes are computed with it
+"""
+
+import threading
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Annual risk-free rate used for Sharpe and Sortino ratios
+RISK_FREE_RATE = 0.065
+
+# Trading days per year, used to annualize daily figures
+TRADING_DAYS = 252
+
+# Window for rolling returns, in trading days (NAVs of the scheme)
+ROLLING_WINDOW = TRADING_DAYS
+
+# Names of the metrics returned for each scheme
+RISK_METRICS = [
+    'annualized_return',
+    'sharpe_ratio',
+    'sortino_ratio',
+    'max_drawdown',
+    'rolling_return_avg',
+    'rolling_return_min',
+    'rolling_return_max'
+]
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def stack_series(series_list):
+    """
+    Stack several NAV series into a matrix, one row per series
+
+    Columns are NAV observations, not calendar dates: each row holds its
+    series' own NAVs in full precision, right-aligned and padded at the
+    start with NaN. Nothing is forward-filled, so returns are only taken
+    between a scheme's own consecutive NAVs.
+
+    Args:
+        series_list: List of NAVSeries
+
+    Returns:
+        np.ndarray: float64 matrix with one row per series and as many
+        columns as the longest series has NAVs
+    """
+    width = max((len(series) for series in series_list), default=0)
+    matrix = np.full((len(series_list), width), np.nan)
+    for row, series in enumerate(series_list):
+        if len(series):
+            matrix[row, width - len(series):] = series.navs
+    return matrix
+
+def risk_metrics_matrix(navs, risk_free_rate=RISK_FREE_RATE, window=ROLLING_WINDOW):
+    """
+    Calculate risk metrics for a matrix of NAV series
+
+    Args:
+        navs: Matrix with one row per scheme and one column per NAV
+            observation, NaN before a scheme's first NAV (see stack_series)
+        risk_free_rate: Annual risk-free rate
+        window: Rolling return window in NAV observations
+
+    Returns:
+        dict: Dictionary mapping each name in RISK_METRICS to an array with
+        one value per scheme (NaN where there isn't enough data). Returns and
+        drawdowns are in percent.
+    """
+    navs = np.asarray(navs, dtype=np.float64)
+    count = navs.shape[0]
+    results = {name: np.full(count, np.nan) for name in RISK_METRICS}
+    if navs.shape[1] < 3:
+        return results
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_returns = navs[:, 1:] / navs[:, :-1] - 1
+    daily_returns[~np.isfinite(daily_returns)] = np.nan
+    observations = np.sum(~np.isnan(daily_returns), axis=1)
+    enough = observations >= 2
+
+    # Schemes with no data give all-NaN rows; their NaN results are expected
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        mean_daily = np.nanmean(daily_returns, axis=1)
+        std_daily = np.nanstd(daily_returns, axis=1, ddof=1)
+        annualized_return = mean_daily * TRADING_DAYS
+        annualized_volatility = std_daily * np.sqrt(TRADING_DAYS)
+
+        # Downside deviation only counts returns below the daily risk-free rate
+        daily_risk_free = risk_free_rate / TRADING_DAYS
+        shortfall = np.minimum(daily_returns - daily_risk_free, 0)
+        downside_deviation = np.sqrt(np.nanmean(shortfall ** 2, axis=1)) * np.sqrt(TRADING_DAYS)
+
+        sharpe = (annualized_return - risk_free_rate) / annualized_volatility
+        sortino = (annualized_return - risk_free_rate) / downside_deviation
+
+        # Maximum drawdown from the running peak; fmax skips the leading NaNs
+        running_peak = np.fmax.accumulate(navs, axis=1)
+        max_drawdown = np.nanmin(navs / running_peak - 1, axis=1)
+
+        results['annualized_return'] = np.where(enough, annualized_return * 100, np.nan)
+        results['sharpe_ratio'] = np.where(enough & (annualized_volatility > 0), sharpe, np.nan)
+        results['sortino_ratio'] = np.where(enough & (downside_deviation > 0), sortino, np.nan)
+        results['max_drawdown'] = np.where(enough, max_drawdown * 100, np.nan)
+
+        # Rolling returns over every window of `window` trading days
+        if navs.shape[1] > window:
+            windows = sliding_window_view(navs, window + 1, axis=1)
+            rolling = (windows[:, :, -1] / windows[:, :, 0] - 1) * 100
+            rolling[~np.isfinite(rolling)] = np.nan
+            results['rolling_return_avg'] = np.nanmean(rolling, axis=1)
+            results['rolling_return_min'] = np.nanmin(rolling, axis=1)
+            results['rolling_return_max'] = np.nanmax(rolling, axis=1)
+
+    return results
+
+def _to_dict(results, row):
+    return {name: (None if np.isnan(values[row]) else float(values[row])) for name, values in results.items()}
+
+def get_risk_metrics(series_by_scheme):
+    """
+    Get risk metrics for several schemes, computing only those not cached
+
+    Metrics are cached per scheme and latest NAV date, so a scheme is only
+    recomputed when a new NAV arrives. All uncached schemes are computed
+    together in one matrix; each scheme's metrics come from its own NAVs
+    only, so they are the same whichever schemes are computed with it.
+
+    Args:
+        series_by_scheme: Dictionary mapping scheme codes to NAVSeries,
+            preferably with float64 NAVs
+
+    Returns:
+        dict: Dictionary mapping each scheme code to a dictionary of metrics
+        (None where there isn't enough data)
+    """
+    metrics = {}
+    missing = {}
+    with _cache_lock:
+        for code, series in series_by_scheme.items():
+            key = (str(code), int(series.days[-1]) if len(series) else None)
+            if key in _cache:
+                metrics[code] = _cache[key]
+            else:
+                missing[code] = (key, series)
+
+    if missing:
+        codes = list(missing)
+        results = risk_metrics_matrix(stack_series([missing[code][1] for code in codes]))
+        with _cache_lock:
+            for row, code in enumerate(codes):
+                key = missing[code][0]
+                # Drop entries for older NAV dates of the same scheme
+                for stale_key in [cached for cached in _cache if cached[0] == key[0]]:
+                    del _cache[stale_key]
+                _cache[key] = metrics[code] = _to_dict(results, row)
+
+    return metrics
@@ -0,0 +1,82 @@
+"""
+Utility module for coalescing concurrent fetches
+When several threads ask for the same key at once, only the first one runs
+the fetch; the others wait for it and share its result
+"""
+
+import copy
+import functools
+import threading
+
+class _Call:
+    """A fetch in progress and the threads waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Group of in-flight calls keyed by an arbitrary hashable key
+
+    Results are not kept once a call finishes, so this never serves stale
+    data; it only stops identical calls from running at the same time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn for a key, or wait for the call already running for that key
+
+        Returns:
+            The result of fn; waiting callers get a shallow copy so they can
+            modify it independently. Exceptions raised by fn are raised in
+            every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+def single_flight(key=None):
+    """
+    Decorator that coalesces concurrent calls of a function with the same key
+
+    Args:
+        key: Function mapping the call's arguments to a key; defaults to the
+            positional and keyword arguments themselves
+    """
+    def decorator(fn):
+        group = SingleFlight()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return group.do(call_key, fn, *args, **kwargs)
+
+        wrapper.group = group
+        return wrapper
+    return decorator
@@ -6,6 +6,10 @@ import os
 import json
 from flask import current_app
 from app.utils.indian_stocks import get_stock_info_alternative, get_historical_data_alternative, get_current_price_alternative
+from app.utils.symbol_resolver import cache_symbol, candidate_symbols, record_resolution, resolved_source
+from app.utils.ohlcv_store import covers, delete_bars, load_records, period_start, read_bars, write_bars
+from app.utils.single_flight import single_flight
+from app.utils.provider_health import can_try, get_breaker, report_success, report_miss, report_error
 
 # Cache directory for stock data
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
@@ -138,160 +142,91 @@ def get_all_mutual_funds():
     """Return all mutual funds in the database - DEPRECATED"""
     return []  # Return empty list as mutual funds are no longer used
 
+@single_flight(key=lambda symbol: cache_symbol(symbol))
 def get_stock_info(symbol):
     """Get detailed information about a stock"""
-    # Special handling for RELIANCE
-    if symbol.upper() == 'RELIANCE' or symbol.upper() == 'RELIANCE.NS':
-        print(f"Special handling for RELIANCE stock info")
-        # Try with NSE suffix for RELIANCE
+    # Symbols last served by NSE go straight to the alternative source
+    if resolved_source(symbol) == 'nse':
+        print(f"Using alternative source for {symbol} (resolved on NSE)")
+        return get_stock_info_alternative(symbol)
+
+    # Try the resolved symbol first, then the .NS/.BO/bare fallback chain
+    for candidate in candidate_symbols(symbol):
+        if not can_try('yfinance', 'info', candidate):
+            continue
         try:
-            stock = yf.Ticker("RELIANCE.NS")
+            print(f"Trying stock info for {candidate}")
+            stock = yf.Ticker(candidate)
             info = stock.info
             if info and 'regularMarketPrice' in info:
-                print(f"Successfully fetched info for RELIANCE.NS")
+                print(f"Successfully fetched info for {candidate}")
+                report_success('yfinance', 'info', candidate)
+                record_resolution(symbol, candidate, 'yfinance')
                 return info
+            report_miss('yfinance', 'info', candidate)
         except Exception as e:
-            print(f"Error fetching stock info for RELIANCE.NS: {e}")
-
-        # If that fails, try the hardcoded info from indian_stocks.py
-        try:
-            # Use the imported function from the module level
-            info = get_stock_info_alternative('RELIANCE')
-            if info and 'regularMarketPrice' in info:
-                print(f"Successfully fetched alternative info for RELIANCE")
-                return info
-        except Exception as e:
-            print(f"Error fetching alternative stock info for RELIANCE: {e}")
-
-    # If the symbol already has a suffix (like INFY.NS), try it directly first
-    if symbol.endswith('.NS') or symbol.endswith('.BO'):
-        print(f"Symbol {symbol} already has a suffix, trying it directly")
-        try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            if info and 'regularMarketPrice' in info:
-                print(f"Successfully fetched info for {symbol}")
-                return info
-        except Exception as e:
-            print(f"Error fetching stock info for {symbol}: {e}")
-
-        # If that fails, try without the suffix
-        base_symbol = symbol.split('.')[0]
-        print(f"Trying without suffix: {base_symbol}")
-        try:
-            stock = yf.Ticker(base_symbol)
-            info = stock.info
-            if info and 'regularMarketPrice' in info:
-                print(f"Successfully fetched info for {base_symbol}")
-                return info
-        except Exception as e:
-            print(f"Error fetching stock info for {base_symbol}: {e}")
-
-    # Try standard yfinance approach first
-    # Add .NS suffix if not already present for Indian stocks
-    if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
-        # Try with NSE suffix first
-        try:
-            stock = yf.Ticker(f"{symbol}.NS")
-            info = stock.info
-            if info and 'regularMarketPrice' in info:
-                print(f"Successfully fetched info for {symbol}.NS")
-                return info
-        except Exception as e:
-            print(f"Error fetching stock info for {symbol}.NS: {e}")
-
-        # If NSE fails, try BSE
-        try:
-            stock = yf.Ticker(f"{symbol}.BO")
-            info = stock.info
-            if info and 'regularMarketPrice' in info:
-                print(f"Successfully fetched info for {symbol}.BO")
-                return info
-        except Exception as e:
-            print(f"Error fetching stock info for {symbol}.BO: {e}")
-
-    # If symbol already has suffix or both attempts failed, try as is
-    try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        if info and 'regularMarketPrice' in info:
-            return info
-    except Exception as e:
-        print(f"Error fetching stock info for {symbol}: {e}")
+            print(f"Error fetching stock info for {candidate}: {e}")
+            report_error('yfinance', 'info', candidate)
 
     # If all yfinance attempts failed, try alternative approach
     print(f"Using alternative source for {symbol}")
     return get_stock_info_alternative(symbol)
 
-def get_current_price(symbol):
-    """Get the current price of a stock"""
-    print(f"Attempting to get current price for symbol: {symbol}")
-
-    # Check cache first
-    cache_file = os.path.join(CACHE_DIR, f"{symbol}_price.json")
+def _read_cached_price(symbol):
+    """Return the cached price for a symbol if it is still fresh, otherwise None"""
+    cache_file = os.path.join(CACHE_DIR, f"{cache_symbol(symbol)}_price.json")
     if os.path.exists(cache_file):
         file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
         if file_age < timedelta(hours=6):  # Cache for 6 hours
             try:
                 with open(cache_file, 'r') as f:
                     cached_data = json.load(f)
-                    print(f"Using cached price for {symbol}: {cached_data['price']}")
                     return cached_data['price']
             except Exception as e:
                 print(f"Error reading cache for {symbol}: {e}")
+    return None
 
-    # Add .NS suffix if not already present for Indian stocks
-    if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
-        # Try with NSE suffix first
-        try:
-            print(f"Trying with NSE suffix: {symbol}.NS")
-            stock = yf.Ticker(f"{symbol}.NS")
-            todays_data = stock.history(period='1d')
-            if not todays_data.empty:
-                price = todays_data['Close'].iloc[-1]
-                print(f"Successfully fetched price for {symbol}.NS: {price}")
-
-                # Cache the result
-                with open(cache_file, 'w') as f:
-                    json.dump({'price': float(price), 'timestamp': datetime.now().isoformat()}, f)
-
-                return price
-        except Exception as e:
-            print(f"Error fetching current price for {symbol}.NS: {e}")
-
-        # If NSE fails, try BSE
-        try:
-            print(f"Trying with BSE suffix: {symbol}.BO")
-            stock = yf.Ticker(f"{symbol}.BO")
-            todays_data = stock.history(period='1d')
-            if not todays_data.empty:
-                price = todays_data['Close'].iloc[-1]
-                print(f"Successfully fetched price for {symbol}.BO: {price}")
-
-                # Cache the result
-                with open(cache_file, 'w') as f:
-                    json.dump({'price': float(price), 'timestamp': datetime.now().isoformat()}, f)
-
-                return price
-        except Exception as e:
-            print(f"Error fetching current price for {symbol}.BO: {e}")
-
-    # If symbol already has suffix or both attempts failed, try as is
-    try:
-        print(f"Trying with original symbol: {symbol}")
-        stock = yf.Ticker(symbol)
-        todays_data = stock.history(period='1d')
-        if not todays_data.empty:
-            price = todays_data['Close'].iloc[-1]
-            print(f"Successfully fetched price for {symbol}: {price}")
+def _write_cached_price(symbol, price):
+    """Cache the price for a symbol"""
+    cache_file = os.path.join(CACHE_DIR, f"{cache_symbol(symbol)}_price.json")
+    with open(cache_file, 'w') as f:
+        json.dump({'price': float(price), 'timestamp': datetime.now().isoformat()}, f)
 
-            # Cache the result
-            with open(cache_file, 'w') as f:
-                json.dump({'price': float(price), 'timestamp': datetime.now().isoformat()}, f)
+@single_flight(key=lambda symbol: cache_symbol(symbol))
+def get_current_price(symbol):
+    """Get the current price of a stock"""
+    print(f"Attempting to get current price for symbol: {symbol}")
 
-            return price
-    except Exception as e:
-        print(f"Error fetching current price for {symbol}: {e}")
+    # Check cache first
+    cached_price = _read_cached_price(symbol)
+    if cached_price is not None:
+        print(f"Using cached price for {symbol}: {cached_price}")
+        return cached_price
+
+    # Symbols last served by NSE skip the yfinance chain
+    if resolved_source(symbol) != 'nse':
+        # Try the resolved symbol first, then the .NS/.BO/bare fallback chain
+        for candidate in candidate_symbols(symbol):
+            if not can_try('yfinance', 'price', candidate):
+                continue
+            try:
+                print(f"Trying price for {candidate}")
+                stock = yf.Ticker(candidate)
+                todays_data = stock.history(period='1d')
+                if not todays_data.empty:
+                    price = todays_data['Close'].iloc[-1]
+                    print(f"Successfully fetched price for {candidate}: {price}")
+                    report_success('yfinance', 'price', candidate)
+                    record_resolution(symbol, candidate, 'yfinance')
+
+                    # Cache the result
+                    _write_cached_price(symbol, price)
+
+                    return price
+                report_miss('yfinance', 'price', candidate)
+            except Exception as e:
+                print(f"Error fetching current price for {candidate}: {e}")
+                report_error('yfinance', 'price', candidate)
 
     # If all yfinance attempts failed, try alternative approach
     print(f"Using alternative source for {symbol} price")
@@ -300,8 +235,7 @@ def get_current_price(symbol):
     if price > 0:
         print(f"Alternative source returned price for {symbol}: {price}")
         # Cache the result
-        with open(cache_file, 'w') as f:
-            json.dump({'price': float(price), 'timestamp': datetime.now().isoformat()}, f)
+        _write_cached_price(symbol, price)
     else:
         print(f"Alternative source failed to get price for {symbol}")
         # Use a dummy price for testing
@@ -310,145 +244,178 @@ def get_current_price(symbol):
 
     return price
 
-def get_historical_data(symbol, period='1y'):
-    """Get historical price data for a stock"""
-    print(f"Getting historical data for {symbol} with period {period}")
-    # Determine the correct symbol to use
-    actual_symbol = symbol
-    data = pd.DataFrame()
+def get_current_prices(symbols):
+    """
+    Get the current prices of several stocks at once
 
-    # Special handling for RELIANCE
-    if symbol.upper() == 'RELIANCE' or symbol.upper() == 'RELIANCE.NS':
-        # Check cache first for RELIANCE.NS
-        cache_file = os.path.join(CACHE_DIR, f"RELIANCE.NS_{period}.json")
-        if os.path.exists(cache_file):
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_age < timedelta(days=1):
-                print(f"Using cached historical data for RELIANCE.NS")
-                with open(cache_file, 'r') as f:
-                    try:
-                        data = pd.read_json(f.read())
-                        if not data.empty:
-                            return data
-                    except Exception as e:
-                        print(f"Error reading cache for RELIANCE.NS: {e}")
+    Cached prices are used where fresh. The remaining symbols are fetched
+    with a single batched yfinance download, and only the symbols missing
+    from that download fall back to get_current_price one at a time.
 
-        # Try with NSE suffix for RELIANCE
+    Args:
+        symbols: List of stock symbols
+
+    Returns:
+        dict: Dictionary mapping each symbol to its current price
+    """
+    prices = {}
+    pending = {}
+
+    # Remove duplicates while preserving order
+    for symbol in dict.fromkeys(symbols):
+        cached_price = _read_cached_price(symbol)
+        if cached_price is not None:
+            prices[symbol] = cached_price
+        elif resolved_source(symbol) != 'nse':
+            # Batch each symbol under its most likely yfinance symbol
+            pending[symbol] = candidate_symbols(symbol)[0]
+
+    if pending and get_breaker('yfinance').allow():
+        print(f"Fetching batched prices for {len(pending)} symbols")
         try:
-            nse_symbol = 'RELIANCE.NS'
-            print(f"Special handling: Trying with NSE suffix: {nse_symbol}")
-            stock = yf.Ticker(nse_symbol)
-            data = stock.history(period=period)
+            tickers = list(dict.fromkeys(pending.values()))
+            data = yf.download(tickers, period='1d', group_by='ticker', progress=False, threads=True)
             if not data.empty:
-                print(f"Successfully fetched historical data for {nse_symbol}")
-                actual_symbol = nse_symbol
-
-                # Cache the data
-                cache_file = os.path.join(CACHE_DIR, f"{actual_symbol}_{period}.json")
-                with open(cache_file, 'w') as f:
-                    f.write(data.to_json())
-
-                return data
+                for symbol, ticker in pending.items():
+                    # A single-ticker download is not grouped by ticker
+                    if isinstance(data.columns, pd.MultiIndex):
+                        if ticker not in data.columns.get_level_values(0):
+                            continue
+                        closes = data[ticker]['Close'].dropna()
+                    else:
+                        closes = data['Close'].dropna()
+                    if not closes.empty:
+                        price = float(closes.iloc[-1])
+                        prices[symbol] = price
+                        record_resolution(symbol, ticker, 'yfinance')
+                        _write_cached_price(symbol, price)
+            get_breaker('yfinance').record_success()
         except Exception as e:
-            print(f"Error fetching historical data for RELIANCE.NS: {e}")
-
-    # If the symbol already has a suffix (like INFY.NS), try it directly first
-    if symbol.endswith('.NS') or symbol.endswith('.BO'):
-        print(f"Symbol {symbol} already has a suffix, trying it directly for historical data")
-        # Check cache first
-        cache_file = os.path.join(CACHE_DIR, f"{symbol}_{period}.json")
-        if os.path.exists(cache_file):
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_age < timedelta(days=1):
-                print(f"Using cached historical data for {symbol}")
-                with open(cache_file, 'r') as f:
-                    try:
-                        data = pd.read_json(f.read())
-                        if not data.empty:
-                            return data
-                    except Exception as e:
-                        print(f"Error reading cache for {symbol}: {e}")
+            print(f"Error fetching batched prices: {e}")
+            get_breaker('yfinance').record_failure()
 
-        try:
-            print(f"Fetching historical data for {symbol}")
-            stock = yf.Ticker(symbol)
-            data = stock.history(period=period)
-            if not data.empty:
-                print(f"Successfully fetched historical data for {symbol}")
+    # Fill in the misses individually
+    for symbol in dict.fromkeys(symbols):
+        if symbol not in prices:
+            prices[symbol] = get_current_price(symbol)
 
-                # Cache the data
-                cache_file = os.path.join(CACHE_DIR, f"{symbol}_{period}.json")
-                with open(cache_file, 'w') as f:
-                    f.write(data.to_json())
+    return prices
 
-                return data
-        except Exception as e:
-            print(f"Error fetching historical data for {symbol}: {e}")
+def refresh_historical_data(symbol, store_key):
+    """
+    Bring the stored bars for a symbol up to date with an incremental fetch
 
-        # If that fails, try without the suffix
-        base_symbol = symbol.split('.')[0]
-        print(f"Trying without suffix: {base_symbol}")
+    Only the bars from the second-to-last stored date onwards are requested
+    from yfinance and merged into the store, instead of the full period.
+    yfinance adjusts prices for splits and dividends, so the re-fetched
+    closed bar is compared with the stored one; if it differs, the stored
+    series was adjusted differently and is dropped so the caller fetches it
+    again in full.
+
+    Returns:
+        pd.DataFrame: The newly fetched bars, or None if the refresh failed
+        or the stored bars were dropped
+    """
+    records = load_records(store_key)
+    if records is None or len(records) < 2:
+        return None
+    # The last stored bar may have been stored before the close, so the bar
+    # before it is the latest one known to be final
+    check_date = pd.Timestamp(records['Date'][-2])
+    stored_close = float(records['Close'][-2])
+
+    for candidate in candidate_symbols(symbol):
+        if not can_try('yfinance', 'history', candidate):
+            continue
         try:
-            stock = yf.Ticker(base_symbol)
-            data = stock.history(period=period)
+            print(f"Fetching historical data for {candidate} since {check_date.strftime('%Y-%m-%d')}")
+            stock = yf.Ticker(candidate)
+            data = stock.history(start=check_date.strftime('%Y-%m-%d'))
             if not data.empty:
-                print(f"Successfully fetched historical data for {base_symbol}")
+                report_success('yfinance', 'history', candidate)
+                record_resolution(symbol, candidate, 'yfinance')
+
+                fetched = _overlap_close(data, check_date)
+                if fetched is not None and not np.isclose(fetched, stored_close, rtol=1e-6):
+                    print(f"Stored bars for {symbol} were adjusted differently, fetching them again")
+                    delete_bars(store_key)
+                    return None
+
+                write_bars(store_key, data, check_date)
                 return data
+            report_miss('yfinance', 'history', candidate)
         except Exception as e:
-            print(f"Error fetching historical data for {base_symbol}: {e}")
+            print(f"Error fetching historical data for {candidate}: {e}")
+            report_error('yfinance', 'history', candidate)
+
+    return None
+
+def _overlap_close(data, date):
+    """Get the close of a yfinance DataFrame on a date, or None if it has no bar for it"""
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    matches = np.flatnonzero(index.normalize() == pd.Timestamp(date).normalize())
+    if len(matches) == 0:
+        return None
+    return float(data['Close'].iloc[matches[-1]])
+
+@single_flight(key=lambda symbol, period='1y': (cache_symbol(symbol), period))
+def get_historical_data(symbol, period='1y'):
+    """
+    Get historical price data for a stock
+
+    Every period is served as a slice of one stored series per symbol. Only
+    the requested period is downloaded, so a cold request for a short period
+    stays fast; the stored range widens when a longer period is requested,
+    and any period inside it is read from the store rather than fetched.
+    Only bars fetched from yfinance are stored; data from the alternative
+    sources is returned as is.
+    """
+    print(f"Getting historical data for {symbol} with period {period}")
+    store_key = cache_symbol(symbol)
+    start = period_start(period)
+    stored_from = start
+    # How the fetched bars go into the store: 'replace', 'merge' or None to skip storing
+    store_mode = None
+
+    # Check if the bar store has data for the period that's less than a day old
+    if covers(store_key, start, timedelta(days=1)):
+        data = read_bars(store_key, start)
+        if not data.empty:
+            print(f"Using stored historical data for {symbol}")
+            return data
+
+    # If the period is stored but stale, only fetch the bars since the last one
+    if covers(store_key, start):
+        data = refresh_historical_data(symbol, store_key)
+        if data is not None:
+            return read_bars(store_key, start)
 
-    # Add .NS suffix if not already present for Indian stocks
-    if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
-        # Try with NSE suffix first
-        try:
-            nse_symbol = f"{symbol}.NS"
-            print(f"Trying with NSE suffix: {nse_symbol}")
-            stock = yf.Ticker(nse_symbol)
-            data = stock.history(period=period)
-            if not data.empty:
-                print(f"Successfully fetched historical data for {nse_symbol}")
-                actual_symbol = nse_symbol
-        except Exception as e:
-            print(f"Error fetching historical data for {symbol}.NS: {e}")
+    data = pd.DataFrame()
 
-        # If NSE fails, try BSE
-        if data.empty:
+    # Symbols last served by NSE skip the yfinance chain
+    if resolved_source(symbol) != 'nse':
+        # Try the resolved symbol first, then the .NS/.BO/bare fallback chain
+        for candidate in candidate_symbols(symbol):
+            if not can_try('yfinance', 'history', candidate):
+                continue
             try:
-                bse_symbol = f"{symbol}.BO"
-                print(f"Trying with BSE suffix: {bse_symbol}")
-                stock = yf.Ticker(bse_symbol)
+                print(f"Fetching historical data for {candidate} with period {period}")
+                stock = yf.Ticker(candidate)
                 data = stock.history(period=period)
                 if not data.empty:
-                    print(f"Successfully fetched historical data for {bse_symbol}")
-                    actual_symbol = bse_symbol
+                    print(f"Successfully fetched historical data for {candidate}")
+                    report_success('yfinance', 'history', candidate)
+                    record_resolution(symbol, candidate, 'yfinance')
+                    # A fetch reaching back past the stored range replaces it; one
+                    # inside it (after a failed refresh) is merged in
+                    store_mode = 'merge' if covers(store_key, start) else 'replace'
+                    break
+                report_miss('yfinance', 'history', candidate)
             except Exception as e:
-                print(f"Error fetching historical data for {symbol}.BO: {e}")
-
-    # If symbol already has suffix or both attempts failed, try as is
-    if data.empty:
-        cache_file = os.path.join(CACHE_DIR, f"{actual_symbol}_{period}.json")
-
-        # Check if we have cached data that's less than a day old
-        if os.path.exists(cache_file):
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_age < timedelta(days=1):
-                print(f"Using cached historical data for {actual_symbol}")
-                with open(cache_file, 'r') as f:
-                    try:
-                        data = pd.read_json(f.read())
-                        if not data.empty:
-                            return data
-                    except Exception as e:
-                        print(f"Error reading cache for {actual_symbol}: {e}")
-
-        try:
-            print(f"Trying with original symbol: {actual_symbol}")
-            stock = yf.Ticker(actual_symbol)
-            data = stock.history(period=period)
-            if not data.empty:
-                print(f"Successfully fetched historical data for {actual_symbol}")
-        except Exception as e:
-            print(f"Error fetching historical data for {actual_symbol}: {e}")
+                print(f"Error fetching historical data for {candidate}: {e}")
+                report_error('yfinance', 'history', candidate)
 
     # If all yfinance attempts failed, try alternative approach
     if data.empty:
@@ -458,27 +425,38 @@ def get_historical_data(symbol, period='1y'):
             if symbol.upper() == 'APOLLOHOSP.NS' or symbol.upper() == 'APOLLOHOSP':
                 print(f"Special handling for APOLLOHOSP historical data")
                 # Try with a different period
-                try:
-                    stock = yf.Ticker('APOLLOHOSP.NS')
-                    data = stock.history(period='6mo')  # Try a shorter period
-                    if not data.empty:
-                        print(f"Successfully fetched 6mo historical data for APOLLOHOSP.NS")
-                        return data
-                except Exception as e:
-                    print(f"Error fetching 6mo historical data for APOLLOHOSP.NS: {e}")
+                if can_try('yfinance', 'history_6mo', 'APOLLOHOSP.NS'):
+                    try:
+                        stock = yf.Ticker('APOLLOHOSP.NS')
+                        data = stock.history(period='6mo')  # Try a shorter period
+                        if not data.empty:
+                            print(f"Successfully fetched 6mo historical data for APOLLOHOSP.NS")
+                            report_success('yfinance', 'history_6mo', 'APOLLOHOSP.NS')
+                            stored_from = period_start('6mo')
+                            store_mode = 'merge'
+                        else:
+                            report_miss('yfinance', 'history_6mo', 'APOLLOHOSP.NS')
+                    except Exception as e:
+                        print(f"Error fetching 6mo historical data for APOLLOHOSP.NS: {e}")
+                        report_error('yfinance', 'history_6mo', 'APOLLOHOSP.NS')
 
             # Try the alternative method for all stocks
-            data = get_historical_data_alternative(symbol, period)
+            if data.empty:
+                data = get_historical_data_alternative(symbol, period)
         except Exception as e:
             print(f"Error using alternative method for {symbol}: {e}")
             data = pd.DataFrame()  # Ensure we have an empty DataFrame
 
-    # Cache the data if we have it
+    # Store the data if it came from yfinance
     if not data.empty:
-        print(f"Caching historical data for {actual_symbol}")
-        cache_file = os.path.join(CACHE_DIR, f"{actual_symbol}_{period}.json")
-        with open(cache_file, 'w') as f:
-            f.write(data.to_json())
+        if store_mode is None:
+            return data
+        print(f"Storing historical data for {symbol}")
+        try:
+            write_bars(store_key, data, stored_from, replace=store_mode == 'replace')
+            return read_bars(store_key, start)
+        except Exception as e:
+            print(f"Error storing historical data for {symbol}: {e}")
         return data
 
     # If all attempts failed, return an empty DataFrame
@@ -0,0 +1,149 @@
+"""
+Utility module for resolving stock symbols
+This module remembers which provider symbol and source worked for each
+input symbol, so the .NS/.BO/bare fallback chains only run once per symbol.
+Resolutions expire after RESOLUTION_TTL_SECONDS, so a symbol that fell back
+to NSE after a transient yfinance failure is tried on yfinance again
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+# Cache directory
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+# Persistent map of input symbol -> resolution
+RESOLUTIONS_FILE = os.path.join(CACHE_DIR, 'symbol_resolutions.json')
+
+# Exchange suffixes understood by yfinance
+EXCHANGE_SUFFIXES = ('.NS', '.BO')
+
+# How long a resolution's source is trusted before the full chain is tried again
+RESOLUTION_TTL_SECONDS = int(os.getenv('RESOLUTION_TTL_SECONDS', 24 * 60 * 60))
+
+_lock = threading.Lock()
+_resolutions = None
+
+def normalize_symbol(symbol):
+    """
+    Normalize a symbol into the key used for cache files
+
+    Bare Indian symbols are treated as NSE listings, so RELIANCE and
+    RELIANCE.NS share the same cache entries.
+    """
+    symbol = symbol.strip().upper()
+    if not symbol.endswith(EXCHANGE_SUFFIXES):
+        symbol = f"{symbol}.NS"
+    return symbol
+
+def _load_resolutions():
+    """Load the resolution map from disk on first use"""
+    global _resolutions
+    if _resolutions is None:
+        _resolutions = {}
+        if os.path.exists(RESOLUTIONS_FILE):
+            try:
+                with open(RESOLUTIONS_FILE, 'r') as f:
+                    _resolutions = json.load(f)
+            except Exception as e:
+                print(f"Error reading symbol resolutions: {e}")
+    return _resolutions
+
+def _is_expired(resolution):
+    resolved_at = datetime.fromisoformat(resolution['resolved_at'])
+    return datetime.now() - resolved_at >= timedelta(seconds=RESOLUTION_TTL_SECONDS)
+
+def get_resolution(symbol, include_expired=False):
+    """
+    Get the recorded resolution for a symbol
+
+    Args:
+        symbol: The symbol as requested by the caller
+        include_expired: Also return a resolution older than RESOLUTION_TTL_SECONDS
+
+    Returns:
+        dict: Dictionary with 'provider_symbol', 'source' and 'resolved_at', or None
+    """
+    with _lock:
+        resolution = _load_resolutions().get(symbol.strip().upper())
+    if resolution and not include_expired and _is_expired(resolution):
+        return None
+    return resolution
+
+def record_resolution(symbol, provider_symbol, source):
+    """
+    Record the provider symbol and source that worked for a symbol
+
+    Args:
+        symbol: The symbol as requested by the caller
+        provider_symbol: The symbol the provider accepted (e.g. 'RELIANCE.NS')
+        source: The provider that served it ('yfinance' or 'nse')
+    """
+    key = symbol.strip().upper()
+    with _lock:
+        resolutions = _load_resolutions()
+        current = resolutions.get(key)
+        # An unchanged resolution is only rewritten to renew an expired one
+        if (current and current['provider_symbol'] == provider_symbol and current['source'] == source
+                and not _is_expired(current)):
+            return
+
+        resolutions[key] = {
+            'provider_symbol': provider_symbol,
+            'source': source,
+            'resolved_at': datetime.now().isoformat()
+        }
+
+        # Write to a temporary file first so readers never see a partial file
+        try:
+            temp_file = f"{RESOLUTIONS_FILE}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(resolutions, f, indent=2, sort_keys=True)
+            os.replace(temp_file, RESOLUTIONS_FILE)
+        except Exception as e:
+            print(f"Error saving symbol resolutions: {e}")
+
+def candidate_symbols(symbol):
+    """
+    Get the yfinance symbols to try for a symbol, in order
+
+    A previously resolved yfinance symbol is tried first, followed by the
+    usual chain: the symbol itself then its base symbol for suffixed symbols,
+    or the .NS, .BO and bare variants for bare symbols.
+    """
+    symbol = symbol.strip().upper()
+    base_symbol = symbol.split('.')[0]
+
+    if symbol.endswith(EXCHANGE_SUFFIXES):
+        candidates = [symbol, base_symbol]
+    else:
+        candidates = [f"{base_symbol}.NS", f"{base_symbol}.BO", base_symbol]
+
+    resolution = get_resolution(symbol, include_expired=True)
+    if resolution and resolution['source'] == 'yfinance':
+        candidates.insert(0, resolution['provider_symbol'])
+
+    # Remove duplicates while preserving order
+    return list(dict.fromkeys(candidates))
+
+def resolved_source(symbol):
+    """Get the source a symbol was last resolved on, or None if unknown or expired"""
+    resolution = get_resolution(symbol)
+    return resolution['source'] if resolution else None
+
+def cache_symbol(symbol):
+    """
+    Get the key used for a symbol's cache entries
+
+    This is the normalized provider symbol the symbol last resolved to, so a
+    bare symbol listed only on BSE is cached under its .BO symbol rather
+    than under .NS. Symbols that were never resolved fall back to
+    normalize_symbol.
+    """
+    resolution = get_resolution(symbol, include_expired=True)
+    if resolution:
+        return normalize_symbol(resolution['provider_symbol'])
+    return normalize_symbol(symbol)
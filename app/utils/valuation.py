@@ -0,0 +1,112 @@
+"""
+Utility module for valuing portfolios
+This module prices each distinct symbol once per request and shares
+those prices between Portfolio, Holding and PortfolioItem
+"""
+
+import numpy as np
+from flask import g, has_app_context
+from app.utils.stock_data import get_current_prices
+
+class PortfolioValuation:
+    """
+    Valuation of a portfolio's holdings
+
+    All per-holding figures are numpy arrays aligned with `symbols`, so
+    totals, weights and P&L are computed once instead of on every access.
+    """
+
+    def __init__(self, holdings, prices):
+        self.holding_ids = [holding.id for holding in holdings]
+        self.symbols = [holding.symbol for holding in holdings]
+        self.quantities = np.array([holding.quantity for holding in holdings], dtype=float)
+        self.prices = np.array([prices[symbol] for symbol in self.symbols], dtype=float)
+        self.investments = np.array([holding.total_investment for holding in holdings], dtype=float)
+
+        # Per-holding values and P&L
+        self.values = self.quantities * self.prices
+        self.profit_loss = self.values - self.investments
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.profit_loss_percentage = np.where(self.investments != 0,
+                                                   self.profit_loss / self.investments * 100, 0.0)
+
+        # Portfolio totals
+        self.total_value = float(self.values.sum())
+        self.total_investment = float(self.investments.sum())
+        self.total_return = self.total_value - self.total_investment
+        if self.total_investment == 0:
+            self.return_percentage = 0
+        else:
+            self.return_percentage = (self.total_return / self.total_investment) * 100
+
+        # Weights of each holding in the portfolio
+        if self.total_value > 0:
+            self.weights = self.values / self.total_value
+        else:
+            self.weights = np.zeros(len(self.symbols))
+
+class ValuationSnapshot:
+    """
+    Prices and NAVs captured once and reused for every valuation
+
+    A snapshot only ever grows: symbols already priced are never looked up
+    again, and portfolio valuations are computed once per portfolio.
+    """
+
+    def __init__(self):
+        self.prices = {}
+        self.navs = {}
+        self._valuations = {}
+
+    def prime(self, symbols):
+        """Price every symbol not yet in the snapshot with one batched lookup"""
+        missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self.prices]
+        if missing:
+            self.prices.update(get_current_prices(missing))
+
+    def price(self, symbol):
+        """Get the current price of a stock"""
+        self.prime([symbol])
+        return self.prices[symbol]
+
+    def prime_navs(self, scheme_codes):
+        """Look up the latest NAV of every scheme not yet in the snapshot at once"""
+        missing = [code for code in dict.fromkeys(str(code) for code in scheme_codes) if code not in self.navs]
+        if missing:
+            from app.utils.mf_api import get_latest_navs
+            for code, latest_nav in get_latest_navs(missing).items():
+                self.navs[code] = latest_nav['nav'] if latest_nav else None
+
+    def nav(self, scheme_code):
+        """Get the latest NAV of a mutual fund, or None if it is unavailable"""
+        scheme_code = str(scheme_code)
+        self.prime_navs([scheme_code])
+        return self.navs[scheme_code]
+
+    def value_portfolio(self, portfolio):
+        """Get the valuation of a single portfolio"""
+        valuation = self._valuations.get(portfolio.id)
+        if valuation is None:
+            holdings = list(portfolio.holdings)
+            self.prime([holding.symbol for holding in holdings])
+            valuation = PortfolioValuation(holdings, self.prices)
+            self._valuations[portfolio.id] = valuation
+        return valuation
+
+    def value_portfolios(self, portfolios):
+        """Get the valuations of several portfolios, pricing all of their symbols together"""
+        self.prime([holding.symbol for portfolio in portfolios for holding in portfolio.holdings])
+        return [self.value_portfolio(portfolio) for portfolio in portfolios]
+
+def get_valuation_snapshot():
+    """
+    Get the valuation snapshot for the current request
+
+    Outside of an application context a new snapshot is returned each time.
+    """
+    if not has_app_context():
+        return ValuationSnapshot()
+
+    if 'valuation_snapshot' not in g:
+        g.valuation_snapshot = ValuationSnapshot()
+    return g.valuation_snapshot
@@ -0,0 +1,12 @@
+import sys
+from app import create_app
+from app.utils.amfi_ingest import AMFI_NAVALL_URL, ingest_navall
+
+if __name__ == '__main__':
+    # Usage: python ingest_navall.py [path-or-url-of-NAVAll.txt]
+    source = sys.argv[1] if len(sys.argv) > 1 else AMFI_NAVALL_URL
+
+    app = create_app()
+    with app.app_context():
+        count = ingest_navall(source)
+        print(f"Successfully updated the NAVs of {count} mutual fund schemes from {source}")
@@ -1,6 +1,10 @@
-from app import create_app
-
-app = create_app()
+import os
+from app import create_app, start_background_tasks
 
 if __name__ == '__main__':
+    app = create_app()
+    # The debug reloader runs this script in a watcher and a server process;
+    # only the server process starts background work
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks(app)
     app.run(debug=True)
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from app.utils import chart_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_cache, 'CHART_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_saving_a_chart_removes_its_older_versions(cache_dir):
+    chart_cache._save_chart('returns', '0' * 20, b'old')
+    chart_cache._save_chart('returns-by-category', '1' * 20, b'other')
+
+    assert chart_cache._save_chart('returns', 'a' * 20, b'new') == 'a' * 20
+
+    assert sorted(os.listdir(cache_dir)) == [f"returns-{'a' * 20}.png", f"returns-by-category-{'1' * 20}.png"]
+    assert chart_cache.read_chart('returns', 'a' * 20) == b'new'
+    assert chart_cache.read_chart('returns', '0' * 20) is None
@@ -0,0 +1,46 @@
+from app.utils.fund_search import FundSearchIndex, trigrams
+
+SCHEMES = {
+    100: 'Axis Bluechip Fund - Direct Plan - Growth',
+    101: 'Axis Blue Chip Equity Fund',
+    102: 'HDFC Flexi Cap Fund - Growth',
+    103: 'HDFC Flexicap Savings Plan',
+    104: 'SBI Small Cap Fund - Growth',
+}
+
+
+def make_index():
+    return FundSearchIndex(list(SCHEMES), list(SCHEMES.values()))
+
+
+def codes(results):
+    return [result['schemeCode'] for result in results]
+
+
+def test_exact_match_ranks_above_prefix_match():
+    results = make_index().search('hdfc flexi')
+
+    # 'flexi' is a whole token of 102 but only a prefix of 103's 'flexicap'
+    assert codes(results) == [102, 103]
+
+
+def test_typo_matches_by_trigram_similarity():
+    results = make_index().search('bluechp')
+
+    assert codes(results)[0] == 100
+
+
+def test_schemes_matching_every_token_come_first():
+    results = make_index().search('axis small')
+
+    # No scheme matches both tokens, so partial matches are returned
+    assert set(codes(results)) == {100, 101, 104}
+    assert codes(make_index().search('sbi small')) == [104]
+
+
+def test_short_tokens_still_have_trigrams():
+    assert trigrams('ab') == {'  a', ' ab', 'ab '}
+
+
+def test_lookup_keeps_index_order():
+    assert codes(make_index().lookup([104, 100, 999])) == [100, 104]
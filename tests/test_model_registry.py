@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.model_registry import (FUND_TYPES, HORIZONS, RISK_LEVELS, check_contract, feature_columns,
+                                      feature_matrix)
+
+TRAINING_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'data', 'cleaned_data.xlsx')
+
+# Training data column -> feature name
+TRAINING_COLUMNS = {
+    'aum_funds_individual_lst': 'aum',
+    'nav_funds_individual_lst': 'nav',
+    'rating_of_funds_individual_lst': 'rating',
+    'minimum_funds_individual_lst': 'minimum',
+    'debt_per': 'debt',
+    'equity_per': 'equity',
+    'risk_of_the_fund': 'risk',
+    'type_of_fund': 'type',
+    'one_year_returns': 'one_year',
+    'three_year_returns': 'three_year',
+    'five_year_returns': 'five_year'
+}
+
+
+@pytest.fixture(scope='module')
+def training_data():
+    return pd.read_excel(TRAINING_DATA)
+
+
+def test_feature_columns_follow_the_training_data(training_data):
+    features = [TRAINING_COLUMNS[column] for column in training_data.columns if column in TRAINING_COLUMNS]
+    for horizon in HORIZONS:
+        assert feature_columns(horizon) == [feature for feature in features if feature != horizon]
+
+
+def test_category_codes_cover_the_training_categories(training_data):
+    for column, codes in (('risk_of_the_fund', RISK_LEVELS), ('type_of_fund', FUND_TYPES)):
+        categories = sorted(training_data[column].dropna().unique())
+        assert codes == {category: code for code, category in enumerate(categories)}
+
+
+class ConstantModel:
+    n_features_in_ = len(feature_columns('one_year'))
+
+    def predict(self, matrix):
+        return np.full(len(matrix), 10.0)
+
+
+class NarrowModel(ConstantModel):
+    n_features_in_ = None
+
+    def predict(self, matrix):
+        raise ValueError('X has 10 features, but the model expects 7')
+
+
+def test_check_contract_tries_the_feature_vector():
+    assert check_contract(ConstantModel(), 'one_year') is None
+    assert 'expects' in check_contract(type('Wide', (ConstantModel,), {'n_features_in_': 7})(), 'one_year')
+    assert "can't predict" in check_contract(NarrowModel(), 'one_year')
+
+
+def test_feature_matrix_fills_debt_and_minimum():
+    row = {'aum': 1000, 'nav': 50, 'rating': 4, 'equity': 90, 'risk': 'Very High', 'type': 'Equity',
+           'three_year': 15, 'five_year': 12}
+
+    matrix = feature_matrix([row], 'one_year')
+
+    np.testing.assert_array_equal(matrix[0], [1000, 50, 4, 500, 10, 90, 6, 1, 15, 12])
+    with pytest.raises(ValueError):
+        feature_matrix([dict(row, risk='Very Low')], 'one_year')
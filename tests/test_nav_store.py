@@ -0,0 +1,54 @@
+import pytest
+
+from app.utils import nav_store
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(nav_store, 'STORE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def entry(date, nav):
+    return {'date': date, 'nav': str(nav)}
+
+
+def store_history():
+    # Newest first, as returned by MFAPI; 08-03-2024 is a Friday
+    history = {'meta': {'scheme_code': 1}, 'data': [entry('08-03-2024', 11.0), entry('07-03-2024', 10.0)],
+               'status': 'SUCCESS'}
+    nav_store.write_scheme(1, history)
+    return history
+
+
+def test_next_business_day_is_appended():
+    store_history()
+
+    data = nav_store.append_latest(1, {'meta': {'scheme_code': 1}, 'data': [entry('11-03-2024', 12.0)]})
+
+    assert [item['date'] for item in data['data']] == ['11-03-2024', '08-03-2024', '07-03-2024']
+    assert nav_store.read_scheme(1, fresh_only=False) == data
+
+
+def test_missing_business_days_are_a_gap():
+    history = store_history()
+
+    # Monday and Tuesday are missing between Friday and Wednesday
+    assert nav_store.append_latest(1, {'data': [entry('13-03-2024', 12.0)]}) is None
+    assert nav_store.read_scheme(1, fresh_only=False) == history
+
+
+def test_nothing_new_only_records_the_check():
+    history = store_history()
+    before = nav_store._read_stored(1)
+
+    data = nav_store.append_latest(1, {'data': [entry('08-03-2024', 11.0)]})
+
+    after = nav_store._read_stored(1)
+    assert data == history
+    assert after['fetched_at'] == before['fetched_at']
+    assert after['checked_at'] >= before['checked_at']
+
+
+def test_nothing_stored_returns_none():
+    assert nav_store.append_latest(1, {'data': [entry('11-03-2024', 12.0)]}) is None
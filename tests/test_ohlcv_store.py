@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils import ohlcv_store
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ohlcv_store, 'STORE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def make_bars(start, periods, close=100.0):
+    index = pd.date_range(start, periods=periods, freq='B', name='Date')
+    closes = close + np.arange(periods, dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1,
+                         'Close': closes, 'Volume': np.arange(periods) * 1000}, index=index)
+
+
+def test_bars_round_trip_through_memory_map():
+    bars = make_bars('2024-01-01', 10)
+    ohlcv_store.write_bars('TEST', bars, start='2024-01-01')
+
+    records = ohlcv_store.load_records('TEST')
+    assert isinstance(records, np.memmap)
+    assert records.dtype == ohlcv_store.BAR_DTYPE
+
+    stored = ohlcv_store.read_bars('TEST')
+    pd.testing.assert_frame_equal(stored, bars, check_freq=False, check_dtype=False)
+    assert ohlcv_store.read_meta('TEST')['covered_from'] == '2024-01-01'
+
+
+def test_read_bars_slices_by_date():
+    ohlcv_store.write_bars('TEST', make_bars('2024-01-01', 10))
+
+    stored = ohlcv_store.read_bars('TEST', start='2024-01-03', end='2024-01-05')
+
+    assert list(stored.index.strftime('%Y-%m-%d')) == ['2024-01-03', '2024-01-04', '2024-01-05']
+
+
+def test_overlapping_write_merges_and_replaces_dates():
+    ohlcv_store.write_bars('TEST', make_bars('2024-01-01', 5), start='2024-01-01')
+    ohlcv_store.write_bars('TEST', make_bars('2024-01-04', 5, close=200.0), start='2024-01-04')
+
+    stored = ohlcv_store.read_bars('TEST')
+
+    assert len(stored) == 8
+    assert stored['Close'].iloc[0] == 100.0
+    assert stored.loc['2024-01-04', 'Close'] == 200.0
+    assert ohlcv_store.read_meta('TEST')['covered_from'] == '2024-01-01'
+    assert ohlcv_store.covers('TEST', '2024-01-02')
+    assert not ohlcv_store.covers('TEST', '2023-12-01')
+
+
+def test_replace_drops_stored_bars_and_delete_removes_files():
+    ohlcv_store.write_bars('TEST', make_bars('2024-01-01', 5))
+    ohlcv_store.write_bars('TEST', make_bars('2024-02-01', 2), replace=True)
+
+    assert len(ohlcv_store.read_bars('TEST')) == 2
+
+    ohlcv_store.delete_bars('TEST')
+    assert ohlcv_store.load_records('TEST') is None
+    assert ohlcv_store.read_meta('TEST') is None
+    assert ohlcv_store.read_bars('TEST').empty
@@ -0,0 +1,42 @@
+from app.utils.report_generator import fund_features, fund_type, fund_type_profiles
+
+FUND_DETAILS = {
+    'scheme_category': 'Equity Scheme - Large Cap Fund',
+    'fund_size_category': 'large-cap',
+    'scheme_nav': '45.2',
+    'aum': 12000.0,
+    'one_year_return': 10.0,
+    'three_year_return': 12.0,
+    'five_year_return': 14.0
+}
+
+
+def test_fund_type_comes_from_the_scheme_category():
+    assert fund_type(FUND_DETAILS) == 'Equity'
+    assert fund_type({'scheme_category': 'Debt Scheme - Liquid Fund'}) == 'Debt'
+    assert fund_type({'scheme_category': 'Growth', 'fund_size_category': 'hybrid'}) == 'Hybrid'
+    assert fund_type({'scheme_category': 'Growth', 'fund_size_category': 'other'}) is None
+
+
+def test_features_come_from_the_details_and_the_type_profile():
+    profiles = {'Equity': {'equity': 96.0, 'risk': 'Very High', 'rating': 3.0}}
+
+    features, assumed = fund_features(FUND_DETAILS, profiles)
+
+    assert assumed == []
+    assert features['nav'] == 45.2
+    assert (features['type'], features['equity'], features['risk']) == ('Equity', 96.0, 'Very High')
+
+
+def test_missing_details_are_reported_as_assumed():
+    features, assumed = fund_features(dict(FUND_DETAILS, five_year_return=None), {})
+
+    assert assumed == ['5 year return', 'equity allocation', 'risk level', 'rating']
+    assert features['equity'] == 50
+
+
+def test_profiles_cover_every_type_in_the_dataset():
+    profiles = fund_type_profiles()
+
+    assert profiles['Debt']['equity'] < profiles['Hybrid']['equity'] < profiles['Equity']['equity']
+    assert all(set(profile) == {'equity', 'risk', 'rating'} for profile in profiles.values())
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.returns import trailing_returns, trailing_returns_batch
+
+
+def test_return_uses_last_nav_on_or_before_target():
+    dates = pd.to_datetime(['2024-01-01', '2024-01-31', '2024-02-01'])
+    navs = [100.0, 110.0, 121.0]
+
+    returns = trailing_returns(dates, navs)
+
+    # One month before 2024-02-01 is 2024-01-01
+    assert returns['one_month_return'] == pytest.approx(21.0)
+
+
+def test_horizon_longer_than_history_is_none():
+    dates = pd.date_range('2024-01-01', periods=60, freq='D')
+    navs = np.linspace(10, 12, 60)
+
+    returns = trailing_returns(dates, navs)
+
+    assert returns['one_month_return'] is not None
+    assert returns['one_year_return'] is None
+    assert returns['five_year_return'] is None
+
+
+def test_batch_matches_single_series_and_handles_empty_series():
+    long_dates = pd.date_range('2020-01-01', '2024-01-01', freq='D')
+    long_navs = np.linspace(10, 20, len(long_dates))
+    short_dates = pd.date_range('2023-10-01', '2024-01-01', freq='D')
+    short_navs = np.linspace(50, 55, len(short_dates))
+
+    batch = trailing_returns_batch([(long_dates, long_navs), ([], []), (short_dates, short_navs)])
+
+    assert batch[0] == trailing_returns(long_dates, long_navs)
+    assert batch[2] == trailing_returns(short_dates, short_navs)
+    assert all(value is None for value in batch[1].values())
+    assert batch[2]['one_year_return'] is None
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from app.utils.nav_series import NAVSeries
+from app.utils.risk_metrics import risk_metrics_matrix, stack_series
+
+
+def test_stack_series_right_aligns_and_pads_with_nan():
+    long = NAVSeries([1, 2, 3, 4], [10.0, 11.0, 12.0, 13.0])
+    short = NAVSeries([3, 4], [20.0, 21.0])
+    empty = NAVSeries([], [])
+
+    matrix = stack_series([long, short, empty])
+
+    assert matrix.shape == (3, 4)
+    assert matrix.dtype == np.float64
+    np.testing.assert_array_equal(matrix[0], [10.0, 11.0, 12.0, 13.0])
+    assert np.isnan(matrix[1, :2]).all()
+    np.testing.assert_array_equal(matrix[1, 2:], [20.0, 21.0])
+    assert np.isnan(matrix[2]).all()
+
+
+def test_stack_series_of_nothing_is_empty():
+    assert stack_series([]).shape == (0, 0)
+
+
+def test_metrics_do_not_depend_on_other_rows():
+    rng = np.random.default_rng(0)
+    navs = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, 400))
+    alone = risk_metrics_matrix(stack_series([NAVSeries(np.arange(300), navs[-300:])]))
+    together = risk_metrics_matrix(stack_series([NAVSeries(np.arange(300), navs[-300:]),
+                                                 NAVSeries(np.arange(400), navs)]))
+
+    for name, values in alone.items():
+        assert together[name][0] == pytest.approx(values[0], nan_ok=True)
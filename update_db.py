@@ -1,6 +1,7 @@
 from app import create_app, db
 
-app = create_app()
-with app.app_context():
-    db.create_all()
-    print("Database updated successfully!")
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print("Database updated successfully!")